@@ -1,13 +1,19 @@
-from google.adk.agents import LlmAgent
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
 from google.genai import types
 from app import state_keys as K
+from app.tools import booking as t_booking
 
 booking_agent = LlmAgent(
     name="BookingAgent",
     model="gemini-2.0-flash",
     description="Reserves a slot if a target exists. Writes booking to state only.",
     instruction=f"""
-If state '{K.TARGET}' exists, call the 'mock_book' tool to reserve a slot.
+If state '{K.TARGET}' exists, call the 'mock_book' tool to reserve a slot, passing case_id from state '{K.CASE_ID}'.
 Save the returned booking dict into state key '{K.BOOKING}'.
 Do not produce any user-facing text.
 """,
@@ -17,3 +23,36 @@ Do not produce any user-facing text.
     generate_content_config=types.GenerateContentConfig(temperature=0, max_output_tokens=80)
 )
 
+class BookingStep(BaseAgent):
+    """Same job as BookingAgent without the model round trip.
+
+    Reads the target from session state, calls ``mock_book`` directly and
+    writes the result to state through the event's state delta. Shelters
+    take walk-ins, so disaster cases are not booked (as in mock mode).
+    The reservation is written on a worker thread; if the case is cancelled
+    meanwhile, the write is let finish so the seat is recorded under the case
+    and a rerun gets the same one back.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        target = t_booking.target_from_state(state)
+        if target is None or state.get(K.CASE_TYPE) == "disaster":
+            return
+        task = asyncio.ensure_future(asyncio.to_thread(t_booking.mock_book, target, case_id=state.get(K.CASE_ID)))
+        try:
+            booking = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            await asyncio.wait([task])
+            raise
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={K.BOOKING: booking})
+        )
+
+booking_step = BookingStep(
+    name="BookingStep",
+    description="Reserves a slot if a target exists by calling mock_book directly. No LLM call."
+)
@@ -1,6 +1,7 @@
 from google.adk.agents import LlmAgent
 from google.genai import types
 from app import state_keys as K
+from app.callbacks import response_cache
 
 crime_agent = LlmAgent(
     name="CrimeAgent",
@@ -20,6 +21,8 @@ Return concise, neutral language. Avoid legalese.
 """,
     tools=[],
     include_contents='default',
+    before_model_callback=response_cache.before_model,
+    after_model_callback=response_cache.after_model,
     output_key=None,
     generate_content_config=types.GenerateContentConfig(temperature=0.2, max_output_tokens=180)
 )
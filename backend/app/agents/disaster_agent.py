@@ -0,0 +1,30 @@
+from google.adk.agents import LlmAgent
+from google.genai import types
+from app import state_keys as K
+from app.callbacks import response_cache
+
+disaster_agent = LlmAgent(
+    name="DisasterAgent",
+    model="gemini-2.0-flash",
+    description="Handles floods, earthquakes, fires, storms and heatwaves. Picks the nearest open relief camp.",
+    instruction=f"""
+You will receive:
+- A SYSTEM 'STATE:' block containing user_message, location, battery_pct, bandwidth_kbps, and lite.
+- The last USER message.
+
+Goals:
+1) Identify the incident (Flood, Earthquake, Fire, Heatwave, Storm) => urgency=high.
+2) Use the 'nearest_shelter' tool with that incident_type to pick an open relief camp and save it
+   into state '{K.TARGET}'. Save urgency into state key '{K.URGENCY}'.
+3) Give one safety instruction (e.g. move to higher ground, avoid flooded roads) and the
+   evacuation route from the shelter record if present.
+
+Keep it short and calm. Rescue: 1122.
+""",
+    tools=[],
+    include_contents='default',
+    before_model_callback=response_cache.before_model,
+    after_model_callback=response_cache.after_model,
+    output_key=None,
+    generate_content_config=types.GenerateContentConfig(temperature=0.2, max_output_tokens=180)
+)
@@ -1,6 +1,12 @@
-from google.adk.agents import LlmAgent
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
 from google.genai import types
 from app import state_keys as K
+from app.callbacks import response_cache
+from app.tools.renderer import lite_line, render
 
 followup_agent = LlmAgent(
     name="FollowUpAgent",
@@ -55,6 +61,9 @@ Generate a response based on the case type and state information. Make sure to:
     tools=[],
     output_key=K.CONFIRMATION_TEXT,
     include_contents='default',
+    # Near-identical cases get the cached reply with their own case ID filled in
+    before_model_callback=response_cache.before_model,
+    after_model_callback=response_cache.after_model,
     generate_content_config=types.GenerateContentConfig(
         temperature=0.3,
         max_output_tokens=600,
@@ -62,3 +71,35 @@ Generate a response based on the case type and state information. Make sure to:
         top_k=40
     )
 )
+
+class ReplyStep(BaseAgent):
+    """Renders the confirmation from templates; falls back to its FollowUp sub-agent.
+
+    Most cases only need state we already hold (case type, facility, booking,
+    case ID), so the reply is rendered locally in the citizen's language. Cases
+    the templates cannot cover (no specialist or no facility) still get the
+    FollowUp agent's free-form reply, except lite cases: they keep LiteAgent's
+    one-line reply, held to the lite length.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        text = render(state)
+        if text is None and state.get(K.LITE):
+            text = lite_line(state, state.get(K.CONFIRMATION_TEXT))
+        if text is None:
+            async for event in self.sub_agents[0].run_async(ctx):
+                yield event
+            return
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={K.CONFIRMATION_TEXT: text})
+        )
+
+reply_step = ReplyStep(
+    name="ReplyStep",
+    description="Renders the confirmation from templates; FollowUpAgent only when state is incomplete.",
+    sub_agents=[followup_agent.clone()]
+)
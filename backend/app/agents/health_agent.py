@@ -1,5 +1,6 @@
 from google.adk.agents import LlmAgent
 from app import state_keys as K
+from app.callbacks import response_cache
 from google.genai import types
 
 # Health: simple triage + target selection + plain advice
@@ -20,11 +21,15 @@ Guidelines:
 
 Tasks:
 - Use the 'nearest_hospital' tool to pick a facility when needed and save it to state key '{K.TARGET}'.
+- When the case needs a specific capability (ER, free beds, ventilators, blood), use 'find_facilities'
+  with the matching filters instead, e.g. chest pain => er_only=true, min_beds=1.
 - Save urgency into state key '{K.URGENCY}'.
 - Keep replies short and actionable; do NOT over-explain.
 """,
     tools=[],  # tools appended by parent via AgentTool; see orchestrator
     output_key=None,
     include_contents='default',
+    before_model_callback=response_cache.before_model,
+    after_model_callback=response_cache.after_model,
     generate_content_config=types.GenerateContentConfig(temperature=0.2, max_output_tokens=180)
 )
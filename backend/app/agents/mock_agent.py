@@ -1,21 +1,26 @@
+import asyncio
 from app import config
 from app.tools.degraded import detect_lite
 from app.tools import directory as t_dir
+from app.tools import shelters as t_shelters
 from app.tools import booking as t_booking
+from app.tools.keyword_router import route
+from app.tools.renderer import render
+from app.tools.triage import urgency
 from app.callbacks.logging import agent_logger_instance, flow_logger_instance
 from app import state_keys as K
 
 def _mock_route(state):
-    """Mock routing logic based on keywords."""
-    text = (state.get("user_message") or "").lower()
-    if any(k in text for k in ["robbery", "theft", "chori", "fir", "violence", "harassment", "snatched", "stolen", "wallet", "mobile"]):
-        return "crime"
-    if any(k in text for k in ["fever", "bukhar", "chest pain", "blood", "vaccine", "medicine", "stroke", "pain", "sick", "hospital", "health", "emergency"]):
-        return "health"
-    return "unknown"
+    """Mock routing logic: weighted multilingual keyword tables, one pass over the text."""
+    return route(state.get("user_message"))
 
 async def mock_run(state: dict):
-    """Mock agent run that bypasses LLM calls."""
+    """Mock agent run that bypasses LLM calls.
+
+    Also completes cases whose agent run was cut short (see REQUEST_DEADLINE_S):
+    routing, facility, urgency, booking and reply already in ``state`` are kept
+    and only the missing ones are filled in.
+    """
     request_id = state.get(K.CASE_ID, "unknown")
     
     # Log workflow start
@@ -27,7 +32,8 @@ async def mock_run(state: dict):
     )
     
     # Route the case
-    case_type = _mock_route(state)
+    routing = _mock_route(state)
+    case_type = state.get(K.CASE_TYPE) or routing["case_type"]
     state[K.CASE_TYPE] = case_type
     
     # Check for lite mode
@@ -39,7 +45,8 @@ async def mock_run(state: dict):
         request_id=request_id,
         case_type=case_type,
         lite_mode=lite_mode,
-        routing_keywords=state.get("user_message", "").lower()
+        routing_keywords=routing["matched"],
+        routing_score=routing["score"]
     )
     
     # Get location
@@ -55,11 +62,9 @@ async def mock_run(state: dict):
             input_data={"location": location, "message": state.get("user_message")}
         )
         
-        target = t_dir.nearest_hospital(lat, lon)
+        target = state.get(K.TARGET) or t_dir.nearest_hospital(lat, lon)
         state[K.TARGET] = target
-        state[K.URGENCY] = "medium"  # Default urgency
-        if "chest pain" in (state.get("user_message") or "").lower():
-            state[K.URGENCY] = "critical"
+        state[K.URGENCY] = state.get(K.URGENCY) or urgency(case_type, state.get("user_message"))
             
         agent_logger_instance.log_agent_completion(
             request_id=request_id,
@@ -74,15 +79,33 @@ async def mock_run(state: dict):
             input_data={"location": location, "message": state.get("user_message")}
         )
         
-        target = t_dir.nearest_police(lat, lon)
+        target = state.get(K.TARGET) or t_dir.nearest_police(lat, lon)
         state[K.TARGET] = target
-        state[K.URGENCY] = "medium"
+        state[K.URGENCY] = state.get(K.URGENCY) or urgency(case_type, state.get("user_message"))
         
         agent_logger_instance.log_agent_completion(
             request_id=request_id,
             agent_name="crime_agent_mock",
             output_data={"target": target, "urgency": state[K.URGENCY]}
         )
+    elif case_type == "disaster":
+        agent_logger_instance.log_agent_execution(
+            request_id=request_id,
+            agent_name="disaster_agent_mock",
+            input_data={"location": location, "message": state.get("user_message")}
+        )
+
+        incident = state.get(K.INCIDENT) or routing["incident"]
+        state[K.INCIDENT] = incident
+        target = state.get(K.TARGET) or t_shelters.nearest_shelter(lat, lon, incident_type=incident)
+        state[K.TARGET] = target or None
+        state[K.URGENCY] = state.get(K.URGENCY) or urgency(case_type, state.get("user_message"))
+
+        agent_logger_instance.log_agent_completion(
+            request_id=request_id,
+            agent_name="disaster_agent_mock",
+            output_data={"target": target, "urgency": state[K.URGENCY], "incident_type": incident}
+        )
     else:
         agent_logger_instance.log_agent_execution(
             request_id=request_id,
@@ -99,32 +122,20 @@ async def mock_run(state: dict):
             output_data={"target": None, "urgency": "low"}
         )
     
-    # Create booking if target exists
-    if state.get(K.TARGET):
+    # Shelters take walk-ins; everything else with a target gets a slot
+    if state.get(K.TARGET) and case_type != "disaster" and not state.get(K.BOOKING):
         flow_logger_instance.log_workflow_step(
             request_id=request_id,
             step="booking_creation",
             step_data={"target": state[K.TARGET]}
         )
         
-        booking = t_booking.mock_book(state[K.TARGET])
-        state[K.BOOKING] = booking
-        
-        # Generate confirmation
-        if state[K.LITE]:
-            facility_name = state[K.TARGET].get("name") or state[K.TARGET].get("station_name", "Service")
-            if case_type == "health":
-                state[K.CONFIRMATION_TEXT] = f"Emergency: 112. Nearest: {facility_name}. Case ID: {state.get(K.CASE_ID)}"
-            else:
-                state[K.CONFIRMATION_TEXT] = f"Police: 15. Nearest: {facility_name}. Case ID: {state.get(K.CASE_ID)}"
-        else:
-            if booking and booking.get("confirmed"):
-                state[K.CONFIRMATION_TEXT] = (f"Appointment booked: {booking['place']} at {booking['slot_human']}. "
-                                             f"Bring your ID card. Case ID: {state.get(K.CASE_ID)}")
-            else:
-                state[K.CONFIRMATION_TEXT] = f"Your request is recorded. We'll notify next steps. Case ID: {state.get(K.CASE_ID)}"
-    else:
-        state[K.CONFIRMATION_TEXT] = f"Your request is recorded. Case ID: {state.get(K.CASE_ID)}"
+        state[K.BOOKING] = await asyncio.to_thread(t_booking.mock_book, state[K.TARGET],
+                                                   case_id=state.get(K.CASE_ID))
+    
+    # Generate confirmation in the citizen's language
+    state[K.CONFIRMATION_TEXT] = (state.get(K.CONFIRMATION_TEXT) or render(state)
+                                  or f"Your request is recorded. Case ID: {state.get(K.CASE_ID)}")
     
     # Log workflow completion
     flow_logger_instance.log_workflow_complete(
@@ -5,31 +5,64 @@ from google.genai import types
 
 from app.agents.health_agent import health_agent
 from app.agents.crime_agent import crime_agent
-from app.agents.booking_agent import booking_agent
-from app.agents.followup_agent import followup_agent
+from app.agents.disaster_agent import disaster_agent
+from app.agents.booking_agent import booking_agent, booking_step
+from app.agents.followup_agent import followup_agent, reply_step
 from app.agents.lite_agent import lite_agent
 
 from app.tools import directory as t_dir
+from app.tools import shelters as t_shelters
 from app.tools import booking as t_booking
+from app.callbacks import circuit, deadline, response_cache, speculation, targets
 from app import state_keys as K
+from app import config
 
 # Wrap Python tools for LLM tool-use
 nearest_hospital_tool = FunctionTool(func=t_dir.nearest_hospital)
 nearest_police_tool = FunctionTool(func=t_dir.nearest_police)
+find_facilities_tool = FunctionTool(func=t_dir.find_facilities)
+nearest_shelter_tool = FunctionTool(func=t_shelters.nearest_shelter)
 mock_book_tool = FunctionTool(func=t_booking.mock_book)
 
 # Attach directory/booking tools to the specialist agents
-health_agent.tools = [nearest_hospital_tool]
+health_agent.tools = [nearest_hospital_tool, find_facilities_tool]
 crime_agent.tools = [nearest_police_tool]
+disaster_agent.tools = [nearest_shelter_tool]
 booking_agent.tools = [mock_book_tool]
 
+# Specialists replay work started speculatively for them (the prefetched lookup
+# and, with SPECULATIVE_MODE=llm, the speculative run's model responses)
+for _specialist in (health_agent, crime_agent, disaster_agent):
+    _specialist.before_model_callback = [speculation.before_model, response_cache.before_model]
+    _specialist.before_tool_callback = speculation.before_tool
+    # The facility a directory tool found becomes the case's target in state
+    _specialist.after_tool_callback = targets.after_tool
+
+# The predicted specialist run on a scratch session while the Orchestrator
+# routes; it records its model responses instead of replaying them
+SPECULATIVE_AGENTS = {
+    case_type: agent.clone(update={
+        "before_model_callback": response_cache.before_model,
+        "after_model_callback": [response_cache.after_model, speculation.record_model],
+    })
+    for case_type, agent in (("health", health_agent), ("crime", crime_agent), ("disaster", disaster_agent))
+}
+
 # Expose those agents as callable tools to the orchestrator (optional pattern)
 health_tool = agent_tool.AgentTool(agent=health_agent)
 crime_tool = agent_tool.AgentTool(agent=crime_agent)
+disaster_tool = agent_tool.AgentTool(agent=disaster_agent)
 booking_tool = agent_tool.AgentTool(agent=booking_agent)
 follow_tool = agent_tool.AgentTool(agent=followup_agent)
 lite_tool = agent_tool.AgentTool(agent=lite_agent)
 
+# The booking stage after the specialist: a plain function call by default,
+# or the BookingAgent LLM turn with BOOKING_MODE=llm
+booking_stage = booking_agent if config.BOOKING_MODE == "llm" else booking_step
+# The reply: templates with a FollowUpAgent fallback by default, or always the
+# FollowUpAgent with REPLY_MODE=llm
+reply_stage = followup_agent if config.REPLY_MODE == "llm" else reply_step
+
 # Orchestrator: routes and sets state keys; uses precomputed lite flag
 orchestrator = LlmAgent(
     name="Orchestrator",
@@ -45,21 +78,68 @@ Rules:
 4) If lite is False:
    - If case_type = health: call HealthAgent.
    - If case_type = crime: call CrimeAgent.
-   - If case_type = disaster: do not call any specialist (FollowUpAgent will handle formatting).
+   - If case_type = disaster: call DisasterAgent.
    - Otherwise, do nothing further.
 5) Write '{K.CASE_TYPE}' to state as a single word. Do not write user-facing text.
 6) Never mention tools or internals.
 """,
-    tools=[health_tool, crime_tool, lite_tool],
+    tools=[health_tool, crime_tool, disaster_tool, lite_tool],
     output_key=None,
     include_contents='default',
     generate_content_config=types.GenerateContentConfig(temperature=0, max_output_tokens=150)
 )
 
+# Per-agent wall-clock times (GET /admin/agents) and the case deadline, which
+# stops the run before an agent that would overrun it (GET /admin/deadlines);
+# fast-path clones inherit them
+for _agent in (orchestrator, health_agent, crime_agent, disaster_agent, lite_agent,
+               booking_agent, booking_step, followup_agent, reply_step):
+    _agent.before_agent_callback = [speculation.agent_started, deadline.before_agent]
+    _agent.after_agent_callback = [deadline.after_agent, speculation.agent_finished]
+
+# Lite cases get their case type and urgency when LiteAgent is done
+lite_agent.after_agent_callback = [*lite_agent.after_agent_callback, targets.after_lite_agent]
+
+def _callbacks(value) -> list:
+    return value if isinstance(value, list) else [value] if value else []
+
+# No model call starts once the deadline has passed, and each agent's model
+# calls go through its circuit breaker (GET /admin/circuit). The breaker check
+# comes last so replayed and cached responses do not count as calls. The
+# speculative specialists share their real counterpart's breaker.
+for _agent in (orchestrator, health_agent, crime_agent, disaster_agent, lite_agent,
+               booking_agent, followup_agent, reply_step.sub_agents[0], *SPECULATIVE_AGENTS.values()):
+    _agent.before_model_callback = [deadline.before_model, *_callbacks(_agent.before_model_callback),
+                                    circuit.before_model]
+    _agent.after_model_callback = [circuit.after_model, *_callbacks(_agent.after_model_callback)]
+    _agent.on_model_error_callback = circuit.on_model_error
+
 # The overall sequential flow for one request
 root_agent = SequentialAgent(
     name="FrontlineWorkflow",
     description="Orchestrator -> Specialist -> Booking -> FollowUp",
-    sub_agents=[orchestrator, booking_agent, followup_agent]
+    sub_agents=[orchestrator, booking_stage, reply_stage]
 )
 
+
+def _fast_path(name: str, *agents) -> SequentialAgent:
+    """Workflow that starts at ``agents[0]`` instead of the Orchestrator.
+
+    Agents can only have one parent, so each path runs its own clones.
+    """
+    return SequentialAgent(
+        name=name,
+        description=f"{' -> '.join(a.name for a in agents)} (routed by the tier-0 classifier)",
+        sub_agents=[a.clone() for a in agents]
+    )
+
+# Used when the tier-0 classifier is confident about case_type: the same flow
+# as root_agent minus the Orchestrator turn. Lite cases go to LiteAgent whatever
+# their type, and unknown cases have no specialist, mirroring the routing rules.
+FAST_PATHS = {
+    "health": _fast_path("HealthWorkflow", health_agent, booking_stage, reply_stage),
+    "crime": _fast_path("CrimeWorkflow", crime_agent, booking_stage, reply_stage),
+    "disaster": _fast_path("DisasterWorkflow", disaster_agent, booking_stage, reply_stage),
+    "unknown": _fast_path("UnknownWorkflow", booking_stage, reply_stage),
+    "lite": _fast_path("LiteWorkflow", lite_agent, booking_stage, reply_stage),
+}
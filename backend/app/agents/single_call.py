@@ -0,0 +1,125 @@
+import asyncio
+from typing import Any, Dict, Literal, Optional, Tuple
+
+from google import genai
+from google.genai import types
+from pydantic import BaseModel, Field
+
+from app import config
+from app import state_keys as K
+from app.tools import directory as t_dir
+from app.tools import shelters as t_shelters
+from app.tools import booking as t_booking
+from app.tools.renderer import render
+from app.callbacks.logging import agent_logger_instance, flow_logger_instance, gemini_logger_instance
+
+class TriageDecision(BaseModel):
+    """Everything the agent chain decides, returned by one model call."""
+    case_type: Literal["health", "crime", "disaster", "unknown"]
+    urgency: Literal["low", "medium", "high", "critical"]
+    advice: str = Field(description="One or two short, actionable sentences in the citizen's language")
+    incident_type: Optional[Literal["Flood", "Earthquake", "Fire", "Heatwave", "Storm"]] = None
+    er_only: bool = False
+    min_beds: int = 0
+    min_ventilators: int = 0
+    min_blood_units: int = 0
+
+INSTRUCTION = """
+You triage citizen requests for a Pakistani frontline service desk. Return JSON only.
+
+- case_type: health (medical), crime (police matters, fraud, harassment), disaster (flood,
+  earthquake, fire, heatwave, storm, rescue) or unknown (anything else).
+- urgency: chest pain/shortness of breath/stroke => critical; very high blood pressure => high;
+  fever => medium; otherwise your best judgement.
+- advice: immediate first-aid or safety advice, short and actionable, in language '{lang}'.
+  Do not mention tools, case IDs or facilities; those are added separately.
+- incident_type: for disasters only.
+- er_only / min_beds / min_ventilators / min_blood_units: hospital requirements for health
+  cases, e.g. chest pain => er_only=true, min_beds=1. Leave at defaults otherwise.
+"""
+
+_client: Optional[genai.Client] = None
+
+def _get_client() -> genai.Client:
+    global _client
+    if _client is None:
+        _client = genai.Client()
+    return _client
+
+async def decide(state: dict) -> Tuple[TriageDecision, Optional[types.GenerateContentResponseUsageMetadata]]:
+    """The single Gemini call: routing, urgency, advice and tool arguments.
+
+    Returns the decision and the call's token usage.
+    """
+    response = await _get_client().aio.models.generate_content(
+        model=config.GEMINI_MODEL,
+        contents=state.get("user_message") or "",
+        config=types.GenerateContentConfig(
+            system_instruction=INSTRUCTION.format(lang=state.get("lang") or "en"),
+            response_mime_type="application/json",
+            response_schema=TriageDecision,
+            temperature=0,
+            max_output_tokens=200,
+        ),
+    )
+    decision = response.parsed
+    if not isinstance(decision, TriageDecision):
+        decision = TriageDecision.model_validate_json(response.text)
+    return decision, response.usage_metadata
+
+def _find_target(decision: TriageDecision, lat: Optional[float], lon: Optional[float]) -> Optional[Dict[str, Any]]:
+    if decision.case_type == "health":
+        if decision.er_only or decision.min_beds or decision.min_ventilators or decision.min_blood_units:
+            found = t_dir.find_facilities("hospital", lat, lon, k=1, er_only=decision.er_only,
+                                          min_beds=decision.min_beds, min_ventilators=decision.min_ventilators,
+                                          min_blood_units=decision.min_blood_units)
+            if found["results"]:
+                return found["results"][0]
+        return t_dir.nearest_hospital(lat, lon)
+    if decision.case_type == "crime":
+        return t_dir.nearest_police(lat, lon)
+    if decision.case_type == "disaster":
+        return t_shelters.nearest_shelter(lat, lon, incident_type=decision.incident_type)
+    return None
+
+def apply_decision(state: dict, decision: TriageDecision) -> dict:
+    """Run the directory and booking tools for a decision and render the reply."""
+    location = state.get("location") or {}
+    state[K.CASE_TYPE] = decision.case_type
+    state[K.URGENCY] = decision.urgency
+    state[K.INCIDENT] = decision.incident_type
+    target = _find_target(decision, location.get("lat"), location.get("lon"))
+    state[K.TARGET] = target or None
+    # Shelters take walk-ins; everything else with a target gets a slot
+    if target and decision.case_type in ("health", "crime"):
+        state[K.BOOKING] = t_booking.mock_book(target, case_id=state.get(K.CASE_ID))
+    state[K.CONFIRMATION_TEXT] = (render(state, advice=decision.advice)
+                                  or f"{decision.advice}\nCase ID: {state.get(K.CASE_ID)}")
+    return state
+
+async def single_call_run(state: dict) -> dict:
+    """PIPELINE_MODE=single: one structured Gemini call, then tools in Python."""
+    request_id = state.get(K.CASE_ID, "unknown")
+    flow_logger_instance.log_workflow_start(
+        request_id=request_id,
+        user_message=state.get("user_message", ""),
+        location=state.get("location", {}),
+        mode="single"
+    )
+    decision, usage = await decide(state)
+    gemini_logger_instance.log_gemini_response(
+        request_id=request_id,
+        model=config.GEMINI_MODEL,
+        response=decision.model_dump_json(),
+        tokens_used=usage.total_token_count if usage else None
+    )
+    agent_logger_instance.log_agent_selection(
+        request_id=request_id,
+        case_type=decision.case_type,
+        lite_mode=state.get(K.LITE, False),
+        urgency=decision.urgency
+    )
+    # The booking write blocks; keep it off the event loop
+    await asyncio.to_thread(apply_decision, state, decision)
+    flow_logger_instance.log_workflow_complete(request_id=request_id, final_state=state)
+    return state
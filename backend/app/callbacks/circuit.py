@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from google.adk.models import LlmRequest, LlmResponse
+
+from app import config
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+class CircuitOpen(Exception):
+    """Raised before a model call an agent's open breaker does not let through."""
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        super().__init__(f"circuit for {agent} is open")
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over one agent's model calls.
+
+    The last ``window`` calls are kept; a call fails if it raised or took longer
+    than ``slow_ms``. Once at least ``min_calls`` are recorded and the failure
+    rate reaches ``error_rate`` the breaker opens: calls are refused for
+    ``open_s`` seconds, then one probe at a time is let through (half-open).
+    A successful probe closes it, a failed one opens it again. A probe that
+    reports nothing within ``open_s`` (e.g. answered from a cache) frees the slot.
+    """
+
+    def __init__(self, name: str, window: int = 20, min_calls: int = 5, error_rate: float = 0.5,
+                 slow_ms: float = 15000, open_s: float = 30, on_transition=None):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_ms = slow_ms
+        self.open_s = open_s
+        self.on_transition = on_transition
+        self._lock = threading.Lock()
+        self._calls: deque = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_at: Optional[float] = None
+        self._totals = {"calls": 0, "errors": 0, "slow": 0, "rejected": 0, "opened": 0}
+
+    def _move(self, state: str, reason: str, now: float):
+        previous, self._state = self._state, state
+        if state == OPEN:
+            self._opened_at = now
+            self._totals["opened"] += 1
+        if state == CLOSED:
+            self._calls.clear()
+        self._probe_at = None
+        if self.on_transition is not None:
+            self.on_transition(self.name, previous, state, reason)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_s:
+                return HALF_OPEN
+            return self._state
+
+    def available(self) -> bool:
+        """Whether a call would be let through now (without taking the probe slot)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                return now - self._opened_at >= self.open_s
+            return self._probe_at is None or now - self._probe_at >= self.open_s
+
+    def allow(self) -> bool:
+        """Let a call through, taking the probe slot when half-open."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == OPEN and now - self._opened_at >= self.open_s:
+                self._move(HALF_OPEN, f"open for {self.open_s:.0f}s", now)
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.open_s):
+                self._probe_at = now
+                return True
+            self._totals["rejected"] += 1
+            return False
+
+    def record(self, ok: bool, ms: float):
+        """Report a call's outcome and latency."""
+        with self._lock:
+            now = time.monotonic()
+            slow = ms > self.slow_ms
+            self._totals["calls"] += 1
+            self._totals["errors"] += int(not ok)
+            self._totals["slow"] += int(ok and slow)
+            failed = not ok or slow
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._move(OPEN, "probe failed" if not ok else f"probe took {ms:.0f} ms", now)
+                else:
+                    self._move(CLOSED, "probe succeeded", now)
+                return
+            self._calls.append((failed, ms))
+            if self._state == CLOSED and len(self._calls) >= self.min_calls:
+                rate = sum(f for f, _ in self._calls) / len(self._calls)
+                if rate >= self.error_rate:
+                    self._move(OPEN, f"{rate:.0%} of the last {len(self._calls)} calls failed or were slow", now)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            calls = list(self._calls)
+            latencies = sorted(ms for _, ms in calls)
+            return {
+                "state": state,
+                "window_calls": len(calls),
+                "failure_rate": round(sum(f for f, _ in calls) / len(calls), 4) if calls else 0.0,
+                "mean_ms": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+                "p95_ms": round(latencies[int(len(latencies) * 0.95)], 1) if latencies else 0.0,
+                **self._totals,
+            }
+
+class CircuitBoard:
+    """One breaker per agent, created on first use, and the recent transitions."""
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._transitions: deque = deque(maxlen=100)
+        self._lock = threading.Lock()
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name, on_transition=self._log, **self.settings)
+            return self._breakers[name]
+
+    def _log(self, name: str, previous: str, state: str, reason: str):
+        self._transitions.append({"agent": name, "from": previous, "to": state, "reason": reason,
+                                  "at": datetime.utcnow().isoformat() + "Z"})
+        print(f"🔌 CIRCUIT: {name} {previous} -> {state} ({reason})")
+
+    def blocked(self, names) -> List[str]:
+        """The agents among ``names`` whose breaker would refuse a call now."""
+        return [name for name in names if not self.breaker(name).available()]
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+            self._transitions.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {
+            "breakers": {name: b.stats for name, b in breakers.items()},
+            "transitions": list(self._transitions),
+        }
+
+BOARD = CircuitBoard(window=config.CIRCUIT_WINDOW, min_calls=config.CIRCUIT_MIN_CALLS,
+                     error_rate=config.CIRCUIT_ERROR_RATE, slow_ms=config.CIRCUIT_SLOW_MS,
+                     open_s=config.CIRCUIT_OPEN_S)
+
+def _started_key(agent: str) -> str:
+    return f"temp:model_started:{agent}"
+
+def before_model(callback_context, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Last before_model_callback (only reached when the model is really called):
+    refuse the call while the agent's breaker is open."""
+    agent = callback_context.agent_name
+    if not BOARD.breaker(agent).allow():
+        raise CircuitOpen(agent)
+    callback_context.state[_started_key(agent)] = time.perf_counter()
+    return None
+
+def after_model(callback_context, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """after_model_callback: a completed model call, with its latency."""
+    started = callback_context.state.get(_started_key(callback_context.agent_name))
+    if started is not None and not llm_response.partial:
+        ok = llm_response.error_code is None
+        BOARD.breaker(callback_context.agent_name).record(ok, (time.perf_counter() - started) * 1000)
+    return None
+
+def on_model_error(callback_context, llm_request: LlmRequest, error: Exception) -> Optional[LlmResponse]:
+    """on_model_error_callback: count the failure; the error still propagates."""
+    started = callback_context.state.get(_started_key(callback_context.agent_name))
+    ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+    BOARD.breaker(callback_context.agent_name).record(False, ms)
+    return None
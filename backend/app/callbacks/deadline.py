@@ -0,0 +1,123 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from google.adk.models import LlmRequest, LlmResponse
+
+from app import state_keys as K
+from app.callbacks.speculation import TIMINGS
+
+# Agents need this many timed runs before their mean is trusted to predict a miss
+MIN_RUNS = 5
+
+class DeadlineExceeded(Exception):
+    """Raised inside the agent run when a case's deadline is reached, or its next
+    agent would clearly overrun it; the case is then completed degraded."""
+
+    def __init__(self, agent: str, predicted: bool = False):
+        self.agent = agent
+        self.predicted = predicted
+        super().__init__(f"{agent} {'would miss' if predicted else 'missed'} the case deadline")
+
+class DeadlineStats:
+    """Per-agent runs and deadline misses, and how many cases were degraded."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._agents: Dict[str, List[int]] = {}
+            self._cases = 0
+            self._degraded = 0
+            self._predicted = 0
+
+    def started(self, agent: str):
+        with self._lock:
+            self._agents.setdefault(agent, [0, 0])[0] += 1
+
+    def missed(self, agent: str, predicted: bool = False):
+        with self._lock:
+            self._agents.setdefault(agent, [1, 0])[1] += 1
+            self._degraded += 1
+            self._predicted += int(predicted)
+
+    def case(self):
+        with self._lock:
+            self._cases += 1
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cases": self._cases,
+                "degraded": self._degraded,
+                "degraded_rate": round(self._degraded / self._cases, 4) if self._cases else 0.0,
+                "predicted_misses": self._predicted,
+                "agents": {name: {"runs": runs, "misses": misses,
+                                  "miss_rate": round(misses / runs, 4) if runs else 0.0}
+                           for name, (runs, misses) in self._agents.items()},
+            }
+
+STATS = DeadlineStats()
+
+# Agents currently running per case, innermost last: the one a timeout is blamed on
+_RUNNING: Dict[str, List[str]] = {}
+
+def remaining(state) -> Optional[float]:
+    """Seconds left before the case's deadline (None when it has none)."""
+    deadline = state.get(K.DEADLINE)
+    return None if deadline is None else deadline - time.time()
+
+def running(case_id: str) -> Optional[str]:
+    """The innermost agent still running for a case."""
+    agents = _RUNNING.get(case_id)
+    return agents[-1] if agents else None
+
+def missed(case_id: str, agent: Optional[str] = None, predicted: bool = False) -> str:
+    """Record a case's deadline miss against ``agent`` (default: the agent that
+    was running) and forget its running agents. Returns the agent blamed."""
+    agent = agent or running(case_id) or "pipeline"
+    _RUNNING.pop(case_id, None)
+    STATS.missed(agent, predicted)
+    return agent
+
+def finish(case_id: str):
+    _RUNNING.pop(case_id, None)
+
+def before_agent(callback_context) -> None:
+    """before_agent_callback: give up on the case rather than start an agent
+    whose mean run time no longer fits in what is left of the budget."""
+    left = remaining(callback_context.state)
+    if left is None:
+        return None
+    case_id = callback_context.state.get(K.CASE_ID)
+    agent = callback_context.agent_name
+    STATS.started(agent)
+    _RUNNING.setdefault(case_id, []).append(agent)
+    mean_ms = TIMINGS.mean_ms(agent, MIN_RUNS)
+    if left <= 0 or (mean_ms is not None and mean_ms / 1000 > left):
+        raise DeadlineExceeded(agent, predicted=left > 0)
+    return None
+
+def after_agent(callback_context) -> None:
+    """after_agent_callback: the agent finished within the budget.
+
+    ADK also calls it for agents cancelled by the request timeout; those stay
+    on the running list so the miss is blamed on the innermost of them.
+    """
+    left = remaining(callback_context.state)
+    if left is not None and left <= 0:
+        return None
+    agents = _RUNNING.get(callback_context.state.get(K.CASE_ID))
+    if agents and agents[-1] == callback_context.agent_name:
+        agents.pop()
+    return None
+
+def before_model(callback_context, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """before_model_callback: no model call once the deadline has passed."""
+    left = remaining(callback_context.state)
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(callback_context.agent_name)
+    return None
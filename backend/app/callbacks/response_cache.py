@@ -0,0 +1,230 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from app import config
+from app import state_keys as K
+from app.callbacks.logging import structured_logger
+from app.tools.booking import facility_id, target_from_state
+from app.tools.gazetteer import normalize
+from app.tools.keyword_router import route
+from app.tools.renderer import language
+
+# Per-case values are swapped for these placeholders before a response is
+# stored and filled in again from the current case on every hit
+_PER_CASE = {
+    "{{case_id}}": lambda state: state.get(K.CASE_ID),
+    "{{slot_human}}": lambda state: _booking(state).get("slot_human"),
+    "{{slot_iso}}": lambda state: _booking(state).get("slot_iso"),
+}
+_KEY_STATE = "temp:response_cache_key"
+
+def _booking(state) -> Dict[str, Any]:
+    booking = state.get(K.BOOKING)
+    return booking if isinstance(booking, dict) else {}
+
+def fingerprint(message: Optional[str]) -> str:
+    """Routing keywords found in the message, or a hash of its normalized text
+    when there are none; "fever since yesterday" and "bachay ko bukhar hai"
+    share a fingerprint, unrelated free text does not."""
+    matched = route(message)["matched"]
+    if matched:
+        return "kw:" + "|".join(sorted(matched))
+    text = " ".join(normalize(message or "").split())
+    return "tx:" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+def cache_key(agent_name: str, state, target_id: Optional[str] = None, turn: str = "") -> str:
+    """(agent, case_type, urgency, lite, lang, target id, message fingerprint, turn)."""
+    if target_id is None:
+        target = target_from_state(state)
+        target_id = facility_id(target) if target else "-"
+    parts = (
+        agent_name,
+        str(state.get(K.CASE_TYPE) or "-").strip().lower(),
+        str(state.get(K.URGENCY) or "-").strip().lower(),
+        "lite" if state.get(K.LITE) else "full",
+        language(state.get("lang")),
+        target_id,
+        fingerprint(state.get("user_message")),
+        turn,
+    )
+    return "\x1f".join(parts)
+
+def to_template(text: str, state) -> str:
+    for placeholder, value in _PER_CASE.items():
+        v = value(state)
+        if v:
+            text = text.replace(str(v), placeholder)
+    return text
+
+def from_template(text: str, state) -> str:
+    for placeholder, value in _PER_CASE.items():
+        text = text.replace(placeholder, str(value(state) or ""))
+    return text
+
+class ResponseCache:
+    """LRU + TTL cache of generated texts with an optional SQLite second tier.
+
+    The in-memory tier holds up to ``maxsize`` entries for ``ttl_s`` seconds;
+    with ``db_path`` set, every entry is also written to SQLite so the cache
+    survives restarts and is shared by workers on the same disk. Memory misses
+    fall through to SQLite and are promoted on a hit.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl_s: float = 21600, db_path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self.db_path = db_path or None
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS response_cache (
+                        key TEXT PRIMARY KEY,
+                        text TEXT NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                """)
+        self.reset_stats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits = 0
+            self._db_hits = 0
+            self._misses = 0
+            self._stores = 0
+            self._evictions = 0
+            self._expired = 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("DELETE FROM response_cache")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl_s:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self._expired += 1
+        entry = self._db_get(key, now)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._db_hits += 1
+            self._insert(key, entry)
+        return entry[1]
+
+    def put(self, key: str, text: str):
+        entry = (time.time(), text)
+        with self._lock:
+            self._stores += 1
+            self._insert(key, entry)
+        if self.db_path:
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.execute("INSERT OR REPLACE INTO response_cache (key, text, created_at) VALUES (?, ?, ?)",
+                                 (key, text, entry[0]))
+            except sqlite3.Error as e:
+                structured_logger.log_error("response_cache", e)
+
+    def _insert(self, key: str, entry: Tuple[float, str]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _db_get(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        if not self.db_path:
+            return None
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute("SELECT created_at, text FROM response_cache WHERE key = ? AND created_at > ?",
+                                   (key, now - self.ttl_s)).fetchone()
+        except sqlite3.Error as e:
+            structured_logger.log_error("response_cache", e)
+            return None
+        return (row[0], row[1]) if row else None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl_s,
+                "sqlite": self.db_path,
+                "lookups": lookups,
+                "hits": self._hits,
+                "sqlite_hits": self._db_hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "expired": self._expired,
+            }
+
+CACHE = ResponseCache(config.RESPONSE_CACHE_SIZE, config.RESPONSE_CACHE_TTL_S, config.RESPONSE_CACHE_DB)
+
+def _turn(llm_request: LlmRequest) -> Tuple[str, Optional[str]]:
+    """Which model turn this is: the first one, or the one after a tool returned
+    (named by the tool and, for directory tools, the facility it picked)."""
+    last = llm_request.contents[-1] if llm_request.contents else None
+    responses = [p.function_response for p in (last.parts or []) if p.function_response] if last else []
+    if not responses:
+        return "", None
+    names = ",".join(sorted(r.name or "" for r in responses))
+    result = responses[-1].response or {}
+    target = result.get("result") if isinstance(result.get("result"), dict) else result
+    return f"after:{names}", facility_id(target) if isinstance(target, dict) and target else "-"
+
+def before_model(callback_context, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """before_model_callback: answer from the cache and skip the model call on a hit."""
+    if not CACHE.enabled:
+        return None
+    state = callback_context.state
+    turn, target_id = _turn(llm_request)
+    key = cache_key(callback_context.agent_name, state, target_id, turn)
+    state[_KEY_STATE] = key
+    text = CACHE.get(key)
+    if text is None:
+        return None
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=from_template(text, state))]))
+
+def after_model(callback_context, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """after_model_callback: store final text replies; tool calls carry per-case
+    arguments (coordinates, case ID) and are never cached."""
+    state = callback_context.state
+    key = state.get(_KEY_STATE)
+    content = llm_response.content
+    if not key or llm_response.partial or llm_response.error_code or not content or not content.parts:
+        return None
+    if any(p.function_call for p in content.parts):
+        return None
+    text = "".join(p.text or "" for p in content.parts if not p.thought)
+    if text.strip():
+        CACHE.put(key, to_template(text, state))
+    return None
@@ -0,0 +1,260 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from app import state_keys as K
+from app.callbacks.logging import structured_logger
+from app.tools import directory as t_dir
+from app.tools import shelters as t_shelters
+
+# The directory tool each specialist calls first, by predicted case type
+LOOKUPS: Dict[str, tuple] = {
+    "health": ("HealthAgent", "nearest_hospital", t_dir.nearest_hospital),
+    "crime": ("CrimeAgent", "nearest_police", t_dir.nearest_police),
+    "disaster": ("DisasterAgent", "nearest_shelter", t_shelters.nearest_shelter),
+}
+SPECULATIVE_SESSION = "{case_id}~spec"
+# Longest wait for a speculative turn, further bounded by the case deadline
+REPLAY_TIMEOUT_S = 30.0
+
+class AgentTimings:
+    """Wall-clock time per agent, plus what speculation saved and wasted."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._agents: Dict[str, List[float]] = {}
+            self._speculation = {"started": 0, "committed": 0, "discarded": 0, "lookups_used": 0,
+                                 "turns_replayed": 0, "saved_ms": 0.0, "wasted_ms": 0.0}
+
+    def record(self, agent: str, ms: float):
+        with self._lock:
+            entry = self._agents.setdefault(agent, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += ms
+            entry[2] = max(entry[2], ms)
+
+    def mean_ms(self, agent: str, min_runs: int = 1) -> Optional[float]:
+        """Mean wall-clock time of an agent, once it has run ``min_runs`` times."""
+        with self._lock:
+            entry = self._agents.get(agent)
+            return entry[1] / entry[0] if entry and entry[0] >= min_runs else None
+
+    def record_speculation(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                self._speculation[key] += value
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            spec = dict(self._speculation)
+            spec["saved_ms"] = round(spec["saved_ms"], 1)
+            spec["wasted_ms"] = round(spec["wasted_ms"], 1)
+            spec["commit_rate"] = round(spec["committed"] / spec["started"], 4) if spec["started"] else 0.0
+            return {
+                "agents": {name: {"runs": n, "mean_ms": round(total / n, 1), "max_ms": round(worst, 1)}
+                           for name, (n, total, worst) in self._agents.items()},
+                "speculation": spec,
+            }
+
+TIMINGS = AgentTimings()
+
+class Speculation:
+    """Work started for the predicted specialist while the Orchestrator routes.
+
+    ``lookup`` is the specialist's directory call, run in a thread. With an LLM
+    runner the specialist itself also runs on a scratch session and its model
+    responses are recorded in ``turns``; the real specialist replays them (and
+    the lookup) instead of calling the model when routing agrees.
+    """
+
+    def __init__(self, case_id: str, case_type: str, args: Dict[str, Any]):
+        self.case_id = case_id
+        self.case_type = case_type
+        self.agent_name, self.tool_name, fn = LOOKUPS[case_type]
+        self.args = args
+        self.started = time.perf_counter()
+        self.lookup = asyncio.ensure_future(self._lookup(fn))
+        self.lookup_ms = 0.0
+        self.lookup_wait_ms = 0.0
+        self.lookup_used = False
+        self.task: Optional[asyncio.Task] = None
+        self.run_ms = 0.0
+        self.turns: List[LlmResponse] = []
+        self.replayed = 0
+        self.replay_wait_ms = 0.0
+        self.diverged = False
+        self._turn_added = asyncio.Event()
+
+    async def _lookup(self, fn: Callable) -> Dict[str, Any]:
+        start = time.perf_counter()
+        result = await asyncio.to_thread(fn, **self.args)
+        self.lookup_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    async def _run(self, runner, state: dict, message: str):
+        session_id = SPECULATIVE_SESSION.format(case_id=self.case_id)
+        start = time.perf_counter()
+        try:
+            await runner.session_service.create_session(app_name=runner.app_name, user_id="speculation",
+                                                        session_id=session_id,
+                                                        state={**state, K.CASE_TYPE: self.case_type})
+            content = types.Content(role="user", parts=[types.Part(text=message)])
+            async for _ in runner.run_async(user_id="speculation", session_id=session_id, new_message=content):
+                pass
+        except Exception as e:
+            structured_logger.log_error(self.case_id, e)
+        finally:
+            self.run_ms = (time.perf_counter() - start) * 1000
+            TIMINGS.record(f"{self.agent_name} (speculative)", self.run_ms)
+            self._turn_added.set()
+            await runner.session_service.delete_session(app_name=runner.app_name, user_id="speculation",
+                                                        session_id=session_id)
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def add_turn(self, response: LlmResponse):
+        self.turns.append(response.model_copy(deep=True))
+        self._turn_added.set()
+
+    async def next_turn(self, timeout: float) -> Optional[LlmResponse]:
+        """The speculative run's response for the real specialist's next model
+        call, waiting for it while the speculative run is still going."""
+        deadline = time.perf_counter() + timeout
+        start = time.perf_counter()
+        while self.replayed >= len(self.turns) and self.running:
+            self._turn_added.clear()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._turn_added.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        self.replay_wait_ms += (time.perf_counter() - start) * 1000
+        if self.replayed >= len(self.turns):
+            self.diverged = True
+            return None
+        self.replayed += 1
+        return self.turns[self.replayed - 1]
+
+    def matches(self, tool_name: str, args: Dict[str, Any]) -> bool:
+        if tool_name != self.tool_name:
+            return False
+        for key, value in args.items():
+            expected = self.args.get(key)
+            if key in ("lat", "lon"):
+                if value is None or expected is None or abs(float(value) - expected) > 1e-4:
+                    return False
+            elif value is not None and value != expected:
+                return False
+        return all(args.get(key) is not None for key in ("lat", "lon"))
+
+_ACTIVE: Dict[str, Speculation] = {}
+
+def start(case_id: str, case_type: str, state: dict, incident: Optional[str] = None,
+          runner=None) -> Optional[Speculation]:
+    """Start the predicted specialist's lookup (and, given its speculative
+    runner, its LLM run) for a case whose Orchestrator call is about to start."""
+    location = state.get("location") or {}
+    if case_type not in LOOKUPS or location.get("lat") is None or location.get("lon") is None:
+        return None
+    args = {"lat": location["lat"], "lon": location["lon"]}
+    if case_type == "disaster" and incident:
+        args["incident_type"] = incident
+    spec = Speculation(case_id, case_type, args)
+    _ACTIVE[case_id] = spec
+    if runner is not None:
+        spec.task = asyncio.create_task(spec._run(runner, state, state.get("user_message") or ""))
+    TIMINGS.record_speculation(started=1)
+    return spec
+
+def finish(case_id: str, case_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Settle a case's speculation after the run.
+
+    It is committed when the routed specialist (necessarily the predicted one)
+    used the prefetched lookup or replayed speculative turns; otherwise the
+    work is discarded and counted as wasted. ``case_type`` is the routed type,
+    for the report only.
+    """
+    spec = _ACTIVE.pop(case_id, None)
+    if spec is None:
+        return None
+    if spec.running:
+        spec.task.cancel()
+    if not spec.lookup.done():
+        spec.lookup.cancel()
+    committed = spec.lookup_used or spec.replayed > 0
+    if committed:
+        saved = max(0.0, spec.lookup_ms - spec.lookup_wait_ms) if spec.lookup_used else 0.0
+        if spec.replayed:
+            saved += max(0.0, spec.run_ms - spec.replay_wait_ms)
+        TIMINGS.record_speculation(committed=1, lookups_used=int(spec.lookup_used),
+                                   turns_replayed=spec.replayed, saved_ms=saved)
+    else:
+        TIMINGS.record_speculation(discarded=1, wasted_ms=spec.lookup_ms + spec.run_ms)
+        saved = 0.0
+    return {"predicted": spec.case_type, "routed": case_type, "committed": committed,
+            "lookup_ms": round(spec.lookup_ms, 1), "speculative_run_ms": round(spec.run_ms, 1),
+            "turns_replayed": spec.replayed, "saved_ms": round(saved, 1)}
+
+def _speculation_for(callback_context) -> Optional[Speculation]:
+    spec = _ACTIVE.get(callback_context.state.get(K.CASE_ID))
+    return spec if spec is not None and callback_context.agent_name == spec.agent_name else None
+
+async def before_model(callback_context, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Specialist before_model_callback: replay the speculative run's response.
+
+    Waiting for a turn still being generated never outlasts the case deadline.
+    """
+    from app.callbacks.deadline import remaining  # deadline imports this module
+
+    spec = _speculation_for(callback_context)
+    if spec is None or spec.diverged or (spec.task is None and not spec.turns):
+        return None
+    left = remaining(callback_context.state)
+    timeout = REPLAY_TIMEOUT_S if left is None else max(0.0, min(REPLAY_TIMEOUT_S, left))
+    return await spec.next_turn(timeout=timeout)
+
+def record_model(callback_context, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """after_model_callback of the speculative specialists: keep each response for replay."""
+    spec = _speculation_for(callback_context)
+    if spec is not None and not llm_response.partial:
+        spec.add_turn(llm_response)
+    return None
+
+async def before_tool(tool, args: Dict[str, Any], tool_context) -> Optional[Dict[str, Any]]:
+    """Specialist before_tool_callback: use the prefetched lookup when the call matches it."""
+    spec = _speculation_for(tool_context)
+    if spec is None or not spec.matches(tool.name, args):
+        return None
+    start = time.perf_counter()
+    try:
+        result = await spec.lookup
+    except Exception:
+        return None
+    spec.lookup_wait_ms += (time.perf_counter() - start) * 1000
+    spec.lookup_used = True
+    return result
+
+def agent_started(callback_context) -> None:
+    """before_agent_callback: start the agent's wall clock."""
+    callback_context.state[f"temp:started:{callback_context.agent_name}"] = time.perf_counter()
+    return None
+
+def agent_finished(callback_context) -> None:
+    """after_agent_callback: record the agent's wall-clock time."""
+    started = callback_context.state.get(f"temp:started:{callback_context.agent_name}")
+    if started is not None:
+        TIMINGS.record(callback_context.agent_name, (time.perf_counter() - started) * 1000)
+    return None
@@ -0,0 +1,58 @@
+from typing import Any, Dict, Optional
+
+from app import state_keys as K
+from app.tools.keyword_router import route
+from app.tools.triage import urgency
+
+# The case type each specialist handles
+CASE_TYPES = {"HealthAgent": "health", "CrimeAgent": "crime", "DisasterAgent": "disaster"}
+# Directory tools whose result is the case's facility
+TARGET_TOOLS = ("nearest_hospital", "nearest_police", "nearest_shelter", "find_facilities")
+
+def _target(tool_name: str, result: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(result, dict):
+        return None
+    if tool_name == "find_facilities":
+        # Results are ordered nearest first
+        results = result.get("results") or []
+        return results[0] if results else None
+    return result or None
+
+def after_tool(tool, args: Dict[str, Any], tool_context, tool_response: Any) -> Optional[Dict[str, Any]]:
+    """Specialist after_tool_callback: keep the facility a directory tool found.
+
+    The model is asked to save its pick to state but cannot write state
+    itself, so the tool result is stored under ``K.TARGET`` here, with the
+    specialist's case type (and a shelter's incident type) when routing has
+    not set them. Urgency, which the specialists are asked for but cannot
+    save either, is set from the message by the same rules as mock mode.
+    BookingStep and ReplyStep read all of these from state.
+    """
+    if tool.name not in TARGET_TOOLS:
+        return None
+    target = _target(tool.name, tool_response)
+    if target is None:
+        return None
+    state = tool_context.state
+    state[K.TARGET] = target
+    case_type = CASE_TYPES.get(tool_context.agent_name)
+    if case_type and not state.get(K.CASE_TYPE):
+        state[K.CASE_TYPE] = case_type
+    if not state.get(K.URGENCY):
+        state[K.URGENCY] = urgency(state.get(K.CASE_TYPE), state.get("user_message"))
+    if tool.name == "nearest_shelter" and args.get("incident_type") and not state.get(K.INCIDENT):
+        state[K.INCIDENT] = args["incident_type"]
+    return None
+
+def after_lite_agent(callback_context) -> None:
+    """LiteAgent after_agent_callback: record the case type and urgency.
+
+    Lite cases call no specialist, so nothing else sets them; the keyword
+    router decides the case type as it does in mock mode.
+    """
+    state = callback_context.state
+    if not state.get(K.CASE_TYPE):
+        state[K.CASE_TYPE] = route(state.get("user_message"))["case_type"]
+    if not state.get(K.URGENCY):
+        state[K.URGENCY] = urgency(state.get(K.CASE_TYPE), state.get("user_message"))
+    return None
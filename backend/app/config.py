@@ -31,6 +31,95 @@ GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
 DEGRADED_BATTERY_PCT = int(os.getenv("DEGRADED_BATTERY_PCT", "20"))
 DEGRADED_MIN_KBPS = int(os.getenv("DEGRADED_MIN_KBPS", "64"))
 
+# Facility directory (files in app/data). Set HOSPITALS_CSV=pakistan_health_facilities.csv
+# for the full health dataset. Prebuilt snapshots (python -m app.tools.facility_store build)
+# are read from DIRECTORY_SNAPSHOT_DIR, defaulting to the data directory itself.
+HOSPITALS_CSV = os.getenv("HOSPITALS_CSV", "hospital.csv")
+POLICE_CSV = os.getenv("POLICE_CSV", "police_station.csv")
+SHELTERS_CSV = os.getenv("SHELTERS_CSV", "disaster_shelters.csv")
+# The facility files above: snapshotted by the build, the only CSVs treated as facilities
+FACILITY_CSVS = (HOSPITALS_CSV, POLICE_CSV, SHELTERS_CSV)
+# District polygons (GeoJSON) used to record the citizen's district on each case
+DISTRICT_BOUNDARIES = os.getenv("DISTRICT_BOUNDARIES", "district_boundaries.geojson")
+DIRECTORY_SNAPSHOT_DIR = os.getenv("DIRECTORY_SNAPSHOT_DIR", "")
+# Optional precomputed nearest-facility grid over Pakistan (cell size in degrees, 0 = off)
+DIRECTORY_GRID_DEG = float(os.getenv("DIRECTORY_GRID_DEG", "0"))
+# How often lookups check the hospital and police CSVs for changes and rebuild (seconds, 0 = never)
+DIRECTORY_WATCH_INTERVAL_S = float(os.getenv("DIRECTORY_WATCH_INTERVAL_S", "5"))
+# Live capacity updates (POST /admin/capacity) are batched and published at most this often
+CAPACITY_FLUSH_INTERVAL_S = float(os.getenv("CAPACITY_FLUSH_INTERVAL_S", "1"))
+
+# Slot inventory behind bookings: seats per slot, slot length, how far ahead slots
+# can be booked, the minimum lead time, and whether reservations are persisted
+BOOKING_SLOT_CAPACITY = int(os.getenv("BOOKING_SLOT_CAPACITY", "4"))
+BOOKING_SLOT_MINUTES = int(os.getenv("BOOKING_SLOT_MINUTES", "15"))
+BOOKING_HORIZON_HOURS = int(os.getenv("BOOKING_HORIZON_HOURS", "48"))
+BOOKING_LEAD_MINUTES = int(os.getenv("BOOKING_LEAD_MINUTES", "120"))
+BOOKING_PERSIST = os.getenv("BOOKING_PERSIST", "true").lower() == "true"
+# "step" books with a plain function call after the specialist; "llm" keeps the
+# BookingAgent model turn
+BOOKING_MODE = os.getenv("BOOKING_MODE", "step")
+# "template" renders the reply locally when state is complete (FollowUpAgent
+# otherwise); "llm" always uses the FollowUpAgent
+REPLY_MODE = os.getenv("REPLY_MODE", "template")
+
+# "agents" runs the ADK agent chain; "single" makes one structured Gemini call
+# and runs the directory/booking tools and the reply in Python
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "agents")
+
+# Tier-0 case classifier: confident predictions skip the orchestrator LLM call
+# (a confidence above 1 turns it off); a sampled fraction of confident cases
+# still goes through the orchestrator to measure the classifier's accuracy
+TIER0_CONFIDENCE = float(os.getenv("TIER0_CONFIDENCE", "0.8"))
+TIER0_AUDIT_RATE = float(os.getenv("TIER0_AUDIT_RATE", "0.05"))
+
+# Cache of generated specialist/FollowUp texts, keyed on normalized case features
+# (entries, seconds to live; 0 entries turns it off). RESPONSE_CACHE_DB adds a
+# SQLite second tier that survives restarts (empty = memory only)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_TTL_S = float(os.getenv("RESPONSE_CACHE_TTL_S", "21600"))
+RESPONSE_CACHE_DB = os.getenv("RESPONSE_CACHE_DB", "")
+
+# While the Orchestrator routes, start the keyword-predicted specialist's work:
+# "lookup" prefetches its directory lookup, "llm" also runs the specialist on a
+# scratch session and replays its responses if routing agrees; "off" (the
+# default) disables
+SPECULATIVE_MODE = os.getenv("SPECULATIVE_MODE", "off")
+
+# Near-duplicate clustering (opt-in): similar messages from the same grid cell
+# (degrees) within CLUSTER_WINDOW_S seconds reuse the first case's routing and
+# reply (0, the default, turns it off); members wait up to CLUSTER_WAIT_S for a
+# leader in flight
+CLUSTER_WINDOW_S = float(os.getenv("CLUSTER_WINDOW_S", "0"))
+CLUSTER_CELL_DEG = float(os.getenv("CLUSTER_CELL_DEG", "0.05"))
+CLUSTER_SIMILARITY = float(os.getenv("CLUSTER_SIMILARITY", "0.5"))
+CLUSTER_WAIT_S = float(os.getenv("CLUSTER_WAIT_S", "20"))
+
+# Latency budget per case (seconds from arrival, 0 = none). When it runs out, or
+# the next agent's mean time no longer fits, the agent run is stopped and the
+# case is completed from its state so far by the mock pipeline (degraded)
+REQUEST_DEADLINE_S = float(os.getenv("REQUEST_DEADLINE_S", "20"))
+
+# Circuit breaker per agent over its model calls: it opens when at least
+# CIRCUIT_ERROR_RATE of the last CIRCUIT_WINDOW calls (once CIRCUIT_MIN_CALLS
+# are in) raised or took longer than CIRCUIT_SLOW_MS. While open, cases go to
+# the mock pipeline; after CIRCUIT_OPEN_S one probe at a time tests recovery
+CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+CIRCUIT_ERROR_RATE = float(os.getenv("CIRCUIT_ERROR_RATE", "0.5"))
+CIRCUIT_SLOW_MS = float(os.getenv("CIRCUIT_SLOW_MS", "15000"))
+CIRCUIT_OPEN_S = float(os.getenv("CIRCUIT_OPEN_S", "30"))
+
+# ADK sessions are deleted once their case is saved; whatever is left behind
+# expires after SESSION_TTL_S idle seconds, at most SESSION_MAX are kept (least
+# recently used evicted first) and each keeps its last SESSION_MAX_EVENTS events
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_S", "900"))
+SESSION_MAX_EVENTS = int(os.getenv("SESSION_MAX_EVENTS", "50"))
+# SQLite file shared by all uvicorn workers for ADK sessions (WAL mode); empty
+# keeps them in the process above, which only works with a single worker
+SESSION_DB = os.getenv("SESSION_DB", "")
+
 # Persistence
 FIRESTORE_COLLECTION = os.getenv("FIRESTORE_COLLECTION", "cases")
 GCS_BUCKET = os.getenv("GCS_BUCKET", "frontline-artifacts")
@@ -61,3 +150,16 @@ if LLM_PROVIDER == 'vertex':
 # Database configuration
 DATABASE_TYPE = os.getenv("DATABASE_TYPE", "sqlite")  # "sqlite" | "firestore"
 SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "frontline_cases.db")
+# Threads that async handlers hand blocking database calls and notifications to,
+# so a slow write, RPC or SMS gateway does not stall the event loop
+DB_POOL_WORKERS = int(os.getenv("DB_POOL_WORKERS", "4"))
+NOTIFY_POOL_WORKERS = int(os.getenv("NOTIFY_POOL_WORKERS", "4"))
+# Case records and SMS are appended to this local SQLite outbox and delivered by
+# OUTBOX_WORKERS threads, retried with exponential backoff from OUTBOX_BACKOFF_S
+# up to OUTBOX_MAX_BACKOFF_S, OUTBOX_MAX_ATTEMPTS times (empty, the default =
+# save and send inside the request)
+OUTBOX_DB = os.getenv("OUTBOX_DB", "")
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "2"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_S = float(os.getenv("OUTBOX_BACKOFF_S", "0.5"))
+OUTBOX_MAX_BACKOFF_S = float(os.getenv("OUTBOX_MAX_BACKOFF_S", "60"))
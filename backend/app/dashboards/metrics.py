@@ -1,6 +1,6 @@
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
-from app.database.factory import get_db
+from app.database.factory import get_db, get_async_db
 from app.tools.storage import list_cases
 from app.callbacks.logging import structured_logger
 
@@ -14,6 +14,14 @@ def top_districts_since(hours: int = 24, limit: int = 5):
     db = get_db()
     return db.get_top_districts(hours, limit)
 
+async def counts_by_type_async(since_hours: int | None = None) -> Dict[str, Any]:
+    """Case counts by type, without blocking the event loop."""
+    return await get_async_db().count_cases_by_type(since_hours)
+
+async def top_districts_since_async(hours: int = 24, limit: int = 5):
+    """Top districts by case volume, without blocking the event loop."""
+    return await get_async_db().get_top_districts(hours, limit)
+
 class MetricsCollector:
     """Simple metrics collection for admin dashboard."""
     
@@ -0,0 +1,40 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from app.database.base import AsyncDatabaseInterface, DatabaseInterface
+
+class ThreadPoolDatabase(AsyncDatabaseInterface):
+    """Runs a blocking DatabaseInterface on its own thread pool.
+
+    A sqlite3 write or a Firestore RPC then waits in a pool thread instead of
+    stalling every request on the event loop. Both backends are safe to call
+    from several threads: SQLite opens a connection per call and the Firestore
+    client is thread-safe. The pool is separate from the one asyncio.to_thread
+    and sync FastAPI endpoints use, so a slow database cannot starve them.
+    """
+
+    def __init__(self, db: DatabaseInterface, max_workers: int = 4):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="db")
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def save_case(self, case_id: str, record: Dict[str, Any]) -> bool:
+        return await self._run(self.db.save_case, case_id, record)
+
+    async def get_case(self, case_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.db.get_case, case_id)
+
+    async def update_case(self, case_id: str, updates: Dict[str, Any]) -> bool:
+        return await self._run(self.db.update_case, case_id, updates)
+
+    async def list_cases(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        return await self._run(self.db.list_cases, limit, offset)
+
+    async def count_cases_by_type(self, since_hours: Optional[int] = None) -> Dict[str, Any]:
+        return await self._run(self.db.count_cases_by_type, since_hours)
+
+    async def get_top_districts(self, hours: int = 24, limit: int = 5) -> Dict[str, Any]:
+        return await self._run(self.db.get_top_districts, hours, limit)
@@ -34,4 +34,54 @@ class DatabaseInterface(ABC):
     def get_top_districts(self, hours: int = 24, limit: int = 5) -> Dict[str, Any]:
         """Get top districts by case volume."""
         pass
+    
+    @abstractmethod
+    def reserve_slot(self, facility_id: str, slot_start: datetime, seat: int,
+                     case_id: Optional[str] = None, note: str = "") -> bool:
+        """Record a slot reservation. Returns False if that seat is already taken
+        and raises on any other failure."""
+        pass
+    
+    @abstractmethod
+    def release_slot(self, facility_id: str, slot_start: datetime, seat: int) -> bool:
+        """Delete a slot reservation."""
+        pass
+    
+    @abstractmethod
+    def get_slot_reservations(self, facility_id: str, since: datetime) -> List[Dict[str, Any]]:
+        """List a facility's reservations (slot_start, seat) from the given time on.
+        Raises on failure."""
+        pass
 
+class AsyncDatabaseInterface(ABC):
+    """Awaitable counterpart of DatabaseInterface for async request handlers."""
+
+    @abstractmethod
+    async def save_case(self, case_id: str, record: Dict[str, Any]) -> bool:
+        """Save a case record."""
+        pass
+
+    @abstractmethod
+    async def get_case(self, case_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a case by ID."""
+        pass
+
+    @abstractmethod
+    async def update_case(self, case_id: str, updates: Dict[str, Any]) -> bool:
+        """Update a case record."""
+        pass
+
+    @abstractmethod
+    async def list_cases(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """List cases with pagination."""
+        pass
+
+    @abstractmethod
+    async def count_cases_by_type(self, since_hours: Optional[int] = None) -> Dict[str, Any]:
+        """Count cases by type."""
+        pass
+
+    @abstractmethod
+    async def get_top_districts(self, hours: int = 24, limit: int = 5) -> Dict[str, Any]:
+        """Get top districts by case volume."""
+        pass
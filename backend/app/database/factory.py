@@ -1,5 +1,6 @@
 from typing import Optional
-from app.database.base import DatabaseInterface
+from app.database.base import AsyncDatabaseInterface, DatabaseInterface
+from app.database.async_db import ThreadPoolDatabase
 from app.database.sqlite_db import SQLiteDatabase
 from app import config
 
@@ -15,17 +16,17 @@ def get_database() -> DatabaseInterface:
     db_type = config.DATABASE_TYPE.lower()
     
     if db_type == "sqlite":
-        return SQLiteDatabase()
+        return SQLiteDatabase(config.SQLITE_DB_PATH)
     elif db_type == "firestore":
         if FIRESTORE_AVAILABLE:
             return FirestoreDatabase()
         else:
             print("Firestore not available, falling back to SQLite")
-            return SQLiteDatabase()
+            return SQLiteDatabase(config.SQLITE_DB_PATH)
     else:
         # Default to SQLite for local development
         print(f"Unknown database type '{db_type}', defaulting to SQLite")
-        return SQLiteDatabase()
+        return SQLiteDatabase(config.SQLITE_DB_PATH)
 
 # Global database instance
 _db_instance: Optional[DatabaseInterface] = None
@@ -36,3 +37,12 @@ def get_db() -> DatabaseInterface:
     if _db_instance is None:
         _db_instance = get_database()
     return _db_instance
+
+_async_db_instance: Optional[AsyncDatabaseInterface] = None
+
+def get_async_db() -> AsyncDatabaseInterface:
+    """Get the global database for async code: the same backend, awaited on a thread pool."""
+    global _async_db_instance
+    if _async_db_instance is None:
+        _async_db_instance = ThreadPoolDatabase(get_db(), config.DB_POOL_WORKERS)
+    return _async_db_instance
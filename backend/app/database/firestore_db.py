@@ -5,10 +5,12 @@ from app import config
 
 try:
     from google.cloud import firestore
+    from google.api_core.exceptions import AlreadyExists
     FIRESTORE_AVAILABLE = True
 except ImportError:
     FIRESTORE_AVAILABLE = False
     firestore = None
+    AlreadyExists = None
 
 class FirestoreDatabase(DatabaseInterface):
     """Firestore implementation of the database interface."""
@@ -18,6 +20,7 @@ class FirestoreDatabase(DatabaseInterface):
             raise ImportError("Google Cloud Firestore is not available. Install google-cloud-firestore or use SQLite.")
         self.db = firestore.Client()
         self.collection = config.FIRESTORE_COLLECTION
+        self.slots_collection = f"{config.FIRESTORE_COLLECTION}_slots"
     
     def save_case(self, case_id: str, record: Dict[str, Any]) -> bool:
         """Save a case record to Firestore."""
@@ -92,7 +95,7 @@ class FirestoreDatabase(DatabaseInterface):
             for doc in q.stream():
                 data = doc.to_dict()
                 target = data.get("target", {}) or {}
-                district = target.get("district", "Unknown")
+                district = data.get("district") or target.get("district", "Unknown")
                 counts[district] = counts.get(district, 0) + 1
                 if data.get("lite"):
                     lite += 1
@@ -105,3 +108,52 @@ class FirestoreDatabase(DatabaseInterface):
         except Exception as e:
             print(f"Error getting top districts from Firestore: {e}")
             return {"top": [], "lite_pct": 0.0, "total": 0}
+    
+    def _slot_doc(self, facility_id: str, slot_start: datetime, seat: int):
+        # Document ids cannot contain "/"
+        doc_id = f"{facility_id}|{slot_start.isoformat()}|{seat}".replace("/", "_")
+        return self.db.collection(self.slots_collection).document(doc_id)
+    
+    def reserve_slot(self, facility_id: str, slot_start: datetime, seat: int,
+                     case_id: Optional[str] = None, note: str = "") -> bool:
+        """Create a slot reservation in Firestore; False if the seat is taken.
+
+        Other errors (network, permissions, quota) are raised.
+        """
+        try:
+            # create() fails if the document exists, so concurrent writers cannot both win
+            self._slot_doc(facility_id, slot_start, seat).create({
+                "facility_id": facility_id,
+                "slot_start": slot_start,
+                "seat": seat,
+                "case_id": case_id,
+                "note": note,
+                "created_at": datetime.utcnow(),
+            })
+            return True
+        except AlreadyExists:
+            return False
+    
+    def release_slot(self, facility_id: str, slot_start: datetime, seat: int) -> bool:
+        """Delete a slot reservation from Firestore."""
+        try:
+            self._slot_doc(facility_id, slot_start, seat).delete()
+            return True
+        except Exception as e:
+            print(f"Error releasing slot in Firestore: {e}")
+            return False
+    
+    def get_slot_reservations(self, facility_id: str, since: datetime) -> List[Dict[str, Any]]:
+        """List a facility's reservations from Firestore. Errors are raised."""
+        q = (self.db.collection(self.slots_collection)
+             .where("facility_id", "==", facility_id)
+             .where("slot_start", ">=", since))
+        reservations = []
+        for doc in q.stream():
+            data = doc.to_dict()
+            slot_start = data["slot_start"]
+            # Firestore returns timezone-aware timestamps; slots are naive UTC
+            if getattr(slot_start, "tzinfo", None) is not None:
+                slot_start = slot_start.replace(tzinfo=None)
+            reservations.append({"slot_start": slot_start, "seat": data["seat"]})
+        return reservations
@@ -32,14 +32,42 @@ class SQLiteDatabase(DatabaseInterface):
                     battery_pct INTEGER,
                     bandwidth_kbps INTEGER,
                     citizen_phone TEXT,
-                    lang TEXT DEFAULT 'en'
+                    lang TEXT DEFAULT 'en',
+                    district TEXT,
+                    cluster_id TEXT,
+                    degraded BOOLEAN DEFAULT FALSE
                 )
             """)
             
+            # Databases created before cases carried a district
+            columns = [row[1] for row in cursor.execute("PRAGMA table_info(cases)")]
+            if "district" not in columns:
+                cursor.execute("ALTER TABLE cases ADD COLUMN district TEXT")
+            # ... or a near-duplicate cluster
+            if "cluster_id" not in columns:
+                cursor.execute("ALTER TABLE cases ADD COLUMN cluster_id TEXT")
+            # ... or could be completed past their deadline
+            if "degraded" not in columns:
+                cursor.execute("ALTER TABLE cases ADD COLUMN degraded BOOLEAN DEFAULT FALSE")
+            
             # Create indexes for better performance
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_case_type ON cases(case_type)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON cases(created_at)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_urgency ON cases(urgency)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_district_created ON cases(created_at, district)")
+            
+            # One row per booked seat; the primary key makes double booking impossible
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS slot_reservations (
+                    facility_id TEXT NOT NULL,
+                    slot_start TIMESTAMP NOT NULL,
+                    seat INTEGER NOT NULL,
+                    case_id TEXT,
+                    note TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (facility_id, slot_start, seat)
+                )
+            """)
             
             conn.commit()
     
@@ -58,8 +86,8 @@ class SQLiteDatabase(DatabaseInterface):
                     INSERT OR REPLACE INTO cases 
                     (case_id, created_at, case_type, urgency, lite, target, booking, 
                      confirmation, user_message, location, battery_pct, bandwidth_kbps, 
-                     citizen_phone, lang)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     citizen_phone, lang, district, cluster_id, degraded)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     case_id,
                     record.get('created_at', datetime.utcnow()),
@@ -74,7 +102,10 @@ class SQLiteDatabase(DatabaseInterface):
                     record.get('battery_pct'),
                     record.get('bandwidth_kbps'),
                     record.get('citizen_phone'),
-                    record.get('lang', 'en')
+                    record.get('lang', 'en'),
+                    record.get('district'),
+                    record.get('cluster_id'),
+                    record.get('degraded', False)
                 ))
                 
                 conn.commit()
@@ -213,28 +244,20 @@ class SQLiteDatabase(DatabaseInterface):
                 cursor = conn.cursor()
                 
                 since_time = datetime.utcnow() - timedelta(hours=hours)
+                # Older cases have no district column value; use their target's district
                 cursor.execute("""
-                    SELECT target, lite, COUNT(*) as count
+                    SELECT COALESCE(district, json_extract(target, '$.district'), 'Unknown') AS d,
+                           COUNT(*) AS count, SUM(lite) AS lite_count
                     FROM cases 
                     WHERE created_at >= ?
-                    GROUP BY target
+                    GROUP BY d
                     ORDER BY count DESC
-                    LIMIT ?
-                """, (since_time, limit))
+                """, (since_time,))
                 
                 rows = cursor.fetchall()
-                districts = []
-                lite_count = 0
-                total = 0
-                
-                for target_json, lite, count in rows:
-                    if target_json:
-                        target = json.loads(target_json)
-                        district = target.get('district', 'Unknown')
-                        districts.append((district, count))
-                        if lite:
-                            lite_count += count
-                        total += count
+                districts = [(district, count) for district, count, _ in rows[:limit]]
+                total = sum(count for _, count, _ in rows)
+                lite_count = sum(lite or 0 for _, _, lite in rows)
                 
                 lite_pct = round((lite_count / total) * 100, 1) if total > 0 else 0.0
                 
@@ -246,4 +269,48 @@ class SQLiteDatabase(DatabaseInterface):
         except Exception as e:
             print(f"Error getting top districts from SQLite: {e}")
             return {"top": [], "lite_pct": 0.0, "total": 0}
+    
+    def reserve_slot(self, facility_id: str, slot_start: datetime, seat: int,
+                     case_id: Optional[str] = None, note: str = "") -> bool:
+        """Insert a slot reservation into SQLite; False if the seat is taken.
 
+        Other errors (a locked or unreadable database) are raised, not
+        reported as a taken seat.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("""
+                    INSERT INTO slot_reservations (facility_id, slot_start, seat, case_id, note)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (facility_id, slot_start, seat, case_id, note))
+                conn.commit()
+                return True
+        except sqlite3.IntegrityError:
+            return False
+    
+    def release_slot(self, facility_id: str, slot_start: datetime, seat: int) -> bool:
+        """Delete a slot reservation from SQLite."""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.execute("""
+                    DELETE FROM slot_reservations
+                    WHERE facility_id = ? AND slot_start = ? AND seat = ?
+                """, (facility_id, slot_start, seat))
+                conn.commit()
+                return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error releasing slot in SQLite: {e}")
+            return False
+    
+    def get_slot_reservations(self, facility_id: str, since: datetime) -> List[Dict[str, Any]]:
+        """List a facility's reservations from SQLite.
+
+        Errors are raised: an empty list would make every seat look free.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute("""
+                SELECT slot_start, seat FROM slot_reservations
+                WHERE facility_id = ? AND slot_start >= ?
+            """, (facility_id, since))
+            return [{"slot_start": datetime.fromisoformat(slot_start), "seat": seat}
+                    for slot_start, seat in cursor.fetchall()]
@@ -1,17 +1,34 @@
 import uuid
 import json
+import time
+import asyncio
 from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
 from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.sessions.base_session_service import GetSessionConfig
 from google.genai import types
-from app.schemas import CreateCase, CaseResponse, CaseRecord
-from app.runners import RUNNER
-from app.tools.storage import save_case, get_case
-from app.tools.notify import send_sms
+from app.schemas import CreateCase, CaseResponse, CaseRecord, CapacityFeedRequest
+from app.runners import RUNNER, FAST_RUNNERS, SPECULATIVE_RUNNERS, SESSION_SERVICE
+from app.tools.storage import save_case_async, get_case_async
+from app.tools.notify import send_sms_async
+from app.tools.outbox import OUTBOX
 from app.tools.degraded import detect_lite
-from app.dashboards.metrics import counts_by_type, top_districts_since
+from app.tools.capacity_feed import FEED as capacity_feed
+from app.tools.gazetteer import locate
+from app.tools.districts import resolve_district
+from app.tools.case_classifier import classify, STATS as tier0_stats
+from app.tools.case_clusters import CLUSTERS as case_clusters
+from app.tools.keyword_router import route
+from app.dashboards.metrics import counts_by_type, counts_by_type_async, top_districts_since_async
 from app.agents.equity_agent import equity_agent
 from app.agents.mock_agent import mock_run
+from app.agents.single_call import single_call_run
 from app.callbacks.logging import structured_logger, flow_logger_instance
+from app.callbacks.response_cache import CACHE as response_cache
+from app.callbacks import circuit, deadline, speculation
 from app.logging_config import setup_logging, log_separator, log_case_summary
 from app import state_keys as K
 from app import config
@@ -21,12 +38,132 @@ setup_logging()
 
 app = FastAPI(title="Frontline Citizen Service Assistant (ADK)")
 
+# Progress callback of process_case: awaited with an event name and its data
+Emit = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# Orchestrator tool calls that reveal its routing decision
+_ROUTED_AGENTS = {"HealthAgent": "health", "CrimeAgent": "crime", "DisasterAgent": "disaster", "LiteAgent": None}
+# The first agent of each tier-0 fast path (the unknown path has no model call up front)
+_FAST_PATH_AGENTS = {"health": "HealthAgent", "crime": "CrimeAgent", "disaster": "DisasterAgent", "lite": "LiteAgent"}
+
+async def _forward(event, notify):
+    """Report the routing, facility, booking and model text an ADK event carries."""
+    for call in event.get_function_calls():
+        if call.name in _ROUTED_AGENTS:
+            await notify("routing", case_type=_ROUTED_AGENTS[call.name], agent=call.name)
+    for response in event.get_function_responses():
+        result = response.response or {}
+        result = result.get("result", result)
+        if isinstance(result, dict) and (result.get("name") or result.get("station_name") or result.get("shelter_name")):
+            await notify("facility", target=result)
+    delta = event.actions.state_delta if event.actions else {}
+    if delta.get(K.CASE_TYPE):
+        await notify("routing", case_type=delta[K.CASE_TYPE], agent=event.author)
+    if delta.get(K.TARGET):
+        await notify("facility", target=delta[K.TARGET])
+    if delta.get(K.BOOKING):
+        await notify("booking", booking=delta[K.BOOKING])
+    parts = event.content.parts if event.content and event.content.parts else []
+    text = "".join(p.text for p in parts if p.text and not p.thought)
+    if text:
+        # Partial chunks (partial=true) are followed by the complete text (partial=false)
+        await notify("text", author=event.author, text=text, partial=bool(event.partial))
+
+def _seconds_left(deadline_at: Optional[float], cap: Optional[float] = None) -> Optional[float]:
+    """Time left before the case deadline, at most ``cap`` (None: no limit)."""
+    if deadline_at is None:
+        return cap
+    left = max(0.0, deadline_at - time.time())
+    return left if cap is None else min(left, cap)
+
+async def _complete_degraded(case_id: str, agent: str, reason: str, state: dict, notify) -> dict:
+    """Finish a case whose run missed its deadline (``reason`` "deadline"), hit
+    an open circuit ("circuit_open") or failed ("error") with mock_run's
+    deterministic logic, keeping the routing, facility and booking the agents
+    already produced."""
+    print(f"⏰ DEGRADED: {agent} ({reason}), completing case {case_id} with the mock pipeline")
+    await notify("degraded", agent=agent, reason=reason)
+    # Agent output that is not structured yet is recomputed
+    state = {k: v for k, v in state.items() if k not in (K.TARGET, K.BOOKING) or isinstance(v, dict)}
+    return await mock_run(state)
+
+async def _persist(case_id: str, record: dict, phone: Optional[str], confirmation: str):
+    """Save the case record and send the optional SMS: through the outbox (one
+    local append; its workers deliver and retry) or, without one, directly."""
+    sms = {"to": phone, "text": confirmation} if phone else None
+    if OUTBOX is not None:
+        OUTBOX.enqueue(case_id, record, sms)
+        print(f"\n📮 OUTBOX: Queued case record{' and SMS' if sms else ''} for {config.DATABASE_TYPE}")
+        return
+    print(f"\n💾 DATABASE: Saving to {config.DATABASE_TYPE}")
+    save_success = await save_case_async(case_id, record)
+    print(f"💾 DATABASE: {'✅ Success' if save_success else '❌ Failed'}")
+    if sms:
+        print(f"📱 NOTIFICATION: Sending SMS to {phone}")
+        await send_sms_async(phone, confirmation)
+
 @app.post("/cases", response_model=CaseResponse)
 async def create_case(req: CreateCase):
     """Create a new case and process it through the multi-agent workflow."""
+    return await process_case(req)
+
+@app.post("/cases/stream")
+async def create_case_stream(req: CreateCase):
+    """Create a case and stream its progress as Server-Sent Events.
+
+    The first event (``accepted``, with the case ID) is sent before any model
+    call; ``location``, ``routing``, ``facility``, ``booking`` and ``text``
+    (partial model output) follow as the agents produce them, and the stream
+    ends with ``record`` (the CaseResponse) or ``error``. The case is completed
+    and saved even if the client disconnects.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def emit(event: str, data: Dict[str, Any]):
+        await queue.put((event, data))
+
+    async def run():
+        try:
+            response = await process_case(req, emit)
+            await queue.put(("record", response.model_dump()))
+        except HTTPException as e:
+            await queue.put(("error", {"detail": e.detail}))
+        except Exception as e:
+            # Failures outside process_case's own fallback still end the stream cleanly
+            structured_logger.log_error(request_id="/cases/stream", error=e)
+            await queue.put(("error", {"detail": f"Internal Server Error: {e}"}))
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(run())
+
+    async def stream():
+        while (item := await queue.get()) is not None:
+            event, data = item
+            yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+        await task
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+async def process_case(req: CreateCase, emit: Optional[Emit] = None) -> CaseResponse:
+    """Run a case through the configured pipeline, save it and return the response.
+
+    ``emit``, if given, is awaited with progress events as they happen
+    (see /cases/stream).
+    """
     case_id = f"FC-{uuid.uuid4().hex[:8].upper()}"
+    deadline_at = time.time() + config.REQUEST_DEADLINE_S if config.REQUEST_DEADLINE_S > 0 else None
     # Session ids: stateless service; keep per-request session id = case_id
     user_id, session_id = "citizen", case_id
+    sent = set()
+
+    async def notify(event: str, **data):
+        if emit is not None:
+            sent.add(event)
+            await emit(event, data)
+
+    await notify("accepted", case_id=case_id)
     
     # Log request received
     structured_logger.log_request(
@@ -41,11 +178,20 @@ async def create_case(req: CreateCase):
         database_type=config.DATABASE_TYPE
     )
 
+    # Without coordinates, fall back to a place named in the message
+    location = {"lat": req.lat, "lon": req.lon}
+    if req.lat is None or req.lon is None:
+        place = locate(req.message)
+        if place:
+            location = {"lat": place["lat"], "lon": place["lon"], "place": place["name"]}
+            print(f"📍 LOCATION: Inferred {place['name']} ({place['kind']}) from message")
+            await notify("location", **location)
+
     # Build state and content for ADK
     initial_state = {
         K.CASE_ID: case_id,
         "user_message": req.message,
-        "location": {"lat": req.lat, "lon": req.lon},
+        "location": location,
         "battery_pct": req.battery_pct,
         "bandwidth_kbps": req.bandwidth_kbps,
         "lang": req.lang
@@ -53,8 +199,34 @@ async def create_case(req: CreateCase):
 
     # Precompute lite mode once using environment thresholds
     initial_state[K.LITE] = detect_lite(req.battery_pct, req.bandwidth_kbps)
+    # The agents check the budget before each agent and model call
+    if deadline_at is not None:
+        initial_state[K.DEADLINE] = deadline_at
 
+    cluster, leader, reused, degraded = None, True, None, False
     try:
+        if config.LLM_PROVIDER != "mock":
+            # Near-duplicates of a recent case from the same area reuse its result
+            cluster, leader = case_clusters.attach(case_id, req.message, location,
+                                                   initial_state[K.LITE], req.lang)
+            if not leader:
+                result = await cluster.wait(_seconds_left(deadline_at, config.CLUSTER_WAIT_S))
+                if result is not None:
+                    reused = await asyncio.to_thread(case_clusters.reuse, result, initial_state)
+                    await notify("routing", case_type=reused[K.CASE_TYPE], cluster_id=cluster.cluster_id)
+
+        # While the breaker of the agent a case would call first is open, the
+        # case goes straight to the mock pipeline
+        tier0, blocked = None, []
+        if config.LLM_PROVIDER != "mock" and reused is None:
+            if config.PIPELINE_MODE == "single":
+                first = "SingleCall"
+            else:
+                tier0 = classify(req.message)
+                first = (("LiteAgent" if initial_state[K.LITE] else _FAST_PATH_AGENTS.get(tier0["case_type"]))
+                         if tier0["skip"] else "Orchestrator")
+            blocked = circuit.BOARD.blocked([first] if first else [])
+
         if config.LLM_PROVIDER == "mock":
             # Mock mode: bypass LLM calls
             log_separator(f"PROCESSING CASE {case_id}", "🤖")
@@ -74,8 +246,61 @@ async def create_case(req: CreateCase):
                 lite=st.get(K.LITE, False),
                 target_name=target_name
             )
+        elif reused is not None:
+            log_separator(f"PROCESSING CASE {case_id}", "🤖")
+            print(f"Mode: CLUSTER {cluster.cluster_id} (leader {cluster.leader}) | Database: {config.DATABASE_TYPE}")
+            st = reused
+            confirmation = st[K.CONFIRMATION_TEXT]
+        elif blocked:
+            log_separator(f"PROCESSING CASE {case_id}", "🤖")
+            print(f"Mode: MOCK (circuit open: {', '.join(blocked)}) | Database: {config.DATABASE_TYPE}")
+            st = await _complete_degraded(case_id, blocked[0], "circuit_open", initial_state, notify)
+            confirmation = st[K.CONFIRMATION_TEXT]
+            degraded = True
+        elif config.PIPELINE_MODE == "single":
+            # One structured Gemini call; tools and the reply run in Python
+            log_separator(f"PROCESSING CASE {case_id}", "🤖")
+            print(f"Mode: SINGLE CALL | Database: {config.DATABASE_TYPE}")
+            deadline.STATS.case()
+            deadline.STATS.started("SingleCall")
+            breaker = circuit.BOARD.breaker("SingleCall")
+            started = time.perf_counter()
+            fallback = None
+            try:
+                if not breaker.allow():
+                    raise circuit.CircuitOpen("SingleCall")
+                async with asyncio.timeout(_seconds_left(deadline_at)):
+                    st = await single_call_run(initial_state)
+                breaker.record(True, (time.perf_counter() - started) * 1000)
+            except circuit.CircuitOpen as e:
+                fallback = (e.agent, "circuit_open")
+            except Exception as e:
+                breaker.record(False, (time.perf_counter() - started) * 1000)
+                if isinstance(e, TimeoutError):
+                    fallback = (deadline.missed(case_id, "SingleCall"), "deadline")
+                else:
+                    structured_logger.log_error(request_id=case_id, error=e, fallback_used=True)
+                    fallback = ("SingleCall", "error")
+            if fallback is not None:
+                st = await _complete_degraded(case_id, *fallback, initial_state, notify)
+                degraded = True
+            confirmation = st.get(K.CONFIRMATION_TEXT) or f"Your request has been recorded. Case ID: {case_id}"
         else:
             # Normal mode: use ADK runner
+            # Tier-0: a confident local prediction skips the Orchestrator turn
+            runner = RUNNER
+            if tier0["skip"]:
+                initial_state[K.CASE_TYPE] = tier0["case_type"]
+                runner = FAST_RUNNERS["lite" if initial_state[K.LITE] else tier0["case_type"]]
+                print(f"⚡ TIER-0: {tier0['case_type']} ({tier0['confidence']:.2f}), skipping Orchestrator")
+                await notify("routing", case_type=tier0["case_type"], confidence=tier0["confidence"])
+            elif config.SPECULATIVE_MODE != "off" and not initial_state[K.LITE]:
+                # Start the keyword-predicted specialist's work while the Orchestrator routes
+                predicted = route(req.message)
+                speculation.start(case_id, predicted["case_type"], initial_state, predicted["incident"],
+                                  SPECULATIVE_RUNNERS.get(predicted["case_type"])
+                                  if config.SPECULATIVE_MODE == "llm" else None)
+
             # Create session
             await RUNNER.session_service.create_session(app_name=RUNNER.app_name,
                                                         user_id=user_id,
@@ -84,16 +309,51 @@ async def create_case(req: CreateCase):
 
             # One-turn invocation
             content = types.Content(role="user", parts=[types.Part(text=req.message)])
-            events = RUNNER.run_async(user_id=user_id, session_id=session_id, new_message=content)
+            # Streaming clients get model text as it is generated
+            run_config = RunConfig(streaming_mode=StreamingMode.SSE) if emit is not None else None
+            events = runner.run_async(user_id=user_id, session_id=session_id, new_message=content,
+                                      run_config=run_config)
 
-            # Drain the events to ensure all processing is complete
-            async for _ in events:
-                pass
+            # Drain the events to ensure all processing is complete, within the case's
+            # budget; the agents themselves stop early when the next one would not fit
+            deadline.STATS.case()
+            fallback = None
+            try:
+                async with asyncio.timeout(_seconds_left(deadline_at)):
+                    async for event in events:
+                        if emit is not None:
+                            await _forward(event, notify)
+            except deadline.DeadlineExceeded as e:
+                fallback = (deadline.missed(case_id, e.agent, e.predicted), "deadline")
+            except TimeoutError:
+                fallback = (deadline.missed(case_id), "deadline")
+            except circuit.CircuitOpen as e:
+                fallback = (e.agent, "circuit_open")
+            except Exception as e:
+                # Model errors (already counted by the agent's breaker) fail over as well
+                structured_logger.log_error(request_id=case_id, error=e, fallback_used=True)
+                fallback = (deadline.running(case_id) or "pipeline", "error")
+            finally:
+                await events.aclose()
+                deadline.finish(case_id)
 
             # Get final state
             ses = await RUNNER.session_service.get_session(app_name=RUNNER.app_name,
-                                                         user_id=user_id, session_id=session_id)
+                                                         user_id=user_id, session_id=session_id,
+                                                         config=GetSessionConfig(num_recent_events=0))
             st = ses.state
+            # The case record keeps what is needed from the session
+            await RUNNER.session_service.delete_session(app_name=RUNNER.app_name, user_id=user_id,
+                                                        session_id=session_id)
+            tier0_stats.record(tier0["case_type"], tier0["confident"], tier0["skip"],
+                               None if tier0["skip"] else st.get(K.CASE_TYPE, "unknown"))
+            spec = speculation.finish(case_id, st.get(K.CASE_TYPE))
+            if spec:
+                print(f"🔮 SPECULATION: {spec['predicted']} {'committed' if spec['committed'] else 'discarded'}, "
+                      f"saved {spec['saved_ms']:.0f} ms")
+            if fallback is not None:
+                st = await _complete_degraded(case_id, *fallback, st, notify)
+                degraded = True
 
             # Normalize potentially string fields to dicts
             target_val = st.get(K.TARGET)
@@ -130,6 +390,17 @@ async def create_case(req: CreateCase):
             if 'called tool' in confirmation or 'For context:' in confirmation:
                 confirmation = f"Your request has been processed. Case ID: {case_id}"
 
+        if cluster is not None and leader:
+            case_clusters.complete(cluster, st, confirmation)
+
+        # Whatever the stream has not reported yet (all of it outside the agent chain)
+        if "routing" not in sent:
+            await notify("routing", case_type=st.get(K.CASE_TYPE, "unknown"))
+        if st.get(K.TARGET) and "facility" not in sent:
+            await notify("facility", target=st[K.TARGET])
+        if st.get(K.BOOKING) and "booking" not in sent:
+            await notify("booking", booking=st[K.BOOKING])
+
         # Persist record
         record = {
             "case_id": case_id,
@@ -139,17 +410,13 @@ async def create_case(req: CreateCase):
             "lite": st.get(K.LITE, False),
             "target": st.get(K.TARGET),
             "booking": st.get(K.BOOKING),
-            "confirmation": confirmation
+            "confirmation": confirmation,
+            "district": resolve_district(location["lat"], location["lon"]),
+            "cluster_id": cluster.cluster_id if cluster is not None and (leader or reused is not None) else None,
+            "degraded": degraded
         }
         
-        print(f"\n💾 DATABASE: Saving to {config.DATABASE_TYPE}")
-        save_success = save_case(case_id, record)
-        print(f"💾 DATABASE: {'✅ Success' if save_success else '❌ Failed'}")
-
-        # Optional SMS
-        if req.citizen_phone:
-            print(f"📱 NOTIFICATION: Sending SMS to {req.citizen_phone}")
-            send_sms(req.citizen_phone, confirmation)
+        await _persist(case_id, record, req.citizen_phone, confirmation)
 
         # Log response
         structured_logger.log_response(
@@ -167,9 +434,16 @@ async def create_case(req: CreateCase):
         print(f"   Response: {confirmation[:100]}{'...' if len(confirmation) > 100 else ''}")
         log_separator("", "🎉")
         
-        return CaseResponse(case_id=case_id, message=confirmation, record=record)
+        return CaseResponse(case_id=case_id, message=confirmation, record=record, degraded=degraded)
 
     except Exception as e:
+        speculation.finish(case_id)
+        deadline.finish(case_id)
+        if RUNNER is not None:
+            await RUNNER.session_service.delete_session(app_name=RUNNER.app_name, user_id=user_id,
+                                                        session_id=session_id)
+        if cluster is not None and leader:
+            case_clusters.fail(cluster)
         # Fallback response
         fallback_confirmation = f"Your request has been recorded. Case ID: {case_id}"
         fallback_record = {
@@ -180,12 +454,10 @@ async def create_case(req: CreateCase):
             "lite": True,
             "target": None,
             "booking": None,
-            "confirmation": fallback_confirmation
+            "confirmation": fallback_confirmation,
+            "district": resolve_district(location["lat"], location["lon"])
         }
-        save_case(case_id, fallback_record)
-
-        if req.citizen_phone:
-            send_sms(req.citizen_phone, fallback_confirmation)
+        await _persist(case_id, fallback_record, req.citizen_phone, fallback_confirmation)
 
         # Log error
         structured_logger.log_error(
@@ -197,9 +469,10 @@ async def create_case(req: CreateCase):
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
 
 @app.get("/cases/{case_id}", response_model=CaseRecord)
-def fetch_case(case_id: str):
+async def fetch_case(case_id: str):
     """Fetch a case by ID."""
-    case = get_case(case_id)
+    # A case still in the outbox is not in the database yet
+    case = (OUTBOX.pending_case(case_id) if OUTBOX is not None else None) or await get_case_async(case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     return case
@@ -218,11 +491,63 @@ def admin_metrics(hours: int | None = None):
     data["as_of_utc"] = datetime.utcnow().isoformat() + "Z"
     return data
 
+@app.post("/admin/capacity", status_code=202)
+def push_capacity(req: CapacityFeedRequest):
+    """Queue live capacity updates; they are published to the directory in the background."""
+    depth = capacity_feed.submit([u.model_dump(exclude_none=True) for u in req.updates])
+    return {"queued": len(req.updates), "queue_depth": depth}
+
+@app.get("/admin/capacity")
+def capacity_status():
+    """Capacity feed counters."""
+    return capacity_feed.stats
+
+@app.get("/admin/tier0")
+def tier0_status():
+    """Tier-0 classifier skip rate and agreement with the Orchestrator's decisions."""
+    return tier0_stats.stats
+
+@app.get("/admin/agents")
+def agent_timings():
+    """Wall-clock time per agent and the latency saved / work wasted by speculation."""
+    return speculation.TIMINGS.stats
+
+@app.get("/admin/deadlines")
+def deadline_status():
+    """Cases completed degraded after missing their deadline, and miss rates per agent."""
+    return {"budget_s": config.REQUEST_DEADLINE_S, **deadline.STATS.stats}
+
+@app.get("/admin/circuit")
+def circuit_status():
+    """Circuit breaker state, failure rate and latency per agent, and recent transitions."""
+    return circuit.BOARD.stats
+
+@app.get("/admin/sessions")
+def session_status():
+    """ADK sessions held (in memory, or in the shared SESSION_DB) and how many were deleted or expired."""
+    return SESSION_SERVICE.stats
+
+@app.get("/admin/outbox")
+def outbox_status():
+    """Outbox queue depth (pending, in flight, dead), oldest message age and delivery counts."""
+    if OUTBOX is None:
+        return {"enabled": False}
+    return {"enabled": True, **OUTBOX.stats}
+
+@app.get("/admin/clusters")
+def cluster_status():
+    """Near-duplicate clustering: live clusters and how many cases reused a leader's result."""
+    return case_clusters.stats
+
+@app.get("/admin/cache")
+def response_cache_status():
+    """Hit rate, size and evictions of the generated-response cache."""
+    return response_cache.stats
+
 @app.post("/admin/daily-summary")
 async def daily_summary():
     """Generate daily admin summary using equity agent."""
-    metrics24 = counts_by_type(24)
-    tops = top_districts_since(24)
+    metrics24, tops = await asyncio.gather(counts_by_type_async(24), top_districts_since_async(24))
 
     # Generate summary based on available data
     try:
@@ -259,7 +584,7 @@ async def daily_summary():
     # Send summary (for MVP, console SMS to admin number env or skip)
     admin_phone = None  # set env and inject if you want SMS
     if admin_phone:
-        send_sms(admin_phone, summary)
+        await send_sms_async(admin_phone, summary)
 
     return {"summary": summary, "metrics": metrics24, "tops": tops}
 
@@ -275,6 +600,7 @@ def root():
             "get_case": "GET /cases/{case_id}",
             "health": "GET /health",
             "admin_metrics": "GET /admin/metrics",
+            "capacity_feed": "POST /admin/capacity",
             "daily_summary": "POST /admin/daily-summary"
         }
     }
\ No newline at end of file
@@ -1,13 +1,17 @@
 import os
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.adk.artifacts import GcsArtifactService, InMemoryArtifactService
-from app.agents.orchestrator import root_agent
+from app.agents.orchestrator import root_agent, FAST_PATHS, SPECULATIVE_AGENTS
 from app.agents.mock_agent import mock_run
+from app.session_store import BoundedSessionService, SqliteSessionStore
 from app import config
 
 APP_NAME = "frontline_mvp"
-SESSION_SERVICE = InMemorySessionService()  # ok for MVP
+if config.SESSION_DB:
+    # Several workers: a case's session must be readable by whichever one runs it
+    SESSION_SERVICE = SqliteSessionStore(config.SESSION_DB, config.SESSION_TTL_S)
+else:
+    SESSION_SERVICE = BoundedSessionService(config.SESSION_MAX, config.SESSION_TTL_S, config.SESSION_MAX_EVENTS)
 try:
     ARTIFACT_SERVICE = GcsArtifactService(bucket_name=os.environ["GCS_BUCKET"])
 except Exception:
@@ -17,8 +21,20 @@ except Exception:
 if config.LLM_PROVIDER == "mock":
     # For mock mode, we'll use a custom runner that bypasses LLM calls
     RUNNER = None  # Will be handled specially in main.py
+    FAST_RUNNERS = {}
+    SPECULATIVE_RUNNERS = {}
 else:
     RUNNER = Runner(agent=root_agent, app_name=APP_NAME,
                     session_service=SESSION_SERVICE,
                     artifact_service=ARTIFACT_SERVICE)
-
+    # Tier-0 fast paths share the session service, so sessions created for
+    # RUNNER can be run by any of them
+    FAST_RUNNERS = {key: Runner(agent=agent, app_name=APP_NAME,
+                                session_service=SESSION_SERVICE,
+                                artifact_service=ARTIFACT_SERVICE)
+                    for key, agent in FAST_PATHS.items()}
+    # Speculative specialist runs (SPECULATIVE_MODE=llm), on scratch sessions
+    SPECULATIVE_RUNNERS = {key: Runner(agent=agent, app_name=APP_NAME,
+                                       session_service=SESSION_SERVICE,
+                                       artifact_service=ARTIFACT_SERVICE)
+                           for key, agent in SPECULATIVE_AGENTS.items()}
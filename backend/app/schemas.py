@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 
 class CreateCase(BaseModel):
     message: str
@@ -14,6 +14,8 @@ class CaseResponse(BaseModel):
     case_id: str
     message: str
     record: dict
+    # True when the deadline cut the agent run short and mock_run finished the case
+    degraded: bool = False
 
 class CaseRecord(BaseModel):
     case_id: str
@@ -23,4 +25,18 @@ class CaseRecord(BaseModel):
     target: Optional[dict] = None
     booking: Optional[dict] = None
     confirmation: str
+    district: Optional[str] = None
+    cluster_id: Optional[str] = None
+    degraded: bool = False
 
+
+class CapacityUpdate(BaseModel):
+    facility_id: str
+    kind: Literal["hospital", "police"] = "hospital"
+    beds_available: Optional[int] = None
+    ventilators_available: Optional[int] = None
+    blood_availability: Optional[int] = None
+    mode: Literal["set", "add"] = "set"
+
+class CapacityFeedRequest(BaseModel):
+    updates: List[CapacityUpdate]
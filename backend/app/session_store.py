@@ -0,0 +1,170 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import aiosqlite
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.sqlite_session_service import SqliteSessionService
+
+class BoundedSessionService(InMemorySessionService):
+    """InMemorySessionService that cannot grow without bound.
+
+    Sessions are kept in least-recently-used order: one untouched (no create,
+    get or event) for ``ttl_s`` seconds is dropped, and past ``max_sessions``
+    the least recently used one is evicted. Each stored session keeps only its
+    last ``max_events`` events; its state is untouched. process_case deletes a
+    case's session once the case is saved, so these limits only catch what
+    is left behind. ``max_sessions`` should stay well above the number of
+    cases in flight, whose sessions must not be evicted mid-run.
+
+    Reads and writes go through the parent's get_session/append_event; only
+    eviction and compaction touch its public ``sessions`` mapping directly
+    (ADK's own delete_session copies the whole session first).
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl_s: float = 900, max_events: int = 50):
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.ttl_s = ttl_s
+        self.max_events = max_events
+        self._lru: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        self._counts = {"created": 0, "deleted": 0, "evicted": 0, "expired": 0, "events_dropped": 0}
+
+    def _touch(self, key: Tuple[str, str, str]):
+        self._lru[key] = time.monotonic()
+        self._lru.move_to_end(key)
+
+    def _drop(self, key: Tuple[str, str, str]):
+        self._lru.pop(key, None)
+        app_name, user_id, session_id = key
+        sessions = self.sessions.get(app_name, {}).get(user_id)
+        if sessions is not None:
+            sessions.pop(session_id, None)
+            if not sessions:
+                del self.sessions[app_name][user_id]
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._lru:
+            key, touched = next(iter(self._lru.items()))
+            if now - touched >= self.ttl_s:
+                self._counts["expired"] += 1
+            elif len(self._lru) > self.max_sessions:
+                self._counts["evicted"] += 1
+            else:
+                return
+            self._drop(key)
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[Dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session = await super().create_session(app_name=app_name, user_id=user_id, state=state,
+                                                session_id=session_id)
+        self._counts["created"] += 1
+        self._touch((app_name, user_id, session.id))
+        self._evict()
+        return session
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        touched = self._lru.get(key)
+        if touched is not None and time.monotonic() - touched >= self.ttl_s:
+            self._counts["expired"] += 1
+            self._drop(key)
+            return None
+        # The copy ADK makes covers at most max_events events
+        session = await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id,
+                                            config=config)
+        if session is not None:
+            self._touch(key)
+        return session
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        if key in self._lru:
+            self._counts["deleted"] += 1
+        self._drop(key)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session=session, event=event)
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        self._touch(key)
+        # Only the stored copy is compacted; the run holds its own
+        stored = self.sessions[session.app_name][session.user_id][session.id]
+        extra = len(stored.events) - self.max_events
+        if extra > 0:
+            del stored.events[:extra]
+            self._counts["events_dropped"] += extra
+        return event
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "store": "memory",
+            "sessions": len(self._lru),
+            "max_sessions": self.max_sessions,
+            "ttl_s": self.ttl_s,
+            "max_events": self.max_events,
+            **self._counts,
+        }
+
+class SqliteSessionStore(SqliteSessionService):
+    """ADK's SQLite session service on a WAL database shared by all workers.
+
+    WAL lets one worker write while the others read, and each connection
+    waits up to ``busy_timeout_s`` for a writer instead of failing. Sessions
+    are deleted after their case like in memory; ones idle for ``ttl_s`` are
+    purged (with their events) at most every ``purge_interval_s`` seconds, by
+    whichever worker creates a session next.
+    """
+
+    def __init__(self, db_path: str, ttl_s: float = 900, purge_interval_s: float = 60,
+                 busy_timeout_s: float = 5.0):
+        super().__init__(db_path)
+        self.db_path = db_path
+        self.ttl_s = ttl_s
+        self.purge_interval_s = purge_interval_s
+        self.busy_timeout_s = busy_timeout_s
+        self._purged_at = time.monotonic()
+        self._counts = {"created": 0, "deleted": 0, "expired": 0}
+        # The journal mode is stored in the database file, so once is enough
+        with sqlite3.connect(db_path, timeout=busy_timeout_s) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[Dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session = await super().create_session(app_name=app_name, user_id=user_id, state=state,
+                                                session_id=session_id)
+        self._counts["created"] += 1
+        if time.monotonic() - self._purged_at >= self.purge_interval_s:
+            self._purged_at = time.monotonic()
+            await self.purge()
+        return session
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        self._counts["deleted"] += 1
+
+    async def purge(self) -> int:
+        """Delete sessions (and their events) idle for ``ttl_s`` seconds."""
+        async with aiosqlite.connect(self.db_path, timeout=self.busy_timeout_s) as db:
+            await db.execute("PRAGMA foreign_keys = ON")
+            cursor = await db.execute("DELETE FROM sessions WHERE update_time < ?", (time.time() - self.ttl_s,))
+            await db.commit()
+        self._counts["expired"] += cursor.rowcount
+        return cursor.rowcount
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        try:
+            with sqlite3.connect(self.db_path, timeout=self.busy_timeout_s) as conn:
+                sessions = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        except sqlite3.OperationalError:
+            sessions = 0  # no session created yet
+        # Counts are this worker's; the session count is the shared table's
+        return {"store": "sqlite", "db_path": self.db_path, "sessions": sessions, "ttl_s": self.ttl_s, **self._counts}
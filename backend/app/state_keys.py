@@ -2,6 +2,7 @@
 
 CASE_ID = "case_id"
 CASE_TYPE = "case_type"              # "health" | "crime" | "disaster" | "unknown"
+INCIDENT = "incident_type"           # disaster cases: "Flood" | "Earthquake" | "Fire" | ...
 URGENCY = "urgency"                  # "low" | "medium" | "high" | "critical"
 LITE = "lite"                        # bool
 USER_MESSAGE = "user_message"
@@ -9,4 +10,5 @@ LOCATION = "location"                # {"lat":..., "lon":...}
 TARGET = "target"                    # service dict returned by directory tool
 BOOKING = "booking"                  # dict of booking info
 CONFIRMATION_TEXT = "confirmation_text"
+DEADLINE = "deadline"                # epoch seconds by which the case must be answered
 
@@ -0,0 +1,83 @@
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple
+
+class AhoCorasick:
+    """Multi-pattern string matcher.
+
+    All patterns are found in a single pass over the text, so matching cost
+    grows with the length of the text (and the number of hits), not with the
+    number of patterns. Add patterns, call ``build`` once, then ``find``.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per node: (pattern length, value) for every pattern ending there,
+        # including those reached through failure links
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._patterns = 0
+        self._built = False
+
+    def add(self, pattern: str, value: Any = None):
+        """Register a pattern; ``value`` is returned with each of its matches."""
+        if not pattern:
+            return
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), pattern if value is None else value))
+        self._patterns += 1
+        self._built = False
+
+    def build(self) -> "AhoCorasick":
+        """Compute failure links (breadth-first) and merge outputs along them."""
+        queue = deque(self._goto[0].values())
+        for child in queue:
+            self._fail[child] = 0
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+        self._built = True
+        return self
+
+    def find(self, text: str, word_boundary: bool = True) -> Iterator[Tuple[int, int, Any]]:
+        """Yield ``(start, end, value)`` for every occurrence, in order of end position.
+
+        With ``word_boundary`` a match must not be preceded or followed by a
+        letter or digit, so "pain" does not match inside "painter".
+        """
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        n = len(text)
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            if word_boundary and i + 1 < n and text[i + 1].isalnum():
+                continue
+            for length, value in out[node]:
+                start = i - length + 1
+                if word_boundary and start > 0 and text[start - 1].isalnum():
+                    continue
+                yield start, i + 1, value
+
+    def __len__(self) -> int:
+        return self._patterns
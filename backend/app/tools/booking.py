@@ -1,12 +1,63 @@
+import json
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
-def mock_book(target: Dict[str, Any], citizen_note: Optional[str] = None) -> Dict[str, Any]:
-    """Mock booking system that creates a reservation slot."""
-    slot = datetime.utcnow() + timedelta(hours=2)
+from app import config
+from app import state_keys as K
+from app.tools.slots import INVENTORY
+
+# Columns that identify a facility, most specific first
+_FACILITY_KEYS = ("uuid", "osm_id", "record_id", "name", "station_name", "shelter_name")
+
+def facility_id(target: Dict[str, Any]) -> str:
+    for key in _FACILITY_KEYS:
+        if target.get(key):
+            return f"{key}:{target[key]}"
+    return "unknown"
+
+def target_from_state(state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The target facility in session state as a dict.
+
+    Agents sometimes write it as a JSON string or a bare name.
+    """
+    target = state.get(K.TARGET)
+    if isinstance(target, str):
+        try:
+            target = json.loads(target)
+        except ValueError:
+            target = {"name": target}
+    return target if isinstance(target, dict) and target else None
+
+def mock_book(target: Dict[str, Any], citizen_note: Optional[str] = None,
+              case_id: Optional[str] = None) -> Dict[str, Any]:
+    """Reserve the earliest free slot at the target facility (at least BOOKING_LEAD_MINUTES ahead).
+
+    Returns confirmed=False when the facility has no free slot within the booking
+    horizon or the reservation could not be written. Booking the same case again
+    at the same facility returns its existing slot.
+    """
+    place = target.get("name") or target.get("station_name") or "Service Desk"
+    earliest = datetime.utcnow() + timedelta(minutes=config.BOOKING_LEAD_MINUTES)
+    reason = "No free slots in the booking window"
+    try:
+        reservation = INVENTORY.reserve(facility_id(target), earliest, case_id=case_id,
+                                        note=citizen_note or "")
+    except Exception as e:
+        print(f"Error reserving slot: {e}")
+        reservation, reason = None, "Booking is unavailable right now"
+    if reservation is None:
+        return {
+            "confirmed": False,
+            "place": place,
+            "slot_iso": None,
+            "slot_human": None,
+            "note": citizen_note or "",
+            "reason": reason,
+        }
+    slot = reservation["slot_start"]
     return {
         "confirmed": True,
-        "place": target.get("name") or target.get("station_name") or "Service Desk",
+        "place": place,
         "slot_iso": slot.isoformat() + "Z",
         "slot_human": slot.strftime("%d %b, %I:%M %p"),
         "note": citizen_note or ""
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from app import config
+from app.tools import directory as t_dir
+
+# Rejected updates listed in the stats, most recent last
+MAX_REJECTED_KEPT = 20
+
+class CapacityFeed:
+    """Queue of live capacity updates, published to the directory in the background.
+
+    ``submit`` only appends to a queue, so the API returns immediately. A
+    single worker thread drains the queue every ``flush_interval_s``,
+    coalesces everything pending into one batch per facility kind and
+    publishes each batch as a new directory snapshot, so a burst of hundreds
+    of updates costs one rebuild rather than hundreds. Updates that cannot be
+    applied are counted and the latest ones kept in ``last_rejected``; the
+    rest of their batch is still published.
+    """
+
+    def __init__(self, flush_interval_s: float = 1.0):
+        self.flush_interval_s = flush_interval_s
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.received = 0
+        self.applied = 0
+        self.unknown = 0
+        self.rejected = 0
+        self.last_rejected: List[Dict[str, Any]] = []
+        self.batches = 0
+        self.last_publish_ms = 0.0
+        self.last_error = None
+
+    def submit(self, updates: List[Dict[str, Any]]) -> int:
+        """Queue updates for the next publish. Returns the queue depth."""
+        with self._lock:
+            self._pending.extend(updates)
+            self.received += len(updates)
+            depth = len(self._pending)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="capacity-feed", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return depth
+
+    def flush(self) -> Dict[str, Any]:
+        """Publish everything queued so far on the calling thread."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        by_kind: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for update in pending:
+            by_kind[update.get("kind") or "hospital"].append(update)
+
+        result = {"applied": 0, "unknown": [], "rejected": []}
+        for kind, updates in by_kind.items():
+            start = time.perf_counter()
+            try:
+                published = t_dir.apply_capacity_updates(kind, updates)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Error applying capacity updates for {kind}: {e}")
+                published = {"applied": 0, "unknown": [], "rejected": [
+                    {"facility_id": str(u.get("facility_id", "")), "error": str(e)} for u in updates]}
+            else:
+                self.last_publish_ms = (time.perf_counter() - start) * 1000
+                self.batches += 1
+            self.applied += published["applied"]
+            self.unknown += len(published["unknown"])
+            self.rejected += len(published["rejected"])
+            result["applied"] += published["applied"]
+            result["unknown"].extend(published["unknown"])
+            result["rejected"].extend(published["rejected"])
+        if result["rejected"]:
+            self.last_rejected = result["rejected"][-MAX_REJECTED_KEPT:]
+        return result
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            # Let a burst accumulate so it is published as one snapshot
+            time.sleep(self.flush_interval_s)
+            self._wake.clear()
+            self.flush()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = len(self._pending)
+        return {
+            "queued": queued,
+            "received": self.received,
+            "applied": self.applied,
+            "unknown": self.unknown,
+            "rejected": self.rejected,
+            "last_rejected": self.last_rejected,
+            "batches": self.batches,
+            "last_publish_ms": round(self.last_publish_ms, 2),
+            "last_error": self.last_error,
+        }
+
+FEED = CapacityFeed(config.CAPACITY_FLUSH_INTERVAL_S)
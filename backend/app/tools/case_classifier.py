@@ -0,0 +1,199 @@
+import csv
+import pathlib
+import random
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app import config
+from app.tools.gazetteer import normalize
+from app.tools.keyword_router import KEYWORDS_CSV
+
+DATA_DIR = pathlib.Path(__file__).parent.parent / "data"
+LABELLED_CSV = DATA_DIR / "labelled_cases.csv"
+
+CASE_TYPES = ("health", "crime", "disaster", "unknown")
+
+def _features(text: str) -> List[str]:
+    """Word unigrams and bigrams plus character trigrams inside each word.
+
+    The trigrams let Roman-Urdu spelling variants ("bukhar"/"bukhaar",
+    "selab"/"sailab") share most of their features.
+    """
+    words = normalize(text or "").split()
+    feats = [f"w:{w}" for w in words]
+    feats += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"<{w}>"
+        feats += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return feats
+
+class HashedNgramClassifier:
+    """Multinomial logistic regression over hashed n-gram counts, in NumPy.
+
+    Features are hashed (CRC32, so stable across processes) into ``dim``
+    buckets and L2-normalised; one weight matrix maps them to a softmax over
+    the labels. Small enough to train at import time from a few hundred
+    labelled messages and to score a message in tens of microseconds.
+    """
+
+    def __init__(self, labels: Sequence[str] = CASE_TYPES, dim: int = 1 << 13):
+        self.labels = tuple(labels)
+        self.dim = dim
+        self.W = np.zeros((dim, len(self.labels)), dtype=np.float32)
+        self.b = np.zeros(len(self.labels), dtype=np.float32)
+
+    def _vector(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse features as (bucket indices, weights), L2-normalised."""
+        counts: Dict[int, float] = {}
+        for f in _features(text):
+            idx = zlib.crc32(f.encode("utf-8")) % self.dim
+            counts[idx] = counts.get(idx, 0.0) + 1.0
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        idx = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        val = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        return idx, val / np.linalg.norm(val)
+
+    def _matrix(self, texts: Sequence[str]) -> np.ndarray:
+        X = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            idx, val = self._vector(text)
+            X[row, idx] = val
+        return X
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str], epochs: int = 300,
+            lr: float = 10.0, l2: float = 1e-5) -> "HashedNgramClassifier":
+        """Full-batch gradient descent on the cross-entropy loss."""
+        X = self._matrix(texts)
+        # Buckets no training text hashes into keep zero weight; leave them out
+        cols = np.flatnonzero(X.any(axis=0))
+        X = X[:, cols]
+        Y = np.zeros((len(texts), len(self.labels)), dtype=np.float32)
+        Y[np.arange(len(texts)), [self.labels.index(l) for l in labels]] = 1.0
+        W = np.zeros((len(cols), len(self.labels)), dtype=np.float32)
+        b = np.zeros(len(self.labels), dtype=np.float32)
+        for _ in range(epochs):
+            G = (_softmax(X @ W + b) - Y) / len(texts)
+            W -= lr * (X.T @ G + l2 * W)
+            b -= lr * G.sum(axis=0)
+        self.W[:] = 0.0
+        self.W[cols] = W
+        self.b[:] = b
+        return self
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        idx, val = self._vector(text)
+        return _softmax(val @ self.W[idx] + self.b)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely label and its probability."""
+        p = self.predict_proba(text)
+        best = int(np.argmax(p))
+        return self.labels[best], float(p[best])
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
+
+def load_training_data(path: pathlib.Path = LABELLED_CSV,
+                       keywords: pathlib.Path = KEYWORDS_CSV) -> Tuple[List[str], List[str]]:
+    """Labelled messages plus every routing keyword as a one-phrase example.
+
+    The labelled file is small; the keyword table gives the model the
+    multilingual vocabulary the messages alone do not cover.
+    """
+    texts, labels = [], []
+    for source, column in ((path, "text"), (keywords, "keyword")):
+        with open(source, newline="", encoding="utf-8") as f:
+            for r in csv.DictReader(f):
+                if r.get(column) and r.get("case_type") in CASE_TYPES:
+                    texts.append(r[column])
+                    labels.append(r["case_type"])
+    return texts, labels
+
+class Tier0Stats:
+    """Skip rate of the tier-0 classifier and its agreement with the orchestrator.
+
+    Confident predictions skip the orchestrator, so there is no LLM decision
+    to compare them with; a sampled fraction (``TIER0_AUDIT_RATE``) still
+    goes through the orchestrator to measure how accurate the skips are.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._cases = 0
+            self._skipped = 0
+            self._audited = 0
+            self._audited_agree = 0
+            self._compared = 0
+            self._compared_agree = 0
+            self._by_type: Dict[str, int] = {}
+
+    def record(self, predicted: str, confident: bool, skipped: bool, llm_case_type: Optional[str] = None):
+        """One case: the prediction, whether it cleared the threshold, whether the
+        orchestrator was skipped and, when it ran, the case type it chose."""
+        with self._lock:
+            self._cases += 1
+            if skipped:
+                self._skipped += 1
+                self._by_type[predicted] = self._by_type.get(predicted, 0) + 1
+            if llm_case_type is None:
+                return
+            agree = predicted == llm_case_type
+            self._compared += 1
+            self._compared_agree += agree
+            if confident:
+                self._audited += 1
+                self._audited_agree += agree
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "threshold": config.TIER0_CONFIDENCE,
+                "cases": self._cases,
+                "skipped": self._skipped,
+                "skip_rate": round(self._skipped / self._cases, 4) if self._cases else 0.0,
+                "skipped_by_type": dict(self._by_type),
+                # Confident predictions the orchestrator also decided (audit sample)
+                "audited": self._audited,
+                "audited_accuracy": round(self._audited_agree / self._audited, 4) if self._audited else None,
+                # Every prediction the orchestrator also decided, confident or not
+                "compared": self._compared,
+                "agreement": round(self._compared_agree / self._compared, 4) if self._compared else None,
+            }
+
+STATS = Tier0Stats()
+_classifier: Optional[HashedNgramClassifier] = None
+_load_lock = threading.Lock()
+_audit_rng = random.Random()
+
+def get_classifier() -> HashedNgramClassifier:
+    """The classifier trained on app/data/labelled_cases.csv and the routing
+    keywords (trained on first use, well under a second)."""
+    global _classifier
+    if _classifier is None:
+        with _load_lock:
+            if _classifier is None:
+                _classifier = HashedNgramClassifier().fit(*load_training_data())
+    return _classifier
+
+def classify(text: str) -> Dict[str, Any]:
+    """Tier-0 decision for a message.
+
+    ``skip`` is True when the prediction clears ``TIER0_CONFIDENCE`` and the
+    case was not drawn for the orchestrator audit sample.
+    """
+    case_type, confidence = get_classifier().predict(text)
+    confident = confidence >= config.TIER0_CONFIDENCE
+    audit = confident and _audit_rng.random() < config.TIER0_AUDIT_RATE
+    return {"case_type": case_type, "confidence": confidence, "confident": confident,
+            "skip": confident and not audit}
@@ -0,0 +1,216 @@
+import asyncio
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app import config
+from app import state_keys as K
+from app.callbacks.response_cache import from_template, to_template
+from app.tools import booking as t_booking
+from app.tools.gazetteer import normalize
+from app.tools.renderer import render
+
+NUM_PERM = 64
+# 32 bands x 2 rows: pairs at 0.5 Jaccard share a band with ~99.99% probability;
+# candidates are then checked against the full signature
+BANDS = 32
+SHINGLE = 3
+_PRIME = np.uint64(4294967311)
+_rng = np.random.RandomState(17)
+_A = _rng.randint(1, 1 << 31, NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 1 << 31, NUM_PERM).astype(np.uint64)
+
+def _shingles(text: str) -> List[int]:
+    """crc32 of the character 3-grams of the normalized message."""
+    text = " ".join(normalize(text or "").split())
+    if len(text) < SHINGLE:
+        return [zlib.crc32(text.encode("utf-8"))]
+    return list({zlib.crc32(text[i:i + SHINGLE].encode("utf-8")) for i in range(len(text) - SHINGLE + 1)})
+
+def minhash(text: str) -> np.ndarray:
+    """NUM_PERM-value MinHash signature of a message."""
+    h = np.array(_shingles(text), dtype=np.uint64)
+    return ((np.outer(h, _A) + _B) % _PRIME).min(axis=0)
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two messages' shingle sets."""
+    return float(np.mean(a == b))
+
+class Cluster:
+    """Near-duplicate cases from one area and time window.
+
+    The first case (the leader) runs the pipeline; later members wait for its
+    result while it is in flight and reuse it afterwards.
+    """
+
+    def __init__(self, cluster_id: str, leader: str, signature: np.ndarray, created_at: float):
+        self.cluster_id = cluster_id
+        self.leader = leader
+        self.signature = signature
+        self.created_at = created_at
+        self.members = 1
+        self.result: Optional[Dict[str, Any]] = None
+        self.failed = False
+        self._done = asyncio.Event()
+
+    @property
+    def in_flight(self) -> bool:
+        return not self._done.is_set()
+
+    async def wait(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """The leader's result, or None if it failed or took longer than ``timeout``."""
+        if self.in_flight:
+            try:
+                await asyncio.wait_for(self._done.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.result
+
+class ClusterIndex:
+    """Online MinHash/LSH index of recent cases, bucketed by geography and time.
+
+    Band hashes are indexed per grid cell (``cell_deg`` degrees), lite flag and
+    language; a case is compared with clusters in its own and the eight
+    neighbouring cells. A cluster accepts members for ``window_s`` seconds
+    after its leader arrived, then a new one forms so advice is refreshed.
+    """
+
+    def __init__(self, window_s: float = 600, cell_deg: float = 0.05, threshold: float = 0.5):
+        self.window_s = window_s
+        self.cell_deg = cell_deg
+        self.threshold = threshold
+        self._clusters: "OrderedDict[str, Tuple[Cluster, List[tuple]]]" = OrderedDict()
+        self._buckets: Dict[tuple, List[str]] = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_s > 0
+
+    def reset_stats(self):
+        with self._lock:
+            self._cases = 0
+            self._attached = 0
+            self._reused = 0
+            self._leader_failures = 0
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(lat // self.cell_deg), int(lon // self.cell_deg)
+
+    def _expire(self, now: float):
+        while self._clusters:
+            cluster_id, (cluster, _) = next(iter(self._clusters.items()))
+            if now - cluster.created_at < self.window_s:
+                return
+            self._drop(cluster_id)
+
+    def _drop(self, cluster_id: str):
+        _, keys = self._clusters.pop(cluster_id)
+        for key in keys:
+            ids = self._buckets.get(key)
+            if ids and cluster_id in ids:
+                ids.remove(cluster_id)
+                if not ids:
+                    del self._buckets[key]
+
+    def attach(self, case_id: str, message: str, location: Optional[Dict[str, Any]],
+               lite: bool = False, lang: Optional[str] = "en",
+               now: Optional[float] = None) -> Tuple[Optional[Cluster], bool]:
+        """Join the most similar live cluster, or start one with this case as leader.
+
+        Returns (cluster, is_leader); (None, True) when clustering is off or the
+        case has no coordinates to bucket it by.
+        """
+        if not self.enabled or not location or location.get("lat") is None or location.get("lon") is None:
+            return None, True
+        now = time.time() if now is None else now
+        signature = minhash(message)
+        bands = [signature[i::BANDS].tobytes() for i in range(BANDS)]
+        row, col = self._cell(location["lat"], location["lon"])
+        scope = (bool(lite), lang or "en")
+        with self._lock:
+            self._cases += 1
+            self._expire(now)
+            candidates = set()
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    for i, band in enumerate(bands):
+                        candidates.update(self._buckets.get((row + dr, col + dc, scope, i, band), ()))
+            best, best_sim = None, self.threshold
+            for cluster_id in candidates:
+                cluster = self._clusters[cluster_id][0]
+                sim = similarity(signature, cluster.signature)
+                if sim >= best_sim and not cluster.failed:
+                    best, best_sim = cluster, sim
+            if best is not None:
+                best.members += 1
+                self._attached += 1
+                return best, False
+
+            cluster = Cluster(f"CL-{uuid.uuid4().hex[:8].upper()}", case_id, signature, now)
+            keys = [(row, col, scope, i, band) for i, band in enumerate(bands)]
+            for key in keys:
+                self._buckets.setdefault(key, []).append(cluster.cluster_id)
+            self._clusters[cluster.cluster_id] = (cluster, keys)
+            return cluster, True
+
+    def complete(self, cluster: Cluster, state: dict, confirmation: str):
+        """Publish the leader's routing and reply to the cluster's members."""
+        cluster.result = {
+            K.CASE_TYPE: state.get(K.CASE_TYPE, "unknown"),
+            K.URGENCY: state.get(K.URGENCY, "low"),
+            K.INCIDENT: state.get(K.INCIDENT),
+            K.TARGET: state.get(K.TARGET),
+            "booked": bool(state.get(K.BOOKING)),
+            "reply": to_template(confirmation, state),
+        }
+        cluster._done.set()
+
+    def fail(self, cluster: Cluster):
+        """The leader failed: wake waiting members and let the next case start a new cluster."""
+        with self._lock:
+            self._leader_failures += 1
+            cluster.failed = True
+            if cluster.cluster_id in self._clusters:
+                self._drop(cluster.cluster_id)
+        cluster._done.set()
+
+    def reuse(self, result: Dict[str, Any], state: dict) -> dict:
+        """Fill a member's state from its cluster's result: same routing, target
+        and reply, with its own booking and case ID."""
+        with self._lock:
+            self._reused += 1
+        for key in (K.CASE_TYPE, K.URGENCY, K.INCIDENT, K.TARGET):
+            state[key] = result[key]
+        if result["booked"] and isinstance(state[K.TARGET], dict):
+            state[K.BOOKING] = t_booking.mock_book(state[K.TARGET], case_id=state.get(K.CASE_ID))
+            if not state[K.BOOKING]["confirmed"]:
+                # The leader's reply names a slot this case did not get
+                state[K.CONFIRMATION_TEXT] = render(state) or from_template(result["reply"], state)
+                return state
+        state[K.CONFIRMATION_TEXT] = from_template(result["reply"], state)
+        return state
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "window_s": self.window_s,
+                "cell_deg": self.cell_deg,
+                "threshold": self.threshold,
+                "live_clusters": len(self._clusters),
+                "cases": self._cases,
+                "attached": self._attached,
+                "reused": self._reused,
+                "attach_rate": round(self._attached / self._cases, 4) if self._cases else 0.0,
+                "leader_failures": self._leader_failures,
+            }
+
+CLUSTERS = ClusterIndex(config.CLUSTER_WINDOW_S, config.CLUSTER_CELL_DEG, config.CLUSTER_SIMILARITY)
@@ -1,17 +1,203 @@
-import csv
 import math
 import pathlib
-from typing import Optional, Dict, Any
+import threading
+import time
+from typing import Optional, Dict, Any, List, Sequence
+
+import numpy as np
+
+from app import config
+from app.tools.facility_store import FacilityStore
+from app.tools.service_grid import build_for as build_service_grid
+from app.tools.spatial import SphereKDTree, unit_vectors, dense_knn, EARTH_RADIUS_KM
 
 DATA_DIR = pathlib.Path(__file__).parent.parent / "data"
 
-def _load_csv(name: str):
-    """Load CSV data from the data directory."""
-    with open(DATA_DIR / name, newline="", encoding="utf-8") as f:
-        return list(csv.DictReader(f))
+def _load_store(name: str) -> FacilityStore:
+    """Open a facility file from the data directory (snapshot if prebuilt, else CSV)."""
+    snapshot_dir = pathlib.Path(config.DIRECTORY_SNAPSHOT_DIR) if config.DIRECTORY_SNAPSHOT_DIR else None
+    return FacilityStore.open(DATA_DIR / name, snapshot_dir)
+
+def _build_directory(store: FacilityStore) -> Dict[str, Any]:
+    """Precompute the KD-tree, the unit-vector array used for batch lookups and,
+    if enabled, the service-area grid."""
+    return {
+        "rows": store,
+        "index": SphereKDTree(list(zip(store.lat.tolist(), store.lon.tolist()))),
+        "vectors": unit_vectors(store.lat, store.lon).reshape(-1, 3),
+        "grid": build_service_grid(store.lat, store.lon, config.DIRECTORY_GRID_DEG),
+    }
+
+def _load_directories() -> Dict[str, Dict[str, Any]]:
+    return {
+        "hospital": _build_directory(_load_store(config.HOSPITALS_CSV)),
+        "police": _build_directory(_load_store(config.POLICE_CSV)),
+    }
+
+def _data_fingerprint() -> tuple:
+    """Name, mtime and size of the CSVs the directories are built from."""
+    return tuple(sorted((p.name, st.st_mtime_ns, st.st_size)
+                        for p in (DATA_DIR / config.HOSPITALS_CSV, DATA_DIR / config.POLICE_CSV)
+                        if p.exists() for st in (p.stat(),)))
+
+# Built once at load time; lookups no longer scan or re-parse every row
+_DIRECTORIES = _load_directories()
+HOSPITALS = _DIRECTORIES["hospital"]["rows"]
+POLICE = _DIRECTORIES["police"]["rows"]
+
+_watch = {"fingerprint": _data_fingerprint(), "checked_at": time.monotonic()}
+_reload_lock = threading.Lock()
+# Serialises writers of _DIRECTORIES; lookups never take it, they just read
+# whichever immutable snapshot is current
+_swap_lock = threading.Lock()
+
+# Live capacity columns and the values pushed for them since startup:
+# kind -> facility id -> column -> value. Reapplied after every reload.
+CAPACITY_FIELDS = ("beds_available", "ventilators_available", "blood_availability")
+_CAPACITY_OVERRIDES: Dict[str, Dict[str, Dict[str, str]]] = {}
+
+# Columns a capacity update may use to name its facility (first one present wins)
+_ID_COLUMNS = ("uuid", "osm_id", "name", "station_name")
+
+def _publish(directories: Dict[str, Dict[str, Any]]):
+    global _DIRECTORIES, HOSPITALS, POLICE
+    _DIRECTORIES = directories
+    HOSPITALS = directories["hospital"]["rows"]
+    POLICE = directories["police"]["rows"]
+
+def _facility_ids(directory: Dict[str, Any]) -> Dict[str, int]:
+    """Facility id -> row, cached per directory (the first row wins on duplicates)."""
+    if "ids" not in directory:
+        store = directory["rows"]
+        column = next((c for c in _ID_COLUMNS if store.has_column(c)), None)
+        ids: Dict[str, int] = {}
+        if column:
+            for row, value in enumerate(store.column(column)):
+                if value:
+                    ids.setdefault(value, row)
+        directory["ids"] = ids
+    return directory["ids"]
+
+def _with_capacity(directory: Dict[str, Any], changes: Dict[str, Dict[int, str]]) -> Dict[str, Any]:
+    """A new directory snapshot with capacity cells replaced.
+
+    Only the changed columns are rebuilt; the KD-tree, grid and category
+    caches do not depend on capacity and are shared with the old snapshot.
+    """
+    if not changes:
+        return directory
+    fresh = dict(directory)
+    fresh["rows"] = directory["rows"].with_values(changes)
+    return fresh
+
+def _override_changes(kind: str, directory: Dict[str, Any]) -> Dict[str, Dict[int, str]]:
+    ids = _facility_ids(directory)
+    changes: Dict[str, Dict[int, str]] = {}
+    for facility_id, values in _CAPACITY_OVERRIDES.get(kind, {}).items():
+        row = ids.get(facility_id)
+        if row is not None:
+            for column, value in values.items():
+                changes.setdefault(column, {})[row] = value
+    return changes
+
+def reload_directories():
+    """Rebuild every directory (stores, indexes, grids) and swap them in at once."""
+    fresh = _load_directories()
+    with _swap_lock:
+        _publish({kind: _with_capacity(directory, _override_changes(kind, directory))
+                  for kind, directory in fresh.items()})
+
+def _parse_count(value: str) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+def apply_capacity_updates(kind: str, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Publish a batch of capacity updates as a new directory snapshot.
+
+    Each update names a facility (``facility_id``, matched against the uuid,
+    osm_id or name column) and any of ``CAPACITY_FIELDS``. With ``mode="add"``
+    the values are deltas on the current figures (floored at 0); otherwise
+    they replace them. In-flight lookups keep the snapshot they started with.
+
+    Updates are applied one by one: one with a bad value is ``rejected``
+    (with the error) and the rest are still published.
+
+    Returns the number of updates ``applied``, the ``unknown`` facility ids
+    and the ``rejected`` updates.
+    """
+    with _swap_lock:
+        directories = _DIRECTORIES
+        if kind not in directories:
+            raise ValueError(f"Unknown facility kind '{kind}'. Use one of: {', '.join(directories)}")
+        directory = directories[kind]
+        store: FacilityStore = directory["rows"]
+        ids = _facility_ids(directory)
+        overrides = _CAPACITY_OVERRIDES.setdefault(kind, {})
+        changes: Dict[str, Dict[int, str]] = {}
+        unknown: List[str] = []
+        rejected: List[Dict[str, Any]] = []
+        for update in updates:
+            facility_id = str(update.get("facility_id", ""))
+            row = ids.get(facility_id)
+            if row is None:
+                unknown.append(facility_id)
+                continue
+            values: Dict[str, str] = {}
+            try:
+                for column in CAPACITY_FIELDS:
+                    value = update.get(column)
+                    if value is None:
+                        continue
+                    if update.get("mode") == "add":
+                        current = changes.get(column, {}).get(row)
+                        if current is None:
+                            current = store.value(column, row) if store.has_column(column) else ""
+                        value = max(0, _parse_count(current) + int(value))
+                    values[column] = str(int(value))
+            except (TypeError, ValueError) as e:
+                rejected.append({"facility_id": facility_id, "error": str(e)})
+                continue
+            for column, text in values.items():
+                changes.setdefault(column, {})[row] = text
+                overrides.setdefault(facility_id, {})[column] = text
+        if changes:
+            _publish({**directories, kind: _with_capacity(directory, changes)})
+    return {"applied": len(updates) - len(unknown) - len(rejected), "unknown": unknown, "rejected": rejected}
+
+def _check_for_changes():
+    """Rebuild in the background when the hospital or police CSV changes.
+
+    Files are stat'ed at most every DIRECTORY_WATCH_INTERVAL_S seconds; lookups
+    keep using the current directories until the rebuilt ones are swapped in.
+    """
+    interval = config.DIRECTORY_WATCH_INTERVAL_S
+    now = time.monotonic()
+    if interval <= 0 or now - _watch["checked_at"] < interval:
+        return
+    _watch["checked_at"] = now
+    fingerprint = _data_fingerprint()
+    if fingerprint == _watch["fingerprint"] or not _reload_lock.acquire(blocking=False):
+        return
 
-HOSPITALS = _load_csv("hospital.csv")
-POLICE = _load_csv("police_station.csv")
+    def rebuild():
+        try:
+            reload_directories()
+            _watch["fingerprint"] = fingerprint
+            print(f"🗺️ DIRECTORY: Reloaded after data change ({len(HOSPITALS)} hospitals, {len(POLICE)} police)")
+        except Exception as e:
+            # Keep serving the old directories; the next check retries
+            print(f"Error reloading directory data: {e}")
+        finally:
+            _reload_lock.release()
+
+    threading.Thread(target=rebuild, name="directory-reload", daemon=True).start()
+
+# The dense matrix product costs O(batch x facilities); below this batch size,
+# or above this many facilities, a KD-tree walk per point is cheaper
+TREE_BATCH_MAX = 16
+DENSE_MAX_ROWS = 20_000
 
 def _haversine(lat1, lon1, lat2, lon2):
     """Calculate the great circle distance between two points on Earth."""
@@ -23,24 +209,225 @@ def _haversine(lat1, lon1, lat2, lon2):
          math.sin(dlon/2)**2)
     return 2 * R * math.asin(math.sqrt(a))
 
+def nearest_many(kind: str, lats: Sequence[float], lons: Sequence[float], k: int = 1) -> Dict[str, Any]:
+    """Resolve the k nearest facilities of one kind for a batch of coordinates.
+
+    Returns ``indices`` and ``distances_km`` arrays shaped ``(len(lats), k)``
+    plus ``records``, a list of k facility rows per input point. Large
+    batches are answered with one matrix product per chunk over the
+    precomputed unit-vector array; small batches (and very large
+    directories) walk the KD-tree instead. With the service-area grid
+    enabled, k=1 lookups are grid reads.
+    """
+    _check_for_changes()
+    directories = _DIRECTORIES
+    if kind not in directories:
+        raise ValueError(f"Unknown facility kind '{kind}'. Use one of: {', '.join(directories)}")
+    directory = directories[kind]
+    rows = directory["rows"]
+    lats = np.asarray(lats, dtype=np.float64).ravel()
+    lons = np.asarray(lons, dtype=np.float64).ravel()
+    if lats.shape != lons.shape:
+        raise ValueError("lats and lons must have the same length")
+    k = min(max(k, 1), len(rows))
+
+    grid = directory["grid"]
+    if k == 0:
+        indices = np.empty((len(lats), 0), dtype=np.int64)
+        distances = np.empty((len(lats), 0), dtype=np.float64)
+    elif k == 1 and grid is not None:
+        if len(lats) <= TREE_BATCH_MAX:
+            nearest = np.array([grid.nearest(lat, lon) for lat, lon in zip(lats.tolist(), lons.tolist())],
+                               dtype=np.int64)
+        else:
+            nearest = grid.nearest_many(lats, lons)
+        # Points outside the grid fall back to the KD-tree
+        for i in np.flatnonzero(nearest < 0).tolist():
+            nearest[i] = directory["index"].nearest(float(lats[i]), float(lons[i]))
+        indices = nearest[:, None]
+        chord = np.linalg.norm(directory["vectors"][nearest] - unit_vectors(lats, lons).reshape(-1, 3), axis=1)
+        distances = (2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0.0, 1.0)))[:, None]
+    elif len(lats) <= TREE_BATCH_MAX or len(rows) > DENSE_MAX_ROWS:
+        indices = np.empty((len(lats), k), dtype=np.int64)
+        distances = np.empty((len(lats), k), dtype=np.float64)
+        for i, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist())):
+            hits = directory["index"].query(lat, lon, k=k)
+            distances[i] = [d for d, _ in hits]
+            indices[i] = [row for _, row in hits]
+    else:
+        indices, distances = dense_knn(directory["vectors"], unit_vectors(lats, lons), k=k)
+
+    return {
+        "indices": indices,
+        "distances_km": distances,
+        "records": [[rows[j] for j in row] for row in indices.tolist()],
+    }
+
 def nearest_hospital(lat: Optional[float] = None, lon: Optional[float] = None) -> Dict[str, Any]:
     """Find the nearest hospital to the given coordinates."""
-    if not HOSPITALS:
+    hospitals = _DIRECTORIES["hospital"]["rows"]
+    if not hospitals:
         return {}
     if lat is None or lon is None:
-        return HOSPITALS[0]
-    return min(HOSPITALS, 
-               key=lambda h: _haversine(lat, lon, 
-                                      float(h.get("lat", 0) or 0), 
-                                      float(h.get("lon", 0) or 0)))
+        return hospitals[0]
+    return nearest_many("hospital", [lat], [lon])["records"][0][0]
 
 def nearest_police(lat: Optional[float] = None, lon: Optional[float] = None) -> Dict[str, Any]:
     """Find the nearest police station to the given coordinates."""
-    if not POLICE:
+    police = _DIRECTORIES["police"]["rows"]
+    if not police:
         return {}
     if lat is None or lon is None:
-        return POLICE[0]
-    return min(POLICE, 
-               key=lambda p: _haversine(lat, lon, 
-                                      float(p.get("lat", 0) or 0), 
-                                      float(p.get("lon", 0) or 0)))
+        return police[0]
+    return nearest_many("police", [lat], [lon])["records"][0][0]
+
+# Category filters: filter argument -> candidate columns (first one present wins)
+_CATEGORY_FILTERS = {
+    "facility_type": ("type", "amenity"),
+    "province": ("province",),
+    "district": ("district",),
+}
+
+# Capacity filters: filter argument -> numeric column in the full health dataset
+_CAPACITY_FILTERS = {
+    "min_beds": "beds_available",
+    "min_ventilators": "ventilators_available",
+    "min_blood_units": "blood_availability",
+}
+
+def _allowed_codes(store: FacilityStore, column: str, wanted) -> Optional[frozenset]:
+    """Codes of an interned column whose label matches (case-insensitively) ``wanted``."""
+    cat = store.codes(column)
+    if cat is None:
+        return None
+    if callable(wanted):
+        return frozenset(code for code, label in enumerate(cat[1]) if wanted(label.lower()))
+    wanted = {w.lower() for w in wanted}
+    return frozenset(code for code, label in enumerate(cat[1]) if label.lower() in wanted)
+
+def _selection_size(directory: Dict[str, Any], column: str, codes: frozenset) -> int:
+    """Number of rows in a category selection, from cached per-column code counts."""
+    counts = directory.setdefault("code_counts", {})
+    if column not in counts:
+        counts[column] = np.bincount(directory["rows"].codes(column)[0])
+    return int(sum(counts[column][c] for c in codes if c < len(counts[column])))
+
+def _subindex(directory: Dict[str, Any], column: str, codes: frozenset) -> tuple:
+    """KD-tree over the rows of one category selection, built on first use and cached."""
+    cache = directory.setdefault("subindexes", {})
+    key = (column, codes)
+    if key not in cache:
+        store = directory["rows"]
+        ids = np.flatnonzero(np.isin(store.codes(column)[0], list(codes))) if codes else np.empty(0, dtype=np.int64)
+        tree = SphereKDTree(list(zip(store.lat[ids].tolist(), store.lon[ids].tolist())), ids=ids.tolist())
+        cache[key] = (tree, ids)
+    return cache[key]
+
+def find_facilities(kind: str = "hospital", lat: Optional[float] = None, lon: Optional[float] = None,
+                    k: int = 3, facility_type: Optional[str] = None, province: Optional[str] = None,
+                    district: Optional[str] = None, er_only: bool = False, open_24h: bool = False,
+                    min_beds: int = 0, min_ventilators: int = 0, min_blood_units: int = 0) -> Dict[str, Any]:
+    """Find the k nearest facilities that satisfy the given filters.
+
+    Args:
+        kind: "hospital" or "police".
+        lat, lon: Citizen location. Without it, matches are returned in directory order.
+        k: Number of facilities to return.
+        facility_type: e.g. "ER", "Hospital", "clinic", "pharmacy".
+        province, district: Restrict to an administrative area.
+        er_only: Only emergency departments.
+        open_24h: Only facilities open around the clock (ERs count when opening hours are not listed).
+        min_beds, min_ventilators, min_blood_units: Minimum available capacity.
+
+    Returns a dict with ``results`` (facility rows plus ``distance_km``), ``count``
+    and ``filters_ignored`` (filters this directory has no data for).
+    """
+    _check_for_changes()
+    directories = _DIRECTORIES
+    if kind not in directories:
+        raise ValueError(f"Unknown facility kind '{kind}'. Use one of: {', '.join(directories)}")
+    directory = directories[kind]
+    store: FacilityStore = directory["rows"]
+    ignored: List[str] = []
+
+    # Each category constraint is (column, allowed codes)
+    constraints = []
+    for arg, value in (("facility_type", facility_type), ("province", province), ("district", district)):
+        if not value:
+            continue
+        column = next((c for c in _CATEGORY_FILTERS[arg] if store.has_column(c)), None)
+        codes = _allowed_codes(store, column, [value]) if column else None
+        if codes is None:
+            ignored.append(arg)
+        else:
+            constraints.append((column, codes))
+
+    er_labels = None
+    if er_only or open_24h:
+        if store.codes("type") is not None:
+            er_labels = ("type", _allowed_codes(store, "type", ["er"]))
+        elif store.codes("emergency") is not None:
+            er_labels = ("emergency", _allowed_codes(store, "emergency", ["yes", "designated"]))
+    if er_only:
+        if er_labels:
+            constraints.append(er_labels)
+        else:
+            ignored.append("er_only")
+    if open_24h:
+        if store.codes("opening_hours") is not None:
+            constraints.append(("opening_hours", _allowed_codes(
+                store, "opening_hours", lambda label: "24/7" in label or "00:00-24:00" in label)))
+        elif er_labels:
+            constraints.append(er_labels)
+        else:
+            ignored.append("open_24h")
+
+    capacity = []
+    for arg, minimum in (("min_beds", min_beds), ("min_ventilators", min_ventilators),
+                         ("min_blood_units", min_blood_units)):
+        if not minimum:
+            continue
+        values = store.numeric(_CAPACITY_FILTERS[arg])
+        if values is None:
+            ignored.append(arg)
+        else:
+            capacity.append((values, minimum))
+
+    # Walk the smallest category sub-index; everything else is checked per visited row
+    if constraints:
+        constraints.sort(key=lambda c: _selection_size(directory, c[0], c[1]))
+        column, codes = constraints[0]
+        tree, ids = _subindex(directory, column, codes)
+        rest = [(store.codes(col)[0], allowed) for col, allowed in constraints[1:]]
+    else:
+        tree, ids = directory["index"], None
+        rest = []
+
+    def matches(row: int) -> bool:
+        for codes_arr, allowed in rest:
+            if codes_arr[row] not in allowed:
+                return False
+        for values, minimum in capacity:
+            if not values[row] >= minimum:
+                return False
+        return True
+
+    predicate = matches if rest or capacity else None
+    k = max(k, 1)
+    if lat is not None and lon is not None:
+        hits = tree.query(lat, lon, k=k, predicate=predicate)
+    else:
+        candidates = ids.tolist() if ids is not None else range(len(store))
+        hits = []
+        for row in candidates:
+            if predicate is None or predicate(row):
+                hits.append((None, row))
+                if len(hits) == k:
+                    break
+
+    results = []
+    for distance, row in hits:
+        record = dict(store[row])
+        record["distance_km"] = round(distance, 2) if distance is not None else None
+        results.append(record)
+    return {"kind": kind, "count": len(results), "results": results, "filters_ignored": ignored}
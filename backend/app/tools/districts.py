@@ -0,0 +1,102 @@
+import json
+import pathlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app import config
+from app.tools.spatial import STRTree
+
+DATA_DIR = pathlib.Path(__file__).parent.parent / "data"
+
+# Property holding the district name, by boundary-file convention (first one present wins)
+NAME_PROPERTIES = ("district", "ADM2_EN", "NAME_2", "name")
+
+Ring = List[Tuple[float, float]]
+
+def _in_ring(x: float, y: float, ring: Ring) -> bool:
+    """Even-odd ray casting test for one closed ring of (lon, lat) points."""
+    inside = False
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+def _in_polygon(x: float, y: float, rings: Sequence[Ring]) -> bool:
+    """Inside the outer ring and outside every hole."""
+    return _in_ring(x, y, rings[0]) and not any(_in_ring(x, y, hole) for hole in rings[1:])
+
+class DistrictResolver:
+    """Maps coordinates to administrative districts.
+
+    Every polygon (each part of a MultiPolygon counts separately) has its
+    bounding box in an STR R-tree; a lookup runs exact point-in-polygon
+    tests only on the polygons whose boxes contain the point.
+    """
+
+    def __init__(self, polygons: List[Tuple[str, List[Ring]]]):
+        self.polygons = polygons
+        boxes = []
+        for _, rings in polygons:
+            xs = [p[0] for p in rings[0]]
+            ys = [p[1] for p in rings[0]]
+            boxes.append((min(xs), min(ys), max(xs), max(ys)))
+        self._tree = STRTree(boxes)
+        self._areas = [(b[2] - b[0]) * (b[3] - b[1]) for b in boxes]
+
+    @classmethod
+    def from_geojson(cls, path: pathlib.Path) -> "DistrictResolver":
+        """Load Polygon/MultiPolygon features from a GeoJSON FeatureCollection."""
+        with open(path, encoding="utf-8") as f:
+            collection = json.load(f)
+        polygons = []
+        for feature in collection.get("features", []):
+            props = feature.get("properties") or {}
+            name = next((props[k] for k in NAME_PROPERTIES if props.get(k)), None)
+            geometry = feature.get("geometry") or {}
+            if not name:
+                continue
+            if geometry.get("type") == "Polygon":
+                parts = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                parts = geometry["coordinates"]
+            else:
+                continue
+            for part in parts:
+                rings = [[(float(p[0]), float(p[1])) for p in ring] for ring in part]
+                if rings and len(rings[0]) >= 3:
+                    polygons.append((str(name), rings))
+        return cls(polygons)
+
+    def resolve(self, lat: Optional[float], lon: Optional[float]) -> Optional[str]:
+        """District containing the point, or None. Overlaps go to the smaller polygon."""
+        if lat is None or lon is None:
+            return None
+        hits = [i for i in self._tree.query_point(lon, lat) if _in_polygon(lon, lat, self.polygons[i][1])]
+        if not hits:
+            return None
+        return self.polygons[min(hits, key=lambda i: self._areas[i])][0]
+
+    def __len__(self) -> int:
+        return len(self.polygons)
+
+_resolver: Dict[str, Any] = {"path": None, "instance": None}
+
+def get_resolver() -> Optional[DistrictResolver]:
+    """Resolver for DISTRICT_BOUNDARIES (a path, or a file name in app/data), loaded once."""
+    path = pathlib.Path(config.DISTRICT_BOUNDARIES)
+    if not path.is_absolute():
+        path = DATA_DIR / path
+    if _resolver["path"] != path:
+        try:
+            _resolver["instance"] = DistrictResolver.from_geojson(path)
+        except (OSError, ValueError) as e:
+            print(f"District boundaries unavailable ({path}): {e}")
+            _resolver["instance"] = None
+        _resolver["path"] = path
+    return _resolver["instance"]
+
+def resolve_district(lat: Optional[float], lon: Optional[float]) -> Optional[str]:
+    """Administrative district of a point, or None if unknown."""
+    resolver = get_resolver()
+    return resolver.resolve(lat, lon) if resolver else None
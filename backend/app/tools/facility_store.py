@@ -0,0 +1,423 @@
+"""Columnar facility store with memory-mappable snapshots.
+
+Facilities are held column by column instead of one dict per row:
+
+- coordinates as float64 arrays (``lat``/``lon``),
+- low-cardinality columns (type, province, amenity...) as integer codes into
+  an interned label table,
+- everything else as one UTF-8 blob plus an offsets array, decoded only when
+  a record is actually read.
+
+``FacilityStore.save`` writes the same layout to a single binary snapshot;
+``FacilityStore.load`` maps it back without parsing, so a cold start costs a
+header read instead of a CSV parse. Build snapshots for the configured
+hospital, police and shelter files with:
+
+    python -m app.tools.facility_store build
+"""
+
+import csv
+import hashlib
+import json
+import mmap
+import pathlib
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app import config
+
+DATA_DIR = pathlib.Path(__file__).parent.parent / "data"
+SNAPSHOT_SUFFIX = ".fcs"
+MAGIC = b"FCSTORE1"
+ALIGN = 64
+
+LAT_COLUMNS = ("lat", "latitude", "shelter_lat")
+LON_COLUMNS = ("lon", "long", "longitude", "shelter_long")
+
+# Always interned, whatever their cardinality in a given file
+CATEGORY_COLUMNS = {
+    "type", "province", "district", "city", "area", "amenity", "healthcare",
+    "emergency", "operator_type", "opening_hours", "camp_status", "incident_type",
+}
+
+def _is_categorical(name: str, values: Sequence[str]) -> bool:
+    """Intern explicit category columns and any column with few distinct values."""
+    if name in CATEGORY_COLUMNS:
+        return True
+    distinct = len(set(values))
+    return distinct <= 255 and distinct * 4 <= len(values)
+
+def _parse_coord(value: str) -> float:
+    """Missing coordinates become 0, as in the original CSV lookups."""
+    try:
+        return float(value or 0)
+    except ValueError:
+        return 0.0
+
+def _parse_number(value: str) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+def _digest(path: pathlib.Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+def _fingerprint(path: pathlib.Path) -> Dict[str, int]:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def _is_current(source: Dict[str, Any], csv_path: pathlib.Path) -> bool:
+    """Whether a snapshot built from ``source`` still matches the CSV: an
+    unchanged size and mtime is enough; otherwise the content is hashed, so a
+    touched but identical file (e.g. a fresh checkout) keeps its snapshot."""
+    fingerprint = _fingerprint(csv_path)
+    if all(source.get(key) == value for key, value in fingerprint.items()):
+        return True
+    return source.get("sha1") == _digest(csv_path)
+
+class FacilityStore:
+    """Read-only columnar table of facilities.
+
+    Behaves like a sequence of row dicts (``len``, indexing, iteration), so it
+    can stand in for the ``csv.DictReader`` lists it replaces. Row dicts are
+    rebuilt on access and contain the original string values.
+    """
+
+    def __init__(self, columns: List[str], lat: np.ndarray, lon: np.ndarray,
+                 categories: Dict[str, tuple], texts: Dict[str, tuple],
+                 lat_column: Optional[str] = None, lon_column: Optional[str] = None,
+                 source: Optional[Dict[str, Any]] = None):
+        self.columns = columns
+        self.lat = lat
+        self.lon = lon
+        self.lat_column = lat_column
+        self.lon_column = lon_column
+        self.source = source or {}
+        # name -> (codes array, [labels])
+        self._categories = categories
+        # name -> (offsets array, utf-8 buffer)
+        self._texts = texts
+        self._numeric: Dict[str, np.ndarray] = {}
+        self._mmap: Optional[mmap.mmap] = None
+
+    # ------------------------------------------------------------------ build
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, str]], columns: Optional[List[str]] = None,
+                  source: Optional[Dict[str, Any]] = None) -> "FacilityStore":
+        """Build a store from row dicts (e.g. ``csv.DictReader`` output)."""
+        if columns is None:
+            columns = list(rows[0].keys()) if rows else []
+        values = {name: [r.get(name) or "" for r in rows] for name in columns}
+        return cls.from_columns(columns, values, len(rows), source)
+
+    @classmethod
+    def from_columns(cls, columns: List[str], values: Dict[str, Sequence[str]], n: int,
+                     source: Optional[Dict[str, Any]] = None) -> "FacilityStore":
+        """Build a store from per-column string sequences of length ``n``."""
+        lat_column = next((c for c in LAT_COLUMNS if c in columns), None)
+        lon_column = next((c for c in LON_COLUMNS if c in columns), None)
+        lat = np.array([_parse_coord(v) for v in values[lat_column]] if lat_column else [0.0] * n,
+                       dtype=np.float64)
+        lon = np.array([_parse_coord(v) for v in values[lon_column]] if lon_column else [0.0] * n,
+                       dtype=np.float64)
+
+        categories: Dict[str, tuple] = {}
+        texts: Dict[str, tuple] = {}
+        for name in columns:
+            column = values[name]
+            if _is_categorical(name, column):
+                lookup: Dict[str, int] = {}
+                codes = [lookup.setdefault(v, len(lookup)) for v in column]
+                labels = [sys.intern(v) for v in lookup]
+                dtype = np.uint16 if len(labels) < 65536 else np.int32
+                categories[name] = (np.array(codes, dtype=dtype), labels)
+            else:
+                texts[name] = _encode_texts(column)
+        return cls(columns, lat, lon, categories, texts, lat_column, lon_column, source)
+
+    @classmethod
+    def from_csv(cls, path: pathlib.Path) -> "FacilityStore":
+        """Parse a CSV file into a store."""
+        path = pathlib.Path(path)
+        raw = path.read_bytes()
+        reader = csv.reader(raw.decode("utf-8-sig").splitlines())
+        columns = next(reader, [])
+        rows = [row for row in reader if row]
+        width = len(columns)
+        # Pad short rows the way DictReader fills missing fields
+        padded = [row if len(row) == width else (row + [""] * width)[:width] for row in rows]
+        transposed = list(zip(*padded)) if padded else [()] * width
+        values = {name: transposed[i] for i, name in enumerate(columns)}
+        return cls.from_columns(columns, values, len(rows),
+                                source={"name": path.name, "sha1": hashlib.sha1(raw).hexdigest(),
+                                        **_fingerprint(path)})
+
+    @classmethod
+    def open(cls, csv_path: pathlib.Path, snapshot_dir: Optional[pathlib.Path] = None) -> "FacilityStore":
+        """Map the prebuilt snapshot for ``csv_path`` if it is current, else parse the CSV."""
+        csv_path = pathlib.Path(csv_path)
+        snapshot = snapshot_path(csv_path, snapshot_dir)
+        if snapshot.exists():
+            try:
+                store = cls.load(snapshot)
+                if _is_current(store.source, csv_path):
+                    return store
+                store.close()
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable facility snapshot {snapshot}: {e}")
+        return cls.from_csv(csv_path)
+
+    def with_values(self, updates: Dict[str, Dict[int, str]]) -> "FacilityStore":
+        """A new store with some cells replaced (``{column: {row: value}}``).
+
+        Untouched columns are shared with this store rather than copied, so
+        the cost is proportional to the columns that change. Unknown columns
+        are added as text columns, empty except for the given rows.
+        """
+        columns = list(self.columns)
+        categories = dict(self._categories)
+        texts = dict(self._texts)
+        for name, changes in updates.items():
+            if name in categories:
+                codes, labels = categories[name]
+                lookup = {label: i for i, label in enumerate(labels)}
+                labels = list(labels)
+                for value in changes.values():
+                    if value not in lookup:
+                        lookup[value] = len(labels)
+                        labels.append(sys.intern(value))
+                codes = codes.astype(np.uint16 if len(labels) < 65536 else np.int32)
+                for row, value in changes.items():
+                    codes[row] = lookup[value]
+                categories[name] = (codes, labels)
+            else:
+                if name in texts:
+                    column = self.column(name)
+                else:
+                    columns.append(name)
+                    column = [""] * len(self)
+                for row, value in changes.items():
+                    column[row] = value
+                texts[name] = _encode_texts(column)
+        store = FacilityStore(columns, self.lat, self.lon, categories, texts,
+                              self.lat_column, self.lon_column, self.source)
+        store._numeric = {name: values for name, values in self._numeric.items() if name not in updates}
+        return store
+
+    # ------------------------------------------------------------- snapshots
+
+    def save(self, path: pathlib.Path) -> pathlib.Path:
+        """Write the store as a single memory-mappable snapshot file."""
+        blocks: List[tuple] = []
+        arrays: Dict[str, Dict[str, Any]] = {}
+
+        def add(key: str, data, dtype: str):
+            raw = data.tobytes() if isinstance(data, np.ndarray) else bytes(data)
+            arrays[key] = {"dtype": dtype, "nbytes": len(raw)}
+            blocks.append((key, raw))
+
+        add("lat", self.lat, "float64")
+        add("lon", self.lon, "float64")
+        columns_meta = []
+        for name in self.columns:
+            if name in self._categories:
+                codes, labels = self._categories[name]
+                add(f"codes:{name}", codes, codes.dtype.name)
+                columns_meta.append({"name": name, "kind": "category", "labels": labels})
+            else:
+                offsets, buf = self._texts[name]
+                add(f"offsets:{name}", offsets, offsets.dtype.name)
+                add(f"blob:{name}", buf, "uint8")
+                columns_meta.append({"name": name, "kind": "text"})
+
+        header = {
+            "version": 1,
+            "rows": len(self),
+            "columns": columns_meta,
+            "lat_column": self.lat_column,
+            "lon_column": self.lon_column,
+            "source": self.source,
+            "arrays": arrays,
+        }
+
+        # Array offsets are relative to the aligned start of the data section
+        pos = 0
+        for key, raw in blocks:
+            arrays[key]["offset"] = pos
+            pos = _align(pos + len(raw))
+        header_bytes = json.dumps(header).encode("utf-8")
+        data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+        path = pathlib.Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header_bytes).to_bytes(8, "little"))
+            f.write(header_bytes)
+            for key, raw in blocks:
+                f.seek(data_start + arrays[key]["offset"])
+                f.write(raw)
+            # Pad so trailing empty arrays still start inside the file
+            f.truncate(data_start + pos)
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "FacilityStore":
+        """Memory-map a snapshot. Arrays are zero-copy views into the file."""
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(MAGIC)] != MAGIC:
+            mm.close()
+            raise ValueError("not a facility store snapshot")
+        header_len = int.from_bytes(mm[len(MAGIC):len(MAGIC) + 8], "little")
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(mm[start:start + header_len]).decode("utf-8"))
+        if header.get("version") != 1:
+            mm.close()
+            raise ValueError(f"unsupported snapshot version {header.get('version')}")
+        arrays = header["arrays"]
+        data_start = _align(start + header_len)
+        view = memoryview(mm)
+
+        def array(key: str) -> np.ndarray:
+            meta = arrays[key]
+            dtype = np.dtype(meta["dtype"])
+            return np.frombuffer(mm, dtype=dtype, count=meta["nbytes"] // dtype.itemsize,
+                                 offset=data_start + meta["offset"])
+
+        categories: Dict[str, tuple] = {}
+        texts: Dict[str, tuple] = {}
+        columns = []
+        for meta in header["columns"]:
+            name = meta["name"]
+            columns.append(name)
+            if meta["kind"] == "category":
+                categories[name] = (array(f"codes:{name}"), [sys.intern(v) for v in meta["labels"]])
+            else:
+                blob = arrays[f"blob:{name}"]
+                lo = data_start + blob["offset"]
+                texts[name] = (array(f"offsets:{name}"), view[lo:lo + blob["nbytes"]])
+        store = cls(columns, array("lat"), array("lon"), categories, texts,
+                    header.get("lat_column"), header.get("lon_column"), header.get("source"))
+        store._mmap = mm
+        return store
+
+    def close(self):
+        """Release the snapshot mapping (the store is unusable afterwards)."""
+        if self._mmap is not None:
+            self._texts = {}
+            self._categories = {}
+            self._numeric = {}
+            self.lat = self.lon = np.empty(0)
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views are still referenced elsewhere; the mapping closes with them
+                pass
+            self._mmap = None
+
+    # ---------------------------------------------------------------- access
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def __getitem__(self, i: int) -> Dict[str, str]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("facility index out of range")
+        return {name: self.value(name, i) for name in self.columns}
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def value(self, name: str, i: int) -> str:
+        """Decode a single cell."""
+        cat = self._categories.get(name)
+        if cat is not None:
+            return cat[1][cat[0][i]]
+        offsets, buf = self._texts[name]
+        lo, hi = offsets[i:i + 2].tolist()
+        return str(buf[lo:hi], "utf-8")
+
+    def has_column(self, name: str) -> bool:
+        return name in self._categories or name in self._texts
+
+    def column(self, name: str) -> List[str]:
+        """Decode a whole column."""
+        return [self.value(name, i) for i in range(len(self))]
+
+    def numeric(self, name: str) -> Optional[np.ndarray]:
+        """A column parsed as float64 (NaN where empty or not a number), cached.
+
+        Returns ``None`` if the column does not exist.
+        """
+        if name not in self._categories and name not in self._texts:
+            return None
+        if name not in self._numeric:
+            cat = self._categories.get(name)
+            if cat is not None:
+                table = np.array([_parse_number(label) for label in cat[1]], dtype=np.float64)
+                parsed = table[cat[0]] if len(table) else np.full(len(self), np.nan)
+            else:
+                parsed = np.array([_parse_number(v) for v in self.column(name)], dtype=np.float64)
+            self._numeric[name] = parsed
+        return self._numeric[name]
+
+    def codes(self, name: str) -> Optional[tuple]:
+        """``(codes, labels)`` for an interned column, or ``None``."""
+        return self._categories.get(name)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate payload size of the columns."""
+        total = self.lat.nbytes + self.lon.nbytes
+        for codes, _ in self._categories.values():
+            total += codes.nbytes
+        for offsets, buf in self._texts.values():
+            total += offsets.nbytes + len(buf)
+        return total
+
+def _encode_texts(column: Sequence[str]) -> tuple:
+    """``(offsets, buffer)`` for a text column."""
+    encoded = [v.encode("utf-8") for v in column]
+    buf = b"".join(encoded)
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32 if len(buf) < 2**32 else np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return offsets, buf
+
+def _align(pos: int) -> int:
+    return (pos + ALIGN - 1) // ALIGN * ALIGN
+
+def snapshot_path(csv_path: pathlib.Path, snapshot_dir: Optional[pathlib.Path] = None) -> pathlib.Path:
+    """Where the snapshot for a CSV lives (next to it unless a directory is given)."""
+    csv_path = pathlib.Path(csv_path)
+    directory = pathlib.Path(snapshot_dir) if snapshot_dir else csv_path.parent
+    return directory / (csv_path.stem + SNAPSHOT_SUFFIX)
+
+def build_snapshots(data_dir: pathlib.Path = DATA_DIR,
+                    snapshot_dir: Optional[pathlib.Path] = None,
+                    names: Optional[Sequence[str]] = None) -> List[pathlib.Path]:
+    """Write a snapshot for each facility CSV in ``data_dir`` (default:
+    ``config.FACILITY_CSVS``; the routing and labelled-case CSVs are not
+    facility files)."""
+    written = []
+    for name in sorted(set(names or config.FACILITY_CSVS)):
+        csv_path = pathlib.Path(data_dir) / name
+        store = FacilityStore.from_csv(csv_path)
+        out = store.save(snapshot_path(csv_path, snapshot_dir))
+        print(f"📦 {csv_path.name}: {len(store)} rows, {len(store.columns)} columns -> {out.name}")
+        written.append(out)
+    return written
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("Usage: python -m app.tools.facility_store build [data_dir] [snapshot_dir]")
+        sys.exit(1)
+    build_snapshots(*(pathlib.Path(a) for a in sys.argv[2:4]))
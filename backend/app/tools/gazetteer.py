@@ -0,0 +1,144 @@
+import csv
+import pathlib
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.tools.aho_corasick import AhoCorasick
+
+DATA_DIR = pathlib.Path(__file__).parent.parent / "data"
+ALIASES_CSV = DATA_DIR / "place_aliases.csv"
+
+# Most specific first: an area beats its district, a district beats its city
+KIND_RANK = {"area": 0, "district": 1, "city": 2}
+
+_SEPARATORS = re.compile(r"[\s\-_]+")
+
+def normalize(text: str) -> str:
+    """Lowercase and fold hyphens/underscores/runs of whitespace into single spaces."""
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+def _city_from_address(address: str) -> Optional[str]:
+    """Directory addresses end with the city ("Gulberg III, Lahore")."""
+    parts = [p.strip() for p in (address or "").split(",")]
+    return parts[-1] if len(parts) > 1 and parts[-1] else None
+
+def collect_places(stores: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Named places with centroid coordinates from facility/shelter stores.
+
+    Cities come from ``city`` columns and address tails, districts from
+    ``district`` columns and areas from ``area`` columns (scoped to their city,
+    since names like "Sector B" repeat across cities).
+    """
+    sums: Dict[tuple, List[float]] = {}
+
+    def add(kind: str, name: str, city: Optional[str], lat: float, lon: float):
+        key = (kind, name.strip(), city)
+        acc = sums.setdefault(key, [0.0, 0.0, 0])
+        acc[0] += lat
+        acc[1] += lon
+        acc[2] += 1
+
+    for store in stores:
+        if not len(store):
+            continue
+        lats, lons = store.lat.tolist(), store.lon.tolist()
+        cities = (store.column("city") if store.has_column("city")
+                  else [_city_from_address(a) for a in store.column("address")] if store.has_column("address")
+                  else [None] * len(store))
+        districts = store.column("district") if store.has_column("district") else [None] * len(store)
+        areas = store.column("area") if store.has_column("area") else [None] * len(store)
+        for lat, lon, city, district, area in zip(lats, lons, cities, districts, areas):
+            if not lat and not lon:
+                continue
+            if city:
+                add("city", city, None, lat, lon)
+            if district:
+                add("district", district, None, lat, lon)
+            if area:
+                add("area", area, city, lat, lon)
+    return [{"name": name, "kind": kind, "city": city, "lat": lat / n, "lon": lon / n}
+            for (kind, name, city), (lat, lon, n) in sums.items()]
+
+def load_aliases(path: pathlib.Path = ALIASES_CSV) -> Dict[str, List[str]]:
+    """Place name -> alternative spellings (Urdu script, Roman Urdu)."""
+    aliases: Dict[str, List[str]] = {}
+    if pathlib.Path(path).exists():
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                aliases.setdefault(normalize(row["place"]), []).append(row["alias"])
+    return aliases
+
+class Gazetteer:
+    """Finds place names in free text with one Aho-Corasick pass.
+
+    Each name and alias is a pattern pointing at the places it can denote.
+    ``locate`` picks the most specific match: an area (only when its city is
+    also mentioned, or the area name belongs to one city), then a district,
+    then a city; ties go to the earliest mention.
+    """
+
+    def __init__(self, places: List[Dict[str, Any]], aliases: Optional[Dict[str, List[str]]] = None):
+        self.places = places
+        by_name: Dict[str, List[int]] = {}
+        for i, place in enumerate(places):
+            by_name.setdefault(normalize(place["name"]), []).append(i)
+        self._automaton = AhoCorasick()
+        for name, ids in by_name.items():
+            self._automaton.add(name, ids)
+            for alias in (aliases or {}).get(name, []):
+                self._automaton.add(normalize(alias), ids)
+        self._automaton.build()
+
+    def __len__(self) -> int:
+        return len(self._automaton)
+
+    def matches(self, text: str) -> List[tuple]:
+        """``(start, place)`` for every place whose name or alias occurs in ``text``."""
+        return [(start, self.places[i]) for start, _, ids in self._automaton.find(normalize(text)) for i in ids]
+
+    def locate(self, text: str) -> Optional[Dict[str, Any]]:
+        """Best place mentioned in ``text`` as {name, kind, city, lat, lon}, or None."""
+        found = self.matches(text)
+        if not found:
+            return None
+        cities = {normalize(p["name"]) for _, p in found if p["kind"] == "city"}
+        area_cities: Dict[str, set] = {}
+        for _, p in found:
+            if p["kind"] == "area":
+                area_cities.setdefault(normalize(p["name"]), set()).add(p["city"])
+
+        def usable(place) -> bool:
+            if place["kind"] != "area":
+                return True
+            if place["city"] and normalize(place["city"]) in cities:
+                return True
+            return len(area_cities[normalize(place["name"])]) == 1 and not cities
+
+        candidates = [(KIND_RANK[p["kind"]], start, p) for start, p in found if usable(p)]
+        if not candidates:
+            return None
+        return dict(min(candidates, key=lambda c: (c[0], c[1]))[2])
+
+_cache: Dict[str, Any] = {"key": None, "gazetteer": None}
+
+def _sources() -> list:
+    from app.tools import directory as t_dir
+    from app.tools import shelters as t_shelters
+    directories = t_dir._DIRECTORIES
+    return [directories["hospital"]["rows"], directories["police"]["rows"], t_shelters.SHELTERS]
+
+def get_gazetteer() -> Gazetteer:
+    """Gazetteer over the loaded directories, rebuilt when they are reloaded from disk."""
+    stores = _sources()
+    # Capacity updates swap the store object but keep the same coordinate arrays
+    key = tuple(id(s.lat) for s in stores)
+    if _cache["key"] != key:
+        _cache["gazetteer"] = Gazetteer(collect_places(stores), load_aliases())
+        _cache["key"] = key
+    return _cache["gazetteer"]
+
+def locate(message: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Infer a location from place names in a citizen message."""
+    if not message:
+        return None
+    return get_gazetteer().locate(message)
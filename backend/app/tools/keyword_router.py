@@ -0,0 +1,89 @@
+import csv
+import pathlib
+import re
+from typing import Any, Dict, List, Optional
+
+from app.tools.gazetteer import normalize
+
+DATA_DIR = pathlib.Path(__file__).parent.parent / "data"
+KEYWORDS_CSV = DATA_DIR / "routing_keywords.csv"
+
+# Tie-break when two case types score the same: the more time-critical wins
+PRIORITY = ("disaster", "health", "crime")
+
+def _trie_pattern(words) -> str:
+    """Regex source matching any of ``words``, factored on shared prefixes.
+
+    A flat ``a|b|c`` alternation retries every keyword at every position;
+    nesting the alternatives as a trie lets the engine drop whole branches
+    after one character. Longer keywords win over their own prefixes.
+    """
+    root: Dict[str, dict] = {}
+    for word in words:
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 and "" not in node else f"(?:{'|'.join(branches)})"
+        return body + "?" if "" in node else body
+
+    return emit(root)
+
+class KeywordRouter:
+    """Routes a message to a case type with one pass over the text.
+
+    Weighted keywords (English, Roman Urdu and Urdu script) are compiled into
+    a single trie-shaped regex anchored on word boundaries, so "pain" no
+    longer fires inside "painter" and "fir" not inside "fire". Each distinct
+    keyword found adds its weight to its case type; the best total wins. A
+    phrase consumes its words, so "chest pain" does not also count as "pain".
+    """
+
+    def __init__(self, keywords: List[Dict[str, Any]]):
+        self._keywords: Dict[str, tuple] = {}
+        for kw in keywords:
+            self._keywords[normalize(kw["keyword"])] = (
+                kw["case_type"], float(kw["weight"]), kw.get("incident") or None)
+        # \w is Unicode-aware, so the boundaries hold for Urdu script too
+        self._pattern = re.compile(rf"(?<!\w){_trie_pattern(self._keywords)}(?!\w)")
+
+    @classmethod
+    def from_csv(cls, path: pathlib.Path = KEYWORDS_CSV) -> "KeywordRouter":
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls(list(csv.DictReader(f)))
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def route(self, text: Optional[str]) -> Dict[str, Any]:
+        """Returns ``case_type`` ("unknown" without any hit), its ``score``, the
+        per-type ``scores``, the disaster ``incident`` type if one was named and
+        the ``matched`` keywords."""
+        scores: Dict[str, float] = {}
+        matched: Dict[str, tuple] = {}
+        for keyword in self._pattern.findall(normalize(text or "")):
+            if keyword not in matched:
+                matched[keyword] = hit = self._keywords[keyword]
+                scores[hit[0]] = scores.get(hit[0], 0.0) + hit[1]
+        if not scores:
+            return {"case_type": "unknown", "score": 0.0, "scores": {}, "incident": None, "matched": []}
+        case_type = max(scores, key=lambda t: (scores[t], -PRIORITY.index(t) if t in PRIORITY else -len(PRIORITY)))
+        incidents = [(w, inc) for t, w, inc in matched.values() if inc and t == case_type]
+        return {
+            "case_type": case_type,
+            "score": scores[case_type],
+            "scores": scores,
+            "incident": max(incidents)[1] if incidents else None,
+            "matched": list(matched),
+        }
+
+ROUTER = KeywordRouter.from_csv()
+
+def route(text: Optional[str]) -> Dict[str, Any]:
+    """Route a citizen message with the keyword tables in app/data/routing_keywords.csv."""
+    return ROUTER.route(text)
@@ -1,3 +1,11 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from app import config
+
+# Provider calls block on the network; async callers wait for them here
+_POOL = ThreadPoolExecutor(config.NOTIFY_POOL_WORKERS, thread_name_prefix="notify")
+
 def send_sms(to: str, text: str) -> dict:
     """Send SMS notification (MVP: print to console)."""
     # MVP: print; later wire to a provider
@@ -16,3 +24,18 @@ def send_app_push(user_id: str, title: str, message: str) -> dict:
     print(f"[PUSH to {user_id}] {title}: {message}")
     return {"ok": True}
 
+
+async def _run(fn, *args) -> dict:
+    return await asyncio.get_running_loop().run_in_executor(_POOL, functools.partial(fn, *args))
+
+async def send_sms_async(to: str, text: str) -> dict:
+    """Send SMS notification from async code, on the notification thread pool."""
+    return await _run(send_sms, to, text)
+
+async def send_email_async(to: str, subject: str, text: str) -> dict:
+    """Send email notification from async code, on the notification thread pool."""
+    return await _run(send_email, to, subject, text)
+
+async def send_app_push_async(user_id: str, title: str, message: str) -> dict:
+    """Send app push notification from async code, on the notification thread pool."""
+    return await _run(send_app_push, user_id, title, message)
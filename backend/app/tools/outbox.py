@@ -0,0 +1,203 @@
+import json
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app import config
+from app.database.factory import get_db
+from app.tools.notify import send_sms
+
+CASE, SMS = "case", "sms"
+PENDING, INFLIGHT, DEAD = "pending", "inflight", "dead"
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _decode(obj: dict):
+    # Case records carry created_at as a datetime (a Timestamp in Firestore)
+    return datetime.fromisoformat(obj["$datetime"]) if obj.keys() == {"$datetime"} else obj
+
+def _deliver_case(payload: Dict[str, Any]) -> None:
+    if not get_db().save_case(payload["case_id"], payload["record"]):
+        raise RuntimeError(f"database did not save {payload['case_id']}")
+
+def _deliver_sms(payload: Dict[str, Any]) -> None:
+    result = send_sms(payload["to"], payload["text"])
+    if not result.get("ok"):
+        raise RuntimeError(f"SMS provider refused the message: {result}")
+
+class Outbox:
+    """Transactional outbox for case records and SMS, in a local SQLite file (WAL).
+
+    ``enqueue`` writes a case's record and its SMS in one transaction and
+    returns, so the response only waits for a local append. Worker threads,
+    started on the first enqueue, claim due messages and deliver them to the
+    configured database and SMS provider. A failed delivery is retried after
+    ``backoff_s`` doubled per attempt (capped at ``max_backoff_s``, with
+    jitter); after ``max_attempts`` it is kept as dead for inspection. A
+    message claimed by a worker that died is reclaimed after ``lease_s``, and
+    messages left by a previous process are delivered once workers start.
+    Several processes can share the file: a claim is one atomic UPDATE.
+    """
+
+    def __init__(self, db_path: str, workers: int = 2, max_attempts: int = 8, backoff_s: float = 0.5,
+                 max_backoff_s: float = 60, lease_s: float = 60,
+                 handlers: Optional[Dict[str, Callable[[Dict[str, Any]], None]]] = None):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.lease_s = lease_s
+        self.handlers = handlers or {CASE: _deliver_case, SMS: _deliver_sms}
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._counts = {"enqueued": 0, "delivered": 0, "retried": 0, "dead": 0}
+        self.last_error = None
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    case_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_error TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_case ON outbox (case_id)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        # WAL with NORMAL sync: a commit is an append to the log, still durable
+        # across a process crash (only an OS crash can lose the last commits)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def enqueue(self, case_id: str, record: Dict[str, Any], sms: Optional[Dict[str, str]] = None) -> None:
+        """Queue a case record and, optionally, its SMS ({"to", "text"}) in one transaction."""
+        now = time.time()
+        rows = [(CASE, case_id, json.dumps({"case_id": case_id, "record": record}, default=_encode), now, now)]
+        if sms:
+            rows.append((SMS, case_id, json.dumps(sms), now, now))
+        with self._connect() as conn:
+            conn.executemany("INSERT INTO outbox (kind, case_id, payload, next_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                             rows)
+        with self._lock:
+            self._counts["enqueued"] += len(rows)
+            if not self._threads:
+                self.start()
+        with self._wake:
+            self._wake.notify(len(rows))
+
+    def start(self):
+        """Start the delivery workers (enqueue does this on first use)."""
+        for _ in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._run, name=f"outbox-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def pending_case(self, case_id: str) -> Optional[Dict[str, Any]]:
+        """The record of a case still waiting in the outbox, so reads see it before delivery."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM outbox WHERE kind = ? AND case_id = ? ORDER BY id DESC LIMIT 1",
+                               (CASE, case_id)).fetchone()
+        return json.loads(row[0], object_hook=_decode)["record"] if row else None
+
+    def _claim(self) -> Optional[tuple]:
+        # An inflight message's next_at is the end of its lease
+        now = time.time()
+        with self._connect() as conn:
+            return conn.execute("""
+                UPDATE outbox SET status = 'inflight', attempts = attempts + 1, next_at = ?
+                WHERE id = (SELECT id FROM outbox WHERE status IN ('pending', 'inflight') AND next_at <= ?
+                            ORDER BY next_at LIMIT 1)
+                RETURNING id, kind, payload, attempts
+            """, (now + self.lease_s, now)).fetchone()
+
+    def _next_due_in(self) -> float:
+        with self._connect() as conn:
+            row = conn.execute("SELECT MIN(next_at) FROM outbox WHERE status IN ('pending', 'inflight')").fetchone()
+        return 1.0 if row[0] is None else min(max(row[0] - time.time(), 0.0), 1.0)
+
+    def _finish(self, message_id: int, attempts: int, error: Optional[Exception]):
+        with self._connect() as conn:
+            if error is None:
+                conn.execute("DELETE FROM outbox WHERE id = ?", (message_id,))
+            elif attempts >= self.max_attempts:
+                conn.execute("UPDATE outbox SET status = 'dead', last_error = ? WHERE id = ?", (str(error), message_id))
+            else:
+                delay = min(self.backoff_s * 2 ** (attempts - 1), self.max_backoff_s) * random.uniform(0.5, 1.0)
+                conn.execute("UPDATE outbox SET status = 'pending', next_at = ?, last_error = ? WHERE id = ?",
+                             (time.time() + delay, str(error), message_id))
+        with self._lock:
+            if error is None:
+                self._counts["delivered"] += 1
+            else:
+                self._counts["dead" if attempts >= self.max_attempts else "retried"] += 1
+                self.last_error = str(error)
+
+    def drain_once(self) -> bool:
+        """Deliver one due message on the calling thread. Returns False if none was due."""
+        claimed = self._claim()
+        if claimed is None:
+            return False
+        message_id, kind, payload, attempts = claimed
+        try:
+            self.handlers[kind](json.loads(payload, object_hook=_decode))
+            error = None
+        except Exception as e:
+            error = e
+            print(f"📮 OUTBOX: {kind} delivery failed (attempt {attempts}/{self.max_attempts}): {e}")
+        self._finish(message_id, attempts, error)
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                if self.drain_once():
+                    continue
+                wait_s = self._next_due_in()
+            except Exception as e:
+                # Whatever went wrong, the worker keeps going after a pause
+                print(f"📮 OUTBOX: worker error: {e}")
+                with self._lock:
+                    self.last_error = str(e)
+                wait_s = 1.0
+            with self._wake:
+                self._wake.wait(wait_s)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            depth = dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+            by_kind = dict(conn.execute("SELECT kind, COUNT(*) FROM outbox WHERE status != 'dead' GROUP BY kind"))
+            oldest = conn.execute("SELECT MIN(created_at) FROM outbox WHERE status != 'dead'").fetchone()[0]
+        with self._lock:
+            counts = dict(self._counts)
+            workers = len(self._threads)
+        return {
+            "depth": sum(depth.get(s, 0) for s in (PENDING, INFLIGHT)),
+            "pending": depth.get(PENDING, 0),
+            "inflight": depth.get(INFLIGHT, 0),
+            "dead": depth.get(DEAD, 0),
+            "by_kind": by_kind,
+            "oldest_age_s": round(time.time() - oldest, 3) if oldest is not None else 0.0,
+            "workers": workers,
+            **counts,
+            "last_error": self.last_error,
+        }
+
+OUTBOX = Outbox(config.OUTBOX_DB, config.OUTBOX_WORKERS, config.OUTBOX_MAX_ATTEMPTS, config.OUTBOX_BACKOFF_S,
+                config.OUTBOX_MAX_BACKOFF_S) if config.OUTBOX_DB else None
@@ -0,0 +1,177 @@
+from typing import Any, Dict, List, Optional
+
+from app import state_keys as K
+from app.tools.booking import target_from_state
+
+LITE_MAX_CHARS = 260
+
+# Per language: canned advice per case type (health by urgency, disaster by
+# incident type), one line per state field, and the one-line lite reply.
+TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "en": {
+        "advice": {
+            "health": {
+                "critical": "🚑 Call 1122 now. Keep the patient seated upright and calm.",
+                "high": "🩺 Get checked at an emergency department today; do not drive yourself.",
+                "medium": "🩺 Rest, drink plenty of fluids and take paracetamol for fever.",
+                "low": "🩺 Visit the nearest hospital for a check-up.",
+            },
+            "crime": "🚔 If you are in danger, call 15 now.",
+            "disaster": {
+                "Flood": "🚨 Move to higher ground and do not cross flooded roads.",
+                "Earthquake": "🚨 Stay away from damaged buildings; aftershocks are likely.",
+                "Fire": "🚨 Get everyone out and stay out. Fire brigade: 16, Rescue: 1122.",
+                "Heatwave": "🚨 Stay in the shade, keep drinking water and watch for heatstroke.",
+                "Storm": "🚨 Stay indoors, away from windows and power lines.",
+                None: "🚨 Follow the instructions of rescue teams.",
+            },
+        },
+        "target": {
+            "health": "🏥 Nearest hospital: {place}{phone}",
+            "crime": "🚔 Nearest police station: {place}{phone}",
+            "disaster": "⛺ Nearest open relief camp: {where}{distance}",
+        },
+        "distance": " ({distance_km} km)",
+        "separator": ", ",
+        "route": "🛣 Route: {route}",
+        "rescue": "📞 Rescue: 1122",
+        "booked": "📅 Appointment booked: {place} at {slot}. Bring your ID card.",
+        "not_booked": "📅 No free appointment right now; walk in or call ahead.",
+        "case_id": "📋 Case ID: {case_id}",
+        "lite": {
+            "health": "Emergency: 112. Nearest: {place}.",
+            "crime": "Police: 15. Nearest: {place}.",
+            "disaster": "Rescue: 1122. Shelter: {where}.",
+        },
+        "lite_slot": " Slot: {slot}.",
+        "lite_case_id": " Case ID: {case_id}",
+    },
+    "ur": {
+        "advice": {
+            "health": {
+                "critical": "🚑 فوراً 1122 پر کال کریں۔ مریض کو سیدھا بٹھائیں اور پرسکون رکھیں۔",
+                "high": "🩺 آج ہی ایمرجنسی میں معائنہ کروائیں، خود گاڑی نہ چلائیں۔",
+                "medium": "🩺 آرام کریں، پانی زیادہ پئیں اور بخار ہو تو پیراسیٹامول لیں۔",
+                "low": "🩺 قریبی ہسپتال میں معائنہ کروائیں۔",
+            },
+            "crime": "🚔 خطرے کی صورت میں فوراً 15 پر کال کریں۔",
+            "disaster": {
+                "Flood": "🚨 اونچی جگہ پر چلے جائیں اور پانی والی سڑکیں پار نہ کریں۔",
+                "Earthquake": "🚨 خراب عمارتوں سے دور رہیں، آفٹر شاکس آ سکتے ہیں۔",
+                "Fire": "🚨 سب کو باہر نکالیں اور واپس اندر نہ جائیں۔ فائر بریگیڈ: 16، ریسکیو: 1122",
+                "Heatwave": "🚨 سائے میں رہیں، پانی پیتے رہیں اور ہیٹ اسٹروک کی علامات پر نظر رکھیں۔",
+                "Storm": "🚨 گھر کے اندر رہیں، کھڑکیوں اور بجلی کی تاروں سے دور رہیں۔",
+                None: "🚨 ریسکیو ٹیموں کی ہدایات پر عمل کریں۔",
+            },
+        },
+        "target": {
+            "health": "🏥 قریبی ہسپتال: {place}{phone}",
+            "crime": "🚔 قریبی تھانہ: {place}{phone}",
+            "disaster": "⛺ قریبی ریلیف کیمپ: {where}{distance}",
+        },
+        "distance": " ({distance_km} کلومیٹر)",
+        "separator": "، ",
+        "route": "🛣 راستہ: {route}",
+        "rescue": "📞 ریسکیو: 1122",
+        "booked": "📅 اپوائنٹمنٹ: {place}، {slot}۔ اپنا شناختی کارڈ ساتھ لائیں۔",
+        "not_booked": "📅 ابھی کوئی وقت دستیاب نہیں، براہ راست تشریف لائیں یا فون کریں۔",
+        "case_id": "📋 کیس آئی ڈی: {case_id}",
+        "lite": {
+            "health": "ایمرجنسی: 112۔ قریبی ہسپتال: {place}۔",
+            "crime": "پولیس: 15۔ قریبی تھانہ: {place}۔",
+            "disaster": "ریسکیو: 1122۔ کیمپ: {where}۔",
+        },
+        "lite_slot": " وقت: {slot}۔",
+        "lite_case_id": " کیس آئی ڈی: {case_id}",
+    },
+}
+
+def language(lang: Optional[str]) -> str:
+    """Template language for a CreateCase.lang value ("ur", "ur-PK", ... -> "ur"; otherwise "en")."""
+    code = (lang or "en").lower().replace("_", "-").split("-")[0]
+    return code if code in TEMPLATES else "en"
+
+def _fields(t: Dict[str, Any], target: Dict[str, Any], booking: Dict[str, Any], case_id: str) -> Dict[str, Any]:
+    place = target.get("name") or target.get("station_name") or target.get("shelter_name")
+    phone = target.get("phone")
+    distance = target.get("distance_km")
+    return {
+        "place": place,
+        "phone": f" ({phone})" if phone else "",
+        # Shelters: camp, area and city, whichever are known
+        "where": t["separator"].join(str(p) for p in (place, target.get("area"), target.get("city")) if p),
+        "distance": t["distance"].format(distance_km=distance) if distance is not None else "",
+        "route": target.get("safe_evacuation_route"),
+        "slot": booking.get("slot_human"),
+        "case_id": case_id,
+    }
+
+def _canned_advice(t: Dict[str, Any], case_type: str, state: dict) -> str:
+    advice = t["advice"][case_type]
+    if case_type == "health":
+        return advice.get(state.get(K.URGENCY) or "medium", advice["medium"])
+    if case_type == "disaster":
+        return advice.get(state.get(K.INCIDENT), advice[None])
+    return advice
+
+def _lite(t: Dict[str, Any], case_type: str, fields: Dict[str, Any], booking: Dict[str, Any],
+          advice: Optional[str]) -> str:
+    """One line within LITE_MAX_CHARS; advice is shortened first, the case ID is always kept."""
+    body = t["lite"][case_type].format(**fields)
+    if booking.get("confirmed"):
+        body += t["lite_slot"].format(**fields)
+    tail = t["lite_case_id"].format(**fields)
+    room = LITE_MAX_CHARS - len(tail)
+    if advice:
+        advice = " ".join(advice.split())
+        keep = room - len(body) - 1
+        if keep >= 20:
+            advice = advice if len(advice) <= keep else advice[:keep - 1].rstrip() + "…"
+            body = f"{advice} {body}"
+    return body[:room].rstrip() + tail
+
+def lite_line(state: dict, text: Optional[str]) -> str:
+    """A free-form lite reply (LiteAgent's) as one line within LITE_MAX_CHARS
+    that ends with the case ID if it does not name it already."""
+    t = TEMPLATES[language(state.get("lang"))]
+    case_id = state.get(K.CASE_ID)
+    text = " ".join((text or "").split())
+    if case_id and case_id in text and len(text) <= LITE_MAX_CHARS:
+        return text
+    tail = t["lite_case_id"].format(case_id=case_id)
+    room = LITE_MAX_CHARS - len(tail)
+    if len(text) > room:
+        text = text[:room - 1].rstrip() + "…"
+    return (text + tail).strip()
+
+def render(state: dict, advice: Optional[str] = None) -> Optional[str]:
+    """Confirmation text from session state, or None when the state is not complete.
+
+    Complete means a health, crime or disaster case with a target facility; other
+    cases need free-form text from the FollowUp agent. ``advice`` replaces the
+    canned advice line (single-call mode gets it from the model). Honours
+    ``lang`` and, in lite mode, the one-line LITE_MAX_CHARS limit.
+    """
+    case_type = state.get(K.CASE_TYPE)
+    target = target_from_state(state)
+    t = TEMPLATES[language(state.get("lang"))]
+    if case_type not in t["target"] or not target:
+        return None
+    booking = state.get(K.BOOKING) if isinstance(state.get(K.BOOKING), dict) else {}
+    fields = _fields(t, target, booking, state.get(K.CASE_ID))
+    if not fields["place"]:
+        return None
+    if state.get(K.LITE):
+        return _lite(t, case_type, fields, booking, advice)
+
+    lines: List[str] = [advice or _canned_advice(t, case_type, state), t["target"][case_type].format(**fields)]
+    if case_type == "disaster":
+        if fields["route"]:
+            lines.append(t["route"].format(**fields))
+        lines.append(t["rescue"])
+    elif booking.get("confirmed"):
+        lines.append(t["booked"].format(**fields))
+    elif booking:
+        lines.append(t["not_booked"])
+    lines.append(t["case_id"].format(**fields))
+    return "\n".join(lines)
@@ -0,0 +1,140 @@
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.tools.spatial import to_unit_vector, unit_vectors
+
+# (south, north, west, east) in degrees, with a margin around Pakistan's borders
+PAKISTAN_BBOX = (23.5, 37.5, 60.5, 77.5)
+
+class ServiceGrid:
+    """Precomputed nearest-facility raster (a discretised Voronoi diagram).
+
+    Every cell stores the facilities that could be nearest to *some* point in
+    it. If ``f`` is nearest to the cell centre at angle ``d`` and every point
+    of the cell lies within ``h`` of the centre, the true nearest facility of
+    any point in the cell is within ``d + 2h`` of the centre, so those are
+    the only competitors. Most cells have exactly one and answer with a
+    single array read; border cells compare their few competitors exactly.
+    """
+
+    def __init__(self, bbox: Tuple[float, float, float, float], resolution_deg: float,
+                 offsets: np.ndarray, candidates: np.ndarray, vectors: np.ndarray):
+        self.south, self.north, self.west, self.east = bbox
+        self.resolution = resolution_deg
+        self.n_lat = int(math.ceil((self.north - self.south) / resolution_deg))
+        self.n_lon = int(math.ceil((self.east - self.west) / resolution_deg))
+        self.offsets = offsets
+        self.candidates = candidates
+        self.vectors = vectors
+
+    @classmethod
+    def build(cls, lats: np.ndarray, lons: np.ndarray, resolution_deg: float = 0.1,
+              bbox: Tuple[float, float, float, float] = PAKISTAN_BBOX,
+              chunk_cells: int = 4_000_000) -> "ServiceGrid":
+        """Rasterise the service areas of the given facility coordinates."""
+        south, north, west, east = bbox
+        n_lat = int(math.ceil((north - south) / resolution_deg))
+        n_lon = int(math.ceil((east - west) / resolution_deg))
+        points = unit_vectors(lats, lons).reshape(-1, 3)
+
+        center_lats = south + (np.arange(n_lat) + 0.5) * resolution_deg
+        center_lons = west + (np.arange(n_lon) + 0.5) * resolution_deg
+        grid_lat, grid_lon = np.meshgrid(center_lats, center_lons, indexing="ij")
+        centers = unit_vectors(grid_lat.ravel(), grid_lon.ravel())
+
+        # Angular half-diagonal per cell row (corners are the farthest points),
+        # padded so rounding never drops a competitor
+        half = resolution_deg / 2
+        corner_angles = np.maximum(
+            _angle(center_lats, 0.0, center_lats - half, half),
+            _angle(center_lats, 0.0, center_lats + half, half),
+        )
+        reach = np.repeat(corner_angles * 1.01 + 1e-9, n_lon)
+
+        offsets = np.zeros(n_lat * n_lon + 1, dtype=np.int64)
+        chunks = []
+        if len(points):
+            step = max(1, chunk_cells // len(points))
+            for lo in range(0, len(centers), step):
+                sims = centers[lo:lo + step] @ points.T
+                nearest = np.arccos(np.clip(sims.max(axis=1), -1.0, 1.0))
+                limit = np.minimum(nearest + 2 * reach[lo:lo + step], math.pi)
+                mask = sims >= np.cos(limit)[:, None]
+                offsets[lo + 1:lo + 1 + len(mask)] = mask.sum(axis=1)
+                chunks.append(np.nonzero(mask)[1].astype(np.int32))
+        np.cumsum(offsets, out=offsets)
+        candidates = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int32)
+        return cls(bbox, resolution_deg, offsets, candidates, points)
+
+    def _cell(self, lat: float, lon: float) -> int:
+        i = int((lat - self.south) // self.resolution)
+        j = int((lon - self.west) // self.resolution)
+        if not (0 <= i < self.n_lat and 0 <= j < self.n_lon):
+            return -1
+        return i * self.n_lon + j
+
+    def nearest(self, lat: float, lon: float) -> int:
+        """Row index of the nearest facility, or -1 outside the grid."""
+        cell = self._cell(lat, lon)
+        if cell < 0:
+            return -1
+        lo, hi = self.offsets[cell:cell + 2].tolist()
+        if hi - lo == 1:
+            return int(self.candidates[lo])
+        if hi == lo:
+            return -1
+        qx, qy, qz = to_unit_vector(lat, lon)
+        best, best_row = -2.0, -1
+        for row in self.candidates[lo:hi].tolist():
+            x, y, z = self.vectors[row].tolist()
+            sim = x * qx + y * qy + z * qz
+            if sim > best:
+                best, best_row = sim, row
+        return best_row
+
+    def nearest_many(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Vectorised ``nearest``: single-candidate cells are a gather, the rest are resolved exactly."""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        i = np.floor((lats - self.south) / self.resolution).astype(np.int64)
+        j = np.floor((lons - self.west) / self.resolution).astype(np.int64)
+        inside = (i >= 0) & (i < self.n_lat) & (j >= 0) & (j < self.n_lon)
+        cells = np.where(inside, i * self.n_lon + j, 0)
+        lo = self.offsets[cells]
+        counts = self.offsets[cells + 1] - lo
+        result = np.full(len(lats), -1, dtype=np.int64)
+        pure = inside & (counts == 1)
+        result[pure] = self.candidates[lo[pure]]
+        for q in np.flatnonzero(inside & (counts > 1)).tolist():
+            result[q] = self.nearest(float(lats[q]), float(lons[q]))
+        return result
+
+    def covers(self, lat: float, lon: float) -> bool:
+        return self._cell(lat, lon) >= 0
+
+    @property
+    def stats(self) -> dict:
+        counts = np.diff(self.offsets)
+        return {
+            "cells": int(len(counts)),
+            "resolution_deg": self.resolution,
+            "single_candidate_pct": round(float((counts == 1).mean() * 100), 1) if len(counts) else 0.0,
+            "max_candidates": int(counts.max()) if len(counts) else 0,
+            "nbytes": int(self.offsets.nbytes + self.candidates.nbytes),
+        }
+
+def _angle(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Central angle in radians between lat/lon points (degrees), vectorised."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = phi2 - phi1
+    dlam = np.radians(np.asarray(lon2, dtype=np.float64) - lon1)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def build_for(lats: np.ndarray, lons: np.ndarray, resolution_deg: float) -> Optional[ServiceGrid]:
+    """Build a grid if enabled (resolution > 0) and there is something to rasterise."""
+    if resolution_deg <= 0 or not len(lats):
+        return None
+    return ServiceGrid.build(lats, lons, resolution_deg)
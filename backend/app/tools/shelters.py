@@ -0,0 +1,83 @@
+import pathlib
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+
+from app import config
+from app.tools.facility_store import FacilityStore
+from app.tools.spatial import SphereKDTree
+
+DATA_DIR = pathlib.Path(__file__).parent.parent / "data"
+
+# Camps that can still take people, in order of preference. Full and Closed
+# camps have their own partitions and are never searched.
+AVAILABLE_STATUSES = ("Open", "Near Capacity")
+
+# A camp set up for the reported incident is preferred if it is at most this
+# much further away than the nearest available camp
+INCIDENT_DETOUR_KM = 25.0
+
+def _load_store(name: str) -> FacilityStore:
+    snapshot_dir = pathlib.Path(config.DIRECTORY_SNAPSHOT_DIR) if config.DIRECTORY_SNAPSHOT_DIR else None
+    return FacilityStore.open(DATA_DIR / name, snapshot_dir)
+
+def _build_partitions(store: FacilityStore) -> Dict[tuple, SphereKDTree]:
+    """One KD-tree per (camp_status, incident_type) pair, keyed by their labels."""
+    if not len(store):
+        return {}
+    status_codes, status_labels = store.codes("camp_status")
+    incident_codes, incident_labels = store.codes("incident_type")
+    keys = status_codes.astype(np.int64) * len(incident_labels) + incident_codes
+    partitions = {}
+    for key in np.unique(keys).tolist():
+        ids = np.flatnonzero(keys == key)
+        status = status_labels[key // len(incident_labels)]
+        incident = incident_labels[key % len(incident_labels)]
+        partitions[(status, incident)] = SphereKDTree(
+            list(zip(store.lat[ids].tolist(), store.lon[ids].tolist())), ids=ids.tolist())
+    return partitions
+
+SHELTERS = _load_store(config.SHELTERS_CSV)
+_PARTITIONS = _build_partitions(SHELTERS)
+
+def _search(lat: float, lon: float, k: int, statuses, incident: Optional[str]) -> List[tuple]:
+    """k nearest (km, row) over the partitions with the given statuses (and incident type)."""
+    hits = []
+    for (status, incident_type), tree in _PARTITIONS.items():
+        if status not in statuses:
+            continue
+        if incident is not None and incident_type.lower() != incident:
+            continue
+        hits.extend(tree.query(lat, lon, k=k))
+    hits.sort()
+    return hits[:k]
+
+def nearest_shelter(lat: Optional[float] = None, lon: Optional[float] = None,
+                    incident_type: Optional[str] = None, include_near_capacity: bool = True) -> Dict[str, Any]:
+    """Find the nearest relief shelter that is not full or closed.
+
+    Args:
+        lat, lon: Citizen location.
+        incident_type: e.g. "Flood", "Earthquake", "Fire", "Heatwave", "Storm". A camp set up
+            for that incident is preferred when it is at most INCIDENT_DETOUR_KM further away.
+        include_near_capacity: Also consider camps marked "Near Capacity".
+
+    Returns the shelter row plus ``distance_km``, or {} if no camp is available.
+    """
+    statuses = AVAILABLE_STATUSES if include_near_capacity else AVAILABLE_STATUSES[:1]
+    if lat is None or lon is None:
+        for i, status in enumerate(SHELTERS.column("camp_status") if len(SHELTERS) else []):
+            if status in statuses:
+                return SHELTERS[i]
+        return {}
+    hits = _search(lat, lon, 1, statuses, None)
+    if not hits:
+        return {}
+    if incident_type:
+        matched = _search(lat, lon, 1, statuses, incident_type.lower())
+        if matched and matched[0][0] <= hits[0][0] + INCIDENT_DETOUR_KM:
+            hits = matched
+    distance, row = hits[0]
+    record = dict(SHELTERS[row])
+    record["distance_km"] = round(distance, 2)
+    return record
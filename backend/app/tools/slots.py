@@ -0,0 +1,215 @@
+import threading
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from app import config
+
+EPOCH = datetime(2024, 1, 1)
+STRIPES = 64
+# Seats tried per booking before giving up (each failed attempt means another
+# worker holds that seat in the database)
+MAX_ATTEMPTS = 8
+
+class SlotCalendar:
+    """Booked seats of one facility as a bitmap.
+
+    Bit ``(slot - base) * capacity + seat`` is set when that seat of that
+    slot is taken. ``base`` moves forward with time and past slots are
+    shifted out, so the bitmap only ever covers the booking horizon.
+    """
+
+    __slots__ = ("base", "bitmap")
+
+    def __init__(self, base: int):
+        self.base = base
+        self.bitmap = 0
+
+class SlotInventory:
+    """Per-facility slot calendars with atomic, lock-striped reservations.
+
+    Every facility maps to one of ``STRIPES`` locks, so bookings at different
+    facilities rarely contend and there is no global lock. A seat is claimed
+    in memory under the facility's stripe and then written through the
+    database, whose unique key rejects seats another process already took.
+    Calendars are loaded from the database the first time a facility is seen,
+    and reloaded whenever it rejects a seat, since other workers have then
+    booked seats this one does not know about.
+
+    Reservations made for a ``case_id`` are remembered, so booking the same
+    case at the same facility again (e.g. a degraded rerun after a cancelled
+    booking) returns its seat instead of taking another.
+    """
+
+    def __init__(self, capacity: int = 4, slot_minutes: int = 15, horizon_hours: int = 48,
+                 db=None, persist: bool = True):
+        self.capacity = capacity
+        self.slot_minutes = slot_minutes
+        self.horizon_slots = horizon_hours * 60 // slot_minutes
+        self.persist = persist
+        self._db = db
+        self._calendars: Dict[str, SlotCalendar] = {}
+        # Seats claimed in memory whose database write has not finished, per facility
+        self._pending: Dict[str, set] = {}
+        self._locks = [threading.Lock() for _ in range(STRIPES)]
+        self._case_locks = [threading.Lock() for _ in range(STRIPES)]
+        self._by_case: Dict[str, Tuple[str, int, int]] = {}
+        self._by_case_lock = threading.Lock()
+        self._prune_at = 1024
+
+    @property
+    def db(self):
+        if self._db is None:
+            from app.database.factory import get_db
+            self._db = get_db()
+        return self._db
+
+    def _slot_of(self, when: datetime) -> int:
+        """Index of the first slot starting at or after ``when``."""
+        return -(-int((when - EPOCH).total_seconds()) // (self.slot_minutes * 60))
+
+    def slot_start(self, slot: int) -> datetime:
+        return EPOCH + timedelta(minutes=slot * self.slot_minutes)
+
+    def _lock(self, facility_id: str) -> threading.Lock:
+        return self._locks[zlib.crc32(facility_id.encode("utf-8")) % STRIPES]
+
+    def _load(self, facility_id: str, now_slot: int) -> SlotCalendar:
+        """The facility's calendar rebuilt from the database, keeping seats
+        claimed here that are still being written. Caller holds its stripe lock."""
+        cal = SlotCalendar(now_slot)
+        if self.persist:
+            for r in self.db.get_slot_reservations(facility_id, self.slot_start(now_slot)):
+                offset = self._slot_of(r["slot_start"]) - now_slot
+                if 0 <= offset < self.horizon_slots and 0 <= r["seat"] < self.capacity:
+                    cal.bitmap |= 1 << (offset * self.capacity + r["seat"])
+        for slot, seat in self._pending.get(facility_id, ()):
+            if 0 <= slot - now_slot < self.horizon_slots:
+                cal.bitmap |= 1 << ((slot - now_slot) * self.capacity + seat)
+        self._calendars[facility_id] = cal
+        return cal
+
+    def _calendar(self, facility_id: str, now_slot: int) -> SlotCalendar:
+        """The facility's calendar advanced to ``now_slot``. Caller holds its stripe lock."""
+        cal = self._calendars.get(facility_id)
+        if cal is None:
+            cal = self._load(facility_id, now_slot)
+        elif cal.base < now_slot:
+            cal.bitmap >>= (now_slot - cal.base) * self.capacity
+            cal.base = now_slot
+        return cal
+
+    def _claim(self, facility_id: str, now_slot: int, first_slot: int) -> Optional[Tuple[int, int]]:
+        """Set the first free seat bit at or after ``first_slot``; returns (slot, seat)."""
+        with self._lock(facility_id):
+            cal = self._calendar(facility_id, now_slot)
+            start = max(first_slot - cal.base, 0) * self.capacity
+            width = self.horizon_slots * self.capacity - start
+            if width <= 0:
+                return None
+            free = ~(cal.bitmap >> start) & ((1 << width) - 1)
+            if not free:
+                return None
+            bit = start + (free & -free).bit_length() - 1
+            cal.bitmap |= 1 << bit
+            claimed = cal.base + bit // self.capacity, bit % self.capacity
+            if self.persist:
+                self._pending.setdefault(facility_id, set()).add(claimed)
+            return claimed
+
+    def _clear(self, facility_id: str, slot: int, seat: int):
+        """Clear a seat's bit. Caller holds its stripe lock."""
+        cal = self._calendars.get(facility_id)
+        if cal is not None and 0 <= slot - cal.base < self.horizon_slots:
+            cal.bitmap &= ~(1 << ((slot - cal.base) * self.capacity + seat))
+
+    def _unclaim(self, facility_id: str, slot: int, seat: int):
+        with self._lock(facility_id):
+            self._clear(facility_id, slot, seat)
+
+    def _settle(self, facility_id: str, slot: int, seat: int, written: Optional[bool], now_slot: int):
+        """Finish a claimed seat's write: keep it if written, free it if the write
+        failed (None), and re-read the calendar if another process had the seat
+        (False), since this one's view of the facility is then out of date."""
+        with self._lock(facility_id):
+            pending = self._pending.get(facility_id)
+            if pending is not None:
+                pending.discard((slot, seat))
+                if not pending:
+                    del self._pending[facility_id]
+            if written is None:
+                self._clear(facility_id, slot, seat)
+            elif not written:
+                self._load(facility_id, now_slot)
+
+    def _reserve(self, facility_id: str, now_slot: int, first_slot: int, case_id: Optional[str],
+                 note: str) -> Optional[Tuple[int, int]]:
+        for _ in range(MAX_ATTEMPTS):
+            claimed = self._claim(facility_id, now_slot, first_slot)
+            if claimed is None:
+                return None
+            slot, seat = claimed
+            if not self.persist:
+                return claimed
+            try:
+                written = self.db.reserve_slot(facility_id, self.slot_start(slot), seat, case_id, note)
+            except Exception:
+                # The seat was not taken, the write failed: free it again
+                self._settle(facility_id, slot, seat, None, now_slot)
+                raise
+            self._settle(facility_id, slot, seat, written, now_slot)
+            if written:
+                return claimed
+        return None
+
+    def reserve(self, facility_id: str, earliest: datetime, case_id: Optional[str] = None,
+                note: str = "", now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Book the first free seat at or after ``earliest``, or None if the horizon is full.
+
+        Raises if the database write fails for any reason other than the seat
+        being taken; the seat is then left free.
+        """
+        now_slot = self._slot_of(now or datetime.utcnow())
+        first_slot = self._slot_of(earliest)
+        if case_id is None:
+            claimed = self._reserve(facility_id, now_slot, first_slot, case_id, note)
+        else:
+            with self._case_locks[zlib.crc32(case_id.encode("utf-8")) % STRIPES]:
+                booked = self._by_case.get(case_id)
+                if booked is not None and booked[0] == facility_id and booked[1] >= now_slot:
+                    return {"slot_start": self.slot_start(booked[1]), "seat": booked[2]}
+                claimed = self._reserve(facility_id, now_slot, first_slot, case_id, note)
+                if claimed is not None:
+                    self._remember(case_id, facility_id, *claimed, now_slot)
+        if claimed is None:
+            return None
+        return {"slot_start": self.slot_start(claimed[0]), "seat": claimed[1]}
+
+    def _remember(self, case_id: str, facility_id: str, slot: int, seat: int, now_slot: int):
+        with self._by_case_lock:
+            self._by_case[case_id] = (facility_id, slot, seat)
+            if len(self._by_case) > self._prune_at:
+                # Only bookings still ahead can be asked for again
+                self._by_case = {c: b for c, b in self._by_case.items() if b[1] >= now_slot}
+                self._prune_at = max(1024, 2 * len(self._by_case))
+
+    def release(self, facility_id: str, slot_start: datetime, seat: int) -> bool:
+        """Cancel a reservation made with ``reserve``."""
+        slot = self._slot_of(slot_start)
+        self._unclaim(facility_id, slot, seat)
+        with self._by_case_lock:
+            self._by_case = {c: b for c, b in self._by_case.items() if b != (facility_id, slot, seat)}
+        return self.db.release_slot(facility_id, slot_start, seat) if self.persist else True
+
+    def booked(self, facility_id: str) -> int:
+        """Seats currently booked within the horizon."""
+        with self._lock(facility_id):
+            cal = self._calendars.get(facility_id)
+            return bin(cal.bitmap).count("1") if cal else 0
+
+INVENTORY = SlotInventory(
+    capacity=config.BOOKING_SLOT_CAPACITY,
+    slot_minutes=config.BOOKING_SLOT_MINUTES,
+    horizon_hours=config.BOOKING_HORIZON_HOURS,
+    persist=config.BOOKING_PERSIST,
+)
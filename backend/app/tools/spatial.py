@@ -0,0 +1,249 @@
+import heapq
+import math
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+def to_unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    """Project a lat/lon pair (degrees) onto the unit sphere."""
+    phi = math.radians(lat)
+    lam = math.radians(lon)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+
+def chord_to_km(chord_sq: float) -> float:
+    """Convert a squared chord length on the unit sphere to great-circle km."""
+    chord = math.sqrt(max(chord_sq, 0.0))
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+def unit_vectors(lats, lons) -> np.ndarray:
+    """Vectorised ``to_unit_vector``: returns an ``(n, 3)`` float64 array."""
+    phi = np.radians(np.asarray(lats, dtype=np.float64))
+    lam = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_phi = np.cos(phi)
+    return np.stack((cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)), axis=-1)
+
+def dense_knn(points: np.ndarray, queries: np.ndarray, k: int = 1,
+              chunk_cells: int = 4_000_000) -> Tuple[np.ndarray, np.ndarray]:
+    """Brute-force k-NN for a batch of unit vectors using matrix products.
+
+    Returns ``(indices, distances_km)``, both shaped ``(len(queries), k)``.
+    Queries are processed in chunks so the ``queries x points`` similarity
+    matrix never exceeds ``chunk_cells`` entries.
+    """
+    m, n = len(queries), len(points)
+    k = min(k, n)
+    indices = np.empty((m, k), dtype=np.int64)
+    chord_sq = np.empty((m, k), dtype=np.float64)
+    step = max(1, chunk_cells // max(n, 1))
+    for lo in range(0, m, step):
+        sims = queries[lo:lo + step] @ points.T
+        rows = np.arange(len(sims))
+        if k <= 8:
+            # Repeated argmax: argmax returns the first maximum, so ties go
+            # to the lowest row, and each pass masks out the winner
+            for j in range(k):
+                top = np.argmax(sims, axis=1)
+                indices[lo:lo + step, j] = top
+                chord_sq[lo:lo + step, j] = 2.0 - 2.0 * sims[rows, top]
+                sims[rows, top] = -np.inf
+        else:
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            top_sims = np.take_along_axis(sims, top, axis=1)
+            order = np.lexsort((top, -top_sims), axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            indices[lo:lo + step] = top
+            chord_sq[lo:lo + step] = 2.0 - 2.0 * np.take_along_axis(sims, top, axis=1)
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.sqrt(np.maximum(chord_sq, 0.0)) / 2, 0.0, 1.0))
+    return indices, distances
+
+class SphereKDTree:
+    """KD-tree over unit-sphere vectors for nearest-neighbour lookups.
+
+    Straight-line (chord) distance between two unit vectors grows
+    monotonically with great-circle distance, so the nearest point in 3D is
+    also the nearest point by haversine. Ties are broken by the original row
+    index, which matches ``min()`` over the source list.
+
+    ``ids`` optionally maps each point to the row id reported by queries, so a
+    tree over a subset of rows can still answer in terms of the full table.
+    """
+
+    def __init__(self, points: Sequence[Tuple[float, float]], leaf_size: int = 16,
+                 ids: Optional[Sequence[int]] = None):
+        self.size = len(points)
+        self.leaf_size = max(1, leaf_size)
+        vectors = [to_unit_vector(lat, lon) for lat, lon in points]
+
+        # Node arrays; a split dimension of -1 marks a leaf bucket
+        self._dim: List[int] = []
+        self._split: List[float] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._start: List[int] = []
+        self._end: List[int] = []
+
+        order = list(range(self.size))
+        self._order: List[int] = []
+        if self.size:
+            self._build(order, vectors)
+        self._xs = [vectors[i][0] for i in self._order]
+        self._ys = [vectors[i][1] for i in self._order]
+        self._zs = [vectors[i][2] for i in self._order]
+        if ids is not None:
+            self._order = [int(ids[i]) for i in self._order]
+
+    def _new_node(self) -> int:
+        self._dim.append(-1)
+        self._split.append(0.0)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._start.append(0)
+        self._end.append(0)
+        return len(self._dim) - 1
+
+    def _build(self, order: List[int], vectors) -> int:
+        node = self._new_node()
+        if len(order) <= self.leaf_size:
+            self._start[node] = len(self._order)
+            self._order.extend(order)
+            self._end[node] = len(self._order)
+            return node
+
+        # Split on the axis with the widest spread
+        spreads = []
+        for d in range(3):
+            values = [vectors[i][d] for i in order]
+            spreads.append(max(values) - min(values))
+        dim = spreads.index(max(spreads))
+        order.sort(key=lambda i: vectors[i][dim])
+        mid = len(order) // 2
+
+        self._dim[node] = dim
+        self._split[node] = vectors[order[mid]][dim]
+        left = self._build(order[:mid], vectors)
+        right = self._build(order[mid:], vectors)
+        self._left[node] = left
+        self._right[node] = right
+        return node
+
+    def query(self, lat: float, lon: float, k: int = 1,
+              predicate: Optional[Callable[[int], bool]] = None) -> List[Tuple[float, int]]:
+        """Return up to ``k`` ``(distance_km, row_index)`` pairs, nearest first.
+
+        Rows for which ``predicate(row)`` is false are skipped while walking
+        the tree, so the search keeps going until ``k`` matching rows are found.
+        """
+        if not self.size or k < 1:
+            return []
+        q = to_unit_vector(lat, lon)
+        qx, qy, qz = q
+        xs, ys, zs, order = self._xs, self._ys, self._zs, self._order
+        dims, splits = self._dim, self._split
+        lefts, rights = self._left, self._right
+        starts, ends = self._start, self._end
+
+        # Max-heap of the current best k as (-d2, -row); heap[0] is the worst
+        best: List[Tuple[float, int]] = []
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if len(best) == k and bound > -best[0][0]:
+                continue
+            dim = dims[node]
+            if dim < 0:
+                for j in range(starts[node], ends[node]):
+                    dx = xs[j] - qx
+                    dy = ys[j] - qy
+                    dz = zs[j] - qz
+                    d2 = dx * dx + dy * dy + dz * dz
+                    row = order[j]
+                    if len(best) == k and (d2, row) > (-best[0][0], -best[0][1]):
+                        continue
+                    if predicate is not None and not predicate(row):
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-d2, -row))
+                    else:
+                        heapq.heapreplace(best, (-d2, -row))
+                continue
+            diff = q[dim] - splits[node]
+            if diff < 0:
+                near, far = lefts[node], rights[node]
+            else:
+                near, far = rights[node], lefts[node]
+            stack.append((far, max(bound, diff * diff)))
+            stack.append((near, bound))
+
+        ranked = sorted((-neg_d2, -neg_row) for neg_d2, neg_row in best)
+        return [(chord_to_km(d2), row) for d2, row in ranked]
+
+    def nearest(self, lat: float, lon: float) -> int:
+        """Return the row index of the nearest point, or -1 if the tree is empty."""
+        hits = self.query(lat, lon, k=1)
+        return hits[0][1] if hits else -1
+
+class STRTree:
+    """Static R-tree over axis-aligned boxes, bulk-loaded with Sort-Tile-Recursive packing.
+
+    Boxes are ``(min_x, min_y, max_x, max_y)``. Leaves hold up to
+    ``node_capacity`` boxes sorted into vertical slabs and then by y, so
+    siblings overlap little and a point query visits a handful of nodes.
+    """
+
+    def __init__(self, boxes: Sequence[Tuple[float, float, float, float]], node_capacity: int = 8):
+        self.boxes = [tuple(map(float, b)) for b in boxes]
+        self.node_capacity = node_capacity
+        # Each level is a list of (box, children); level 0 children are box ids,
+        # higher levels point into the level below. The last level is the root.
+        self._levels: List[List[Tuple[tuple, List[int]]]] = []
+        entries = [(b, i) for i, b in enumerate(self.boxes)]
+        while True:
+            level = self._pack(entries)
+            self._levels.append(level)
+            if len(level) <= 1:
+                break
+            entries = [(box, i) for i, (box, _) in enumerate(level)]
+
+    def _pack(self, entries: List[Tuple[tuple, int]]) -> List[Tuple[tuple, List[int]]]:
+        cap = self.node_capacity
+        if not entries:
+            return []
+        n_nodes = math.ceil(len(entries) / cap)
+        slab_size = cap * math.ceil(math.sqrt(n_nodes))
+        by_x = sorted(entries, key=lambda e: e[0][0] + e[0][2])
+        nodes = []
+        for s in range(0, len(by_x), slab_size):
+            slab = sorted(by_x[s:s + slab_size], key=lambda e: e[0][1] + e[0][3])
+            for g in range(0, len(slab), cap):
+                group = slab[g:g + cap]
+                box = (min(e[0][0] for e in group), min(e[0][1] for e in group),
+                       max(e[0][2] for e in group), max(e[0][3] for e in group))
+                nodes.append((box, [e[1] for e in group]))
+        return nodes
+
+    def query_point(self, x: float, y: float) -> List[int]:
+        """Ids of all boxes containing the point."""
+        if not self._levels or not self._levels[-1]:
+            return []
+        hits = []
+        top = len(self._levels) - 1
+        stack = [(top, i) for i in range(len(self._levels[top]))]
+        while stack:
+            depth, node = stack.pop()
+            box, children = self._levels[depth][node]
+            if not (box[0] <= x <= box[2] and box[1] <= y <= box[3]):
+                continue
+            if depth == 0:
+                for i in children:
+                    b = self.boxes[i]
+                    if b[0] <= x <= b[2] and b[1] <= y <= b[3]:
+                        hits.append(i)
+            else:
+                stack.extend((depth - 1, child) for child in children)
+        return hits
+
+    def __len__(self) -> int:
+        return len(self.boxes)
@@ -1,4 +1,4 @@
-from app.database.factory import get_db
+from app.database.factory import get_db, get_async_db
 
 def save_case(case_id: str, record: dict) -> bool:
     """Save case record to database."""
@@ -19,3 +19,11 @@ def list_cases(limit: int = 100, offset: int = 0) -> list:
     """List recent cases from database."""
     db = get_db()
     return db.list_cases(limit, offset)
+
+async def save_case_async(case_id: str, record: dict) -> bool:
+    """Save case record without blocking the event loop."""
+    return await get_async_db().save_case(case_id, record)
+
+async def get_case_async(case_id: str) -> dict | None:
+    """Retrieve case record without blocking the event loop."""
+    return await get_async_db().get_case(case_id)
@@ -0,0 +1,29 @@
+import re
+from typing import Optional
+
+from app.tools.gazetteer import normalize
+
+# Health complaints by urgency, as in the HealthAgent's guidelines
+CRITICAL = ("chest pain", "shortness of breath", "heart attack", "stroke", "unconscious", "fainted",
+            "seene ka dard", "seene mein dard", "behosh")
+HIGH = ("blood pressure", "hypertension", "high bp", "bleeding", "snake bite", "labour pain")
+# Urgency of the other case types, whatever the message says
+DEFAULTS = {"health": "medium", "crime": "medium", "disaster": "high"}
+
+def _pattern(phrases) -> re.Pattern:
+    return re.compile(rf"(?<!\w)(?:{'|'.join(map(re.escape, phrases))})(?!\w)")
+
+_CRITICAL = _pattern(CRITICAL)
+_HIGH = _pattern(HIGH)
+
+def urgency(case_type: Optional[str], message: Optional[str]) -> str:
+    """Urgency of a case: "critical", "high" or "medium" for health complaints
+    by the symptoms named, a fixed level for the other case types, "low" for
+    unknown cases."""
+    if case_type == "health":
+        text = normalize(message or "")
+        if _CRITICAL.search(text):
+            return "critical"
+        if _HIGH.search(text):
+            return "high"
+    return DEFAULTS.get(case_type, "low")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Report latency and token use of the booking stage: BookingStep vs BookingAgent
+
+Each case starts from session state as the specialist leaves it (case_id,
+case_type and a hospital target, written by its after_tool callback; the full
+chain is covered by test_agent_pipeline in test_local.py) and runs only the
+booking stage through an ADK Runner. BookingStep calls mock_book directly; BookingAgent needs a model
+turn to decide on the tool call and a second one after the tool returns.
+
+The BookingAgent run needs Gemini credentials (LLM_PROVIDER other than mock);
+without them only the BookingStep side is measured.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import statistics
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from google.adk.agents import SequentialAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from app import config
+from app import state_keys as K
+from app.agents.orchestrator import booking_agent, booking_step
+from app.tools import directory as t_dir
+from app.tools.slots import INVENTORY
+
+CASES = int(os.getenv("BENCH_CASES", "20"))
+
+async def run_stage(agent, cases: int):
+    """Per-case wall time (ms), total prompt/output tokens and bookings made."""
+    service = InMemorySessionService()
+    runner = Runner(agent=SequentialAgent(name="BookingBench", sub_agents=[agent.clone()]),
+                    app_name="booking_bench", session_service=service)
+    target = t_dir.nearest_hospital(24.8607, 67.0011)
+    latencies, prompt_tokens, output_tokens, booked = [], 0, 0, 0
+    for i in range(cases):
+        case_id = f"FC-BENCH{i:04d}"
+        await service.create_session(app_name="booking_bench", user_id="bench", session_id=case_id,
+                                     state={K.CASE_ID: case_id, K.CASE_TYPE: "health", K.TARGET: target})
+        content = types.Content(role="user", parts=[types.Part(text="Seene mein dard hai")])
+        start = time.perf_counter()
+        async for event in runner.run_async(user_id="bench", session_id=case_id, new_message=content):
+            usage = event.usage_metadata
+            if usage:
+                prompt_tokens += usage.prompt_token_count or 0
+                output_tokens += usage.candidates_token_count or 0
+        latencies.append((time.perf_counter() - start) * 1000)
+        session = await service.get_session(app_name="booking_bench", user_id="bench", session_id=case_id)
+        booked += bool(session.state.get(K.BOOKING))
+    return latencies, prompt_tokens, output_tokens, booked
+
+def report(label, latencies, prompt_tokens, output_tokens, booked):
+    print(f"\n{label}")
+    print(f"   Cases:            {len(latencies)} ({booked} booked)")
+    print(f"   Latency p50/max:  {statistics.median(latencies):.1f} / {max(latencies):.1f} ms")
+    print(f"   Tokens per case:  {prompt_tokens / len(latencies):.0f} prompt + "
+          f"{output_tokens / len(latencies):.0f} output")
+
+async def main():
+    print("🚀 Booking Stage Benchmark")
+    print("=" * 60)
+    # Keep the benchmark's reservations out of the case database
+    INVENTORY.persist = False
+
+    step = await run_stage(booking_step, CASES)
+    report("⚡ BookingStep (no LLM)", *step)
+
+    if config.LLM_PROVIDER == "mock":
+        print("\n⏭️ BookingAgent skipped: set LLM_PROVIDER and Gemini credentials to compare")
+        return
+    llm = await run_stage(booking_agent, CASES)
+    report("🤖 BookingAgent (LLM)", *llm)
+    saved_ms = statistics.median(llm[0]) - statistics.median(step[0])
+    saved_tokens = (llm[1] + llm[2] - step[1] - step[2]) / CASES
+    print(f"\n✅ Saved per case: {saved_ms:.0f} ms (p50) and {saved_tokens:.0f} tokens")
+
+if __name__ == "__main__":
+    asyncio.run(main())
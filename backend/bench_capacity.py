@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark nearest-facility lookups while a live capacity feed is publishing
+
+Every update sets beds_available and ventilators_available of a facility to the
+same value, so a lookup that ever returns a record where they differ has seen a
+half-applied update.
+"""
+
+import os
+import sys
+import time
+import random
+import threading
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.tools import directory as t_dir
+from app.tools.directory import _build_directory
+from app.tools.capacity_feed import CapacityFeed
+from app.tools.facility_store import FacilityStore
+
+DATASET = t_dir.DATA_DIR / "pakistan_health_facilities.csv"
+LAT_RANGE = (23.5, 37.5)
+LON_RANGE = (60.5, 77.5)
+DURATION_S = 3.0
+UPDATES_PER_S = 500  # far above "hundreds per minute"
+
+def lookups(stop: threading.Event, rng: random.Random):
+    """Single-point lookups until stopped; returns latencies (ms) and torn reads."""
+    latencies, torn = [], 0
+    while not stop.is_set():
+        lat, lon = rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+        start = time.perf_counter()
+        record = t_dir.nearest_many("bench", [lat], [lon])["records"][0][0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        if record.get("beds_available") != record.get("ventilators_available"):
+            torn += 1
+    return latencies, torn
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def run(label: str, feed: CapacityFeed = None):
+    rng = random.Random(7)
+    ids = list(t_dir._facility_ids(t_dir._DIRECTORIES["bench"]))
+    stop = threading.Event()
+
+    def produce():
+        while not stop.is_set():
+            value = rng.randint(0, 50)
+            feed.submit([{"kind": "bench", "facility_id": rng.choice(ids),
+                          "beds_available": value, "ventilators_available": value}])
+            time.sleep(1 / UPDATES_PER_S)
+
+    producer = threading.Thread(target=produce) if feed else None
+    if producer:
+        producer.start()
+    timer = threading.Timer(DURATION_S, stop.set)
+    timer.start()
+    latencies, torn = lookups(stop, random.Random(11))
+    if producer:
+        producer.join()
+        feed.flush()
+
+    print(f"\n{label}")
+    print(f"   Lookups:          {len(latencies):,} in {DURATION_S:.0f}s")
+    print(f"   Latency p50/p99:  {percentile(latencies, 50):.3f} / {percentile(latencies, 99):.3f} ms "
+          f"(max {max(latencies):.2f} ms)")
+    if feed:
+        stats = feed.stats
+        print(f"   Updates applied:  {stats['applied']:,} in {stats['batches']} snapshots "
+              f"(last publish {stats['last_publish_ms']:.1f} ms)")
+    print(f"   {'✅' if torn == 0 else '❌'} Half-updated records seen: {torn}")
+
+def main():
+    print("🚀 Live Capacity Feed Benchmark")
+    print("=" * 60)
+    store = FacilityStore.from_csv(DATASET)
+    # Start from a consistent state so torn reads are detectable
+    store = store.with_values({"ventilators_available": {i: v for i, v in enumerate(store.column("beds_available"))}})
+    t_dir._DIRECTORIES["bench"] = _build_directory(store)
+    print(f"{len(store):,} facilities from {DATASET.name}")
+
+    run("📍 Lookups, no updates")
+    run(f"🌊 Lookups with {UPDATES_PER_S} updates/s", CapacityFeed(flush_interval_s=0.2))
+    del t_dir._DIRECTORIES["bench"]
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark nearest-facility lookups: linear haversine scan vs spatial index vs service-area grid
+"""
+
+import os
+import sys
+import time
+import random
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.tools import directory as t_dir
+from app.tools.directory import _haversine, _build_directory
+from app.tools.facility_store import FacilityStore
+from app.tools.service_grid import ServiceGrid
+
+# Rough bounding box for Pakistan
+LAT_RANGE = (23.5, 37.5)
+LON_RANGE = (60.5, 77.5)
+QUERIES = 1000
+BATCH = 10_000
+GRID_DEG = 0.1
+
+def make_facilities(n: int, rng: random.Random):
+    """Generate facility rows shaped like the CSV rows (string coordinates)."""
+    return [
+        {
+            "name": f"Facility {i}",
+            "lat": f"{rng.uniform(*LAT_RANGE):.6f}",
+            "lon": f"{rng.uniform(*LON_RANGE):.6f}",
+        }
+        for i in range(n)
+    ]
+
+def linear_nearest(rows, lat, lon):
+    """The original lookup: min() over every row with per-row float parsing."""
+    return min(rows,
+               key=lambda h: _haversine(lat, lon,
+                                        float(h.get("lat", 0) or 0),
+                                        float(h.get("lon", 0) or 0)))
+
+def bench(n: int):
+    rng = random.Random(n)
+    rows = make_facilities(n, rng)
+    queries = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(QUERIES)]
+
+    start = time.perf_counter()
+    store = FacilityStore.from_rows(rows)
+    t_dir._DIRECTORIES["bench"] = _build_directory(store)
+    build_s = time.perf_counter() - start
+    index = t_dir._DIRECTORIES["bench"]["index"]
+
+    # The linear scan is slow at 100k; time a subset and extrapolate per query
+    linear_sample = queries[: max(10, QUERIES // (n // 1000 or 1))]
+    start = time.perf_counter()
+    linear_hits = [linear_nearest(rows, lat, lon) for lat, lon in linear_sample]
+    linear_ms = (time.perf_counter() - start) * 1000 / len(linear_sample)
+
+    start = time.perf_counter()
+    index_hits = [store[index.nearest(lat, lon)] for lat, lon in queries]
+    index_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    mismatches = sum(1 for a, b in zip(linear_hits, index_hits) if a != b)
+
+    print(f"\n📍 {n:,} facilities")
+    print(f"   Index build:      {build_s * 1000:9.1f} ms")
+    print(f"   Linear scan:      {linear_ms:9.3f} ms/query ({len(linear_sample)} queries)")
+    print(f"   KD-tree:          {index_ms:9.3f} ms/query ({len(queries)} queries)")
+    print(f"   Speedup:          {linear_ms / index_ms:9.1f}x")
+    print(f"   {'✅' if mismatches == 0 else '❌'} Results match linear scan: "
+          f"{len(linear_sample) - mismatches}/{len(linear_sample)}")
+
+    # Bulk resolution: per-point calls vs one nearest_many() batch
+    batch = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(BATCH)]
+    lats = [lat for lat, _ in batch]
+    lons = [lon for _, lon in batch]
+    start = time.perf_counter()
+    looped = [t_dir.nearest_many("bench", [lat], [lon])["indices"][0, 0] for lat, lon in batch]
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = t_dir.nearest_many("bench", lats, lons)
+    batch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    t_dir.nearest_many("bench", lats, lons, k=5)
+    batch_k5_s = time.perf_counter() - start
+
+    agree = int((result["indices"][:, 0] == looped).sum())
+    print(f"   {BATCH:,} points, single calls: {loop_s * 1000:9.1f} ms")
+    print(f"   {BATCH:,} points, nearest_many: {batch_s * 1000:9.1f} ms (k=5: {batch_k5_s * 1000:.1f} ms)")
+    print(f"   {'✅' if agree == BATCH else '❌'} Batch agrees with single lookups: {agree}/{BATCH}")
+
+    # Service-area grid: O(1) cell reads for k=1, exact near borders
+    start = time.perf_counter()
+    grid = ServiceGrid.build(store.lat, store.lon, GRID_DEG)
+    grid_build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    grid_hits = [grid.nearest(lat, lon) for lat, lon in queries]
+    grid_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    tree_hits = [index.nearest(lat, lon) for lat, lon in queries]
+    agree = sum(1 for a, b in zip(grid_hits, tree_hits) if a == b)
+    stats = grid.stats
+    print(f"   Grid {GRID_DEG}° build:   {grid_build_s * 1000:9.1f} ms ({stats['cells']:,} cells, "
+          f"{stats['single_candidate_pct']}% single-candidate, {stats['nbytes'] / 1e6:.1f} MB)")
+    print(f"   Grid lookup:      {grid_ms:9.4f} ms/query vs KD-tree {index_ms:.4f}")
+    print(f"   {'✅' if agree == len(queries) else '❌'} Grid agrees with KD-tree: {agree}/{len(queries)}")
+    del t_dir._DIRECTORIES["bench"]
+
+def main():
+    print("🚀 Directory Lookup Benchmark")
+    print("=" * 60)
+    for n in (3_211, 10_000, 100_000):
+        bench(n)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Event-loop lag benchmark for case persistence and notification
+
+Finishes BENCH_CASES cases from BENCH_CONCURRENCY concurrent tasks the way
+process_case does, by saving the record and sending the SMS. It does this once
+with the blocking save_case/send_sms called on the event loop (before) and
+once with the awaited thread-pool variants (after). A probe task asks to wake
+up every 5 ms; how late it wakes is the lag every other request on the worker
+would see. Each mode runs against a fresh SQLite file, both as is and with
+BENCH_DB_DELAY_MS of extra latency per database call, standing in for a
+Firestore round trip.
+"""
+
+import io
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import contextlib
+import statistics
+from datetime import datetime
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from app import config
+from app.database.async_db import ThreadPoolDatabase
+from app.database.sqlite_db import SQLiteDatabase
+from app.tools import notify
+
+CASES = int(os.getenv("BENCH_CASES", "300"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "50"))
+DB_DELAY_MS = float(os.getenv("BENCH_DB_DELAY_MS", "20"))
+TICK_S = 0.005
+
+class DelayedSQLite(SQLiteDatabase):
+    """SQLite with a fixed extra wait per write, like a network round trip."""
+
+    def __init__(self, db_path: str, delay_ms: float):
+        super().__init__(db_path)
+        self.delay_s = delay_ms / 1000
+
+    def save_case(self, case_id, record):
+        time.sleep(self.delay_s)
+        return super().save_case(case_id, record)
+
+def record(case_id: str) -> dict:
+    return {"case_id": case_id, "created_at": datetime.utcnow(), "case_type": "health", "urgency": "high",
+            "lite": False, "target": {"name": "Civil Hospital Karachi"}, "booking": None,
+            "confirmation": f"Help is on the way. Case ID: {case_id}", "district": "Karachi South"}
+
+async def probe(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_S)
+        lags.append((time.perf_counter() - start - TICK_S) * 1000)
+
+async def run(mode: str, db: SQLiteDatabase) -> dict:
+    pool = ThreadPoolDatabase(db, config.DB_POOL_WORKERS)
+    slots = asyncio.Semaphore(CONCURRENCY)
+
+    async def complete(i: int):
+        case_id = f"FC-{mode[0].upper()}{i:06d}"
+        async with slots:
+            if mode == "blocking":
+                db.save_case(case_id, record(case_id))
+                notify.send_sms("+920000000000", f"Case ID: {case_id}")
+            else:
+                await pool.save_case(case_id, record(case_id))
+                await notify.send_sms_async("+920000000000", f"Case ID: {case_id}")
+
+    stop, lags = asyncio.Event(), []
+    monitor = asyncio.create_task(probe(stop, lags))
+    await asyncio.sleep(TICK_S * 4)
+    start = time.perf_counter()
+    await asyncio.gather(*(complete(i) for i in range(CASES)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    lags.sort()
+    return {"rate": CASES / elapsed, "p50": statistics.median(lags),
+            "p99": lags[int(len(lags) * 0.99)], "max": lags[-1]}
+
+def main():
+    print("🚀 Event-Loop Lag Benchmark")
+    print("=" * 60)
+    print(f"{CASES} cases from {CONCURRENCY} tasks, {config.DB_POOL_WORKERS} database threads, "
+          f"{config.NOTIFY_POOL_WORKERS} notification threads")
+    with tempfile.TemporaryDirectory() as tmp:
+        for delay_ms in (0, DB_DELAY_MS):
+            print(f"\n💾 SQLite{f' + {delay_ms:.0f} ms per write' if delay_ms else ''}")
+            for mode in ("blocking", "thread pool"):
+                db = DelayedSQLite(os.path.join(tmp, f"cases_{delay_ms:.0f}_{mode[0]}.db"), delay_ms)
+                with contextlib.redirect_stdout(io.StringIO()):  # send_sms prints
+                    result = asyncio.run(run(mode, db))
+                print(f"   {mode:<12} {result['rate']:7.0f} cases/s   loop lag p50 {result['p50']:6.1f} ms, "
+                      f"p99 {result['p99']:7.1f} ms, max {result['max']:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark facility directory startup: CSV dicts vs columnar store vs mmap snapshot
+
+Each variant runs in a fresh interpreter so startup time and RSS are isolated.
+"""
+
+import os
+import sys
+import csv
+import json
+import shutil
+import pathlib
+import subprocess
+import tempfile
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+BACKEND_DIR = pathlib.Path(__file__).parent
+DATASET = BACKEND_DIR / "app" / "data" / "pakistan_health_facilities.csv"
+SCALE = 30  # replicate the dataset to ~96k rows for the large run
+
+PROBE = r'''
+import sys, time, json
+sys.path.insert(0, {backend!r})
+import numpy  # imported up front so every variant pays the same baseline
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+before = rss_kb()
+start = time.perf_counter()
+mode, path = {mode!r}, {path!r}
+if mode == "csv_dicts":
+    import csv
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    coords = [(float(r.get("lat", 0) or 0), float(r.get("long", r.get("lon", 0)) or 0)) for r in rows]
+elif mode == "columnar_csv":
+    from app.tools.facility_store import FacilityStore
+    rows = FacilityStore.from_csv(path)
+else:
+    from app.tools.facility_store import FacilityStore
+    rows = FacilityStore.load(path)
+    rows.lat.sum(); rows.lon.sum()  # touch the coordinate pages
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "rss_mb": (rss_kb() - before) / 1024, "rows": len(rows)}}))
+'''
+
+def probe(mode: str, path: pathlib.Path) -> dict:
+    code = PROBE.format(backend=str(BACKEND_DIR), mode=mode, path=str(path))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def scaled_copy(src: pathlib.Path, dest: pathlib.Path, factor: int):
+    with open(src, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        fields = reader.fieldnames
+    with open(dest, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for _ in range(factor):
+            writer.writerows(rows)
+
+def run(csv_path: pathlib.Path, workdir: pathlib.Path):
+    from app.tools.facility_store import FacilityStore
+    snapshot = workdir / (csv_path.stem + ".fcs")
+    FacilityStore.from_csv(csv_path).save(snapshot)
+
+    print(f"\n📦 {csv_path.name} ({csv_path.stat().st_size / 1e6:.1f} MB CSV, "
+          f"{snapshot.stat().st_size / 1e6:.1f} MB snapshot)")
+    for label, mode, path in (("CSV -> list of dicts", "csv_dicts", csv_path),
+                              ("CSV -> columnar store", "columnar_csv", csv_path),
+                              ("mmap snapshot", "snapshot", snapshot)):
+        r = probe(mode, path)
+        print(f"   {label:24s} {r['ms']:9.1f} ms   +{r['rss_mb']:7.1f} MB RSS   ({r['rows']:,} rows)")
+
+def main():
+    print("🚀 Facility Store Startup Benchmark")
+    print("=" * 60)
+    workdir = pathlib.Path(tempfile.mkdtemp())
+    try:
+        run(DATASET, workdir)
+        big = workdir / f"pakistan_health_facilities_x{SCALE}.csv"
+        scaled_copy(DATASET, big, SCALE)
+        run(big, workdir)
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark gazetteer matching: Aho-Corasick automaton vs scanning every name
+
+Synthetic Roman-Urdu place names pad the gazetteer up to 50k entries. The
+automaton's cost per message should stay flat as the gazetteer grows and rise
+with message length; the naive scan grows with the number of names.
+"""
+
+import os
+import sys
+import time
+import random
+import itertools
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.tools.gazetteer import Gazetteer, collect_places, load_aliases, normalize, _sources
+
+SYLLABLES = ["gul", "shan", "abad", "pur", "nagar", "kot", "garh", "wala", "mir", "khan", "chak", "dera",
+             "sher", "jahan", "bagh", "mandi", "pind", "noor", "qila", "sar", "ali", "tando", "bad", "kali",
+             "shah", "pak", "fateh", "jang", "haveli", "zai", "ganj", "rasul", "saidu", "baz", "dar", "jan"]
+FILLER = ("mujhe madad chahiye seene mein dard hai bukhar aur saans ki takleef ghar mein pani aa gaya "
+          "please send help my mother is sick near the main road").split()
+SIZES = (1_000, 10_000, 50_000)
+MESSAGES = 300
+
+def synthetic_places(n: int, rng: random.Random):
+    names = set()
+    combos = itertools.product(SYLLABLES, repeat=3)
+    for parts in combos:
+        names.add(" ".join(parts) if rng.random() < 0.3 else "".join(parts))
+        if len(names) >= n:
+            break
+    return [{"name": name, "kind": rng.choice(["city", "district"]), "city": None,
+             "lat": rng.uniform(24, 36), "lon": rng.uniform(62, 75)} for name in names]
+
+def messages(words: int, names, rng: random.Random):
+    out = []
+    for _ in range(MESSAGES):
+        text = [rng.choice(FILLER) for _ in range(words)]
+        text.insert(rng.randrange(len(text)), rng.choice(names))
+        out.append(" ".join(text))
+    return out
+
+def naive_matches(names, text):
+    """The straightforward alternative: test every name against the message."""
+    text = normalize(text)
+    return [n for n in names if n in text]
+
+def timed(fn, texts):
+    start = time.perf_counter()
+    for t in texts:
+        fn(t)
+    return (time.perf_counter() - start) * 1e6 / len(texts)
+
+def main():
+    print("🚀 Gazetteer Matching Benchmark")
+    print("=" * 60)
+    rng = random.Random(3)
+    real = collect_places(_sources())
+    aliases = load_aliases()
+
+    print(f"\n📚 Gazetteer size (messages of ~40 words)")
+    for size in SIZES:
+        places = real + synthetic_places(size - len(real), rng)
+        start = time.perf_counter()
+        gazetteer = Gazetteer(places, aliases)
+        build_ms = (time.perf_counter() - start) * 1000
+        names = [normalize(p["name"]) for p in places]
+        # Areas only resolve together with their city, so mention cities and districts
+        mentionable = [p["name"] for p in places if p["kind"] != "area"]
+        texts = messages(40, mentionable, rng)
+        found = sum(1 for t in texts if gazetteer.locate(t))
+        auto_us = timed(gazetteer.locate, texts)
+        naive_us = timed(lambda t: naive_matches(names, t), texts[:50])
+        print(f"   {size:>6,} names: build {build_ms:7.1f} ms | automaton {auto_us:8.1f} us/msg | "
+              f"scan all names {naive_us:9.1f} us/msg | {'✅' if found == len(texts) else '❌'} {found}/{len(texts)} located")
+
+    print(f"\n📏 Message length ({SIZES[-1]:,} names)")
+    for words in (10, 40, 160, 640):
+        texts = messages(words, mentionable, rng)
+        print(f"   {words:>4} words: automaton {timed(gazetteer.locate, texts):8.1f} us/msg")
+
+if __name__ == "__main__":
+    main()
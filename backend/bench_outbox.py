@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the response-path cost of saving a case and sending its SMS
+
+Completes BENCH_CASES cases from BENCH_CONCURRENCY concurrent tasks and times
+what the citizen's response waits for after the agents are done:
+
+- awaited: the case saved through ThreadPoolDatabase, then the SMS sent through
+  send_sms_async (delivery happens inside the request)
+- outbox: one local append to the outbox; its workers deliver afterwards
+
+Both run against a fresh SQLite case file with BENCH_DB_DELAY_MS extra per
+write (a Firestore round trip), and an SMS provider that takes BENCH_SMS_MS
+and fails BENCH_FAIL_RATE of its calls. Awaited failures are lost (as before
+the outbox); the outbox retries them. Reports p50/p99 of the waiting time,
+and for the outbox how long delivery took and what was delivered.
+"""
+
+import io
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+import contextlib
+import statistics
+from datetime import datetime
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from app import config
+from app.database.async_db import ThreadPoolDatabase
+from app.database.sqlite_db import SQLiteDatabase
+from app.tools import notify
+from app.tools.outbox import Outbox, CASE, SMS
+
+CASES = int(os.getenv("BENCH_CASES", "300"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "50"))
+DB_DELAY_MS = float(os.getenv("BENCH_DB_DELAY_MS", "20"))
+SMS_MS = float(os.getenv("BENCH_SMS_MS", "150"))
+FAIL_RATE = float(os.getenv("BENCH_FAIL_RATE", "0.1"))
+
+class DelayedSQLite(SQLiteDatabase):
+    """SQLite with a fixed extra wait per write, like a network round trip."""
+
+    def save_case(self, case_id, record):
+        time.sleep(DB_DELAY_MS / 1000)
+        return super().save_case(case_id, record)
+
+def provider_sms(to: str, text: str) -> dict:
+    time.sleep(SMS_MS / 1000)
+    return {"ok": random.random() >= FAIL_RATE}
+
+def record(case_id: str) -> dict:
+    return {"case_id": case_id, "created_at": datetime.utcnow(), "case_type": "health", "urgency": "high",
+            "lite": False, "target": {"name": "Civil Hospital Karachi"}, "booking": None,
+            "confirmation": f"Help is on the way. Case ID: {case_id}", "district": "Karachi South"}
+
+def percentiles(values: list) -> str:
+    values = sorted(values)
+    return f"p50 {statistics.median(values):7.1f} ms, p99 {values[int(len(values) * 0.99)]:7.1f} ms"
+
+async def complete_all(finish) -> list:
+    slots = asyncio.Semaphore(CONCURRENCY)
+
+    async def complete(i: int):
+        case_id = f"FC-{i:08X}"
+        async with slots:
+            start = time.perf_counter()
+            await finish(case_id)
+            return (time.perf_counter() - start) * 1000
+
+    return await asyncio.gather(*(complete(i) for i in range(CASES)))
+
+def run_awaited(tmp: str):
+    db = DelayedSQLite(os.path.join(tmp, "cases_awaited.db"))
+    pool = ThreadPoolDatabase(db, config.DB_POOL_WORKERS)
+    sent = []
+    notify.send_sms = provider_sms  # send_sms_async calls it through the module
+
+    async def finish(case_id):
+        await pool.save_case(case_id, record(case_id))
+        sent.append((await notify.send_sms_async("+920000000000", f"Case ID: {case_id}"))["ok"])
+
+    return asyncio.run(complete_all(finish)), sent.count(False)
+
+def run_outbox(tmp: str):
+    db = DelayedSQLite(os.path.join(tmp, "cases_outbox.db"))
+
+    def deliver_sms(payload):
+        if not provider_sms(payload["to"], payload["text"])["ok"]:
+            raise RuntimeError("provider refused")
+
+    outbox = Outbox(os.path.join(tmp, "outbox.db"), config.OUTBOX_WORKERS, config.OUTBOX_MAX_ATTEMPTS,
+                    backoff_s=0.05, max_backoff_s=1,
+                    handlers={CASE: lambda p: db.save_case(p["case_id"], p["record"]), SMS: deliver_sms})
+
+    async def finish(case_id):
+        outbox.enqueue(case_id, record(case_id), {"to": "+920000000000", "text": f"Case ID: {case_id}"})
+
+    start = time.perf_counter()
+    latencies = asyncio.run(complete_all(finish))
+    peak = outbox.stats["depth"]
+    while outbox.stats["depth"]:
+        time.sleep(0.1)
+    drained_s = time.perf_counter() - start
+    return latencies, outbox.stats, drained_s, peak
+
+def main():
+    print("🚀 Outbox Benchmark")
+    print("=" * 60)
+    print(f"{CASES} cases from {CONCURRENCY} tasks; database +{DB_DELAY_MS:.0f} ms per write, "
+          f"SMS {SMS_MS:.0f} ms with {FAIL_RATE:.0%} failures")
+    random.seed(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):  # per-message logging
+            awaited, lost = run_awaited(tmp)
+            queued, stats, drained_s, peak = run_outbox(tmp)
+    print(f"\n⏳ Awaited save + SMS")
+    print(f"   Response waits: {percentiles(awaited)}")
+    print(f"   SMS lost:       {lost} of {CASES}")
+    print(f"\n📮 Outbox ({config.OUTBOX_WORKERS} delivery workers)")
+    print(f"   Response waits: {percentiles(queued)}")
+    print(f"   Delivered:      {stats['delivered']} of {stats['enqueued']} in {drained_s:.1f} s "
+          f"({stats['retried']} retries, {stats['dead']} dead, depth {peak} after the burst)")
+
+if __name__ == "__main__":
+    main()
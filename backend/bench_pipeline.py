@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark the two pipeline modes: ADK agent chain vs one structured Gemini call
+
+The agent chain (Orchestrator -> specialist via AgentTool -> booking -> FollowUp)
+makes several sequential model calls, each re-sending the conversation. The
+single-call mode makes one call with a JSON response schema and runs the
+directory/booking tools and the reply in Python.
+
+The Python side of single-call mode is always measured with fixed decisions.
+The end-to-end comparison needs Gemini credentials (LLM_PROVIDER other than mock).
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import pathlib
+import statistics
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from app import config
+from app import state_keys as K
+from app.tools.slots import INVENTORY
+from app.agents.single_call import TriageDecision, apply_decision, decide
+
+ASSETS = pathlib.Path(__file__).resolve().parent.parent / "attached_assets"
+REQUESTS_JSON = ASSETS / "frontline_worker_requests_clean_220_1759022144720.json"
+KARACHI = {"lat": 24.8607, "lon": 67.0011}
+CASES = int(os.getenv("BENCH_CASES", "20"))
+
+DECISIONS = [
+    TriageDecision(case_type="health", urgency="critical", advice="Sit upright and stay calm.", er_only=True, min_beds=1),
+    TriageDecision(case_type="crime", urgency="medium", advice="Note the time and place, keep your CNIC ready."),
+    TriageDecision(case_type="disaster", urgency="high", advice="Move to higher ground.", incident_type="Flood"),
+    TriageDecision(case_type="unknown", urgency="low", advice="Your request has been forwarded."),
+]
+
+def messages():
+    with open(REQUESTS_JSON, encoding="utf-8") as f:
+        texts = sorted({r["request_text"] for r in json.load(f)})
+    return (texts * (CASES // len(texts) + 1))[:CASES]
+
+def new_state(message: str) -> dict:
+    case_id = f"FC-{uuid.uuid4().hex[:8].upper()}"
+    return {K.CASE_ID: case_id, "user_message": message, "location": dict(KARACHI),
+            "battery_pct": 80, "bandwidth_kbps": 1000, "lang": "en", K.LITE: False}
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def report(label, latencies, calls=None, tokens=None):
+    print(f"\n{label}")
+    print(f"   Latency p50/p95:  {statistics.median(latencies):.1f} / {percentile(latencies, 95):.1f} ms")
+    if calls is not None:
+        print(f"   Model calls/case: {calls / len(latencies):.1f}")
+    if tokens is not None:
+        print(f"   Tokens/case:      {tokens / len(latencies):.0f}")
+
+async def run_chain(texts):
+    from app.agents.orchestrator import root_agent
+    service = InMemorySessionService()
+    runner = Runner(agent=root_agent, app_name="pipeline_bench", session_service=service)
+    latencies, calls, tokens = [], 0, 0
+    for text in texts:
+        state = new_state(text)
+        await service.create_session(app_name="pipeline_bench", user_id="bench",
+                                     session_id=state[K.CASE_ID], state=state)
+        content = types.Content(role="user", parts=[types.Part(text=text)])
+        start = time.perf_counter()
+        async for event in runner.run_async(user_id="bench", session_id=state[K.CASE_ID], new_message=content):
+            if event.usage_metadata:
+                calls += 1
+                tokens += event.usage_metadata.total_token_count or 0
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, calls, tokens
+
+async def run_single(texts):
+    latencies, tokens = [], 0
+    for text in texts:
+        state = new_state(text)
+        start = time.perf_counter()
+        decision, usage = await decide(state)
+        apply_decision(state, decision)
+        latencies.append((time.perf_counter() - start) * 1000)
+        tokens += (usage.total_token_count or 0) if usage else 0
+    return latencies, len(texts), tokens
+
+async def main():
+    print("🚀 Pipeline Mode Benchmark")
+    print("=" * 60)
+    # Keep the benchmark's reservations out of the case database
+    INVENTORY.persist = False
+
+    latencies = []
+    for i in range(200):
+        start = time.perf_counter()
+        apply_decision(new_state("bench"), DECISIONS[i % len(DECISIONS)])
+        latencies.append((time.perf_counter() - start) * 1000)
+    report("🐍 Single-call mode, Python side only (tools + booking + reply)", latencies)
+
+    if config.LLM_PROVIDER == "mock":
+        print("\n⏭️ End-to-end comparison skipped: set LLM_PROVIDER and Gemini credentials")
+        return
+    texts = messages()
+    chain = await run_chain(texts)
+    report(f"🔗 Agent chain ({len(texts)} cases)", *chain)
+    single = await run_single(texts)
+    report(f"⚡ Single call ({len(texts)} cases)", *single)
+    ratio = statistics.median(single[0]) / statistics.median(chain[0])
+    print(f"\n{'✅' if ratio < 0.5 else '❌'} Single-call p50 is {ratio:.0%} of the agent chain's")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark the generated-response cache on the sample request log
+
+Replays the 220 frontline requests as cases: case type from the keyword router,
+target facility from the citizen's profile location, then one cache lookup per
+specialist/FollowUp reply, storing a stand-in text on every miss. Reports the
+hit rate (each hit is a Gemini generation saved) and the lookup cost with and
+without the SQLite tier.
+"""
+
+import os
+import sys
+import json
+import time
+import pathlib
+import tempfile
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from app import state_keys as K
+from app.callbacks.response_cache import ResponseCache, cache_key, from_template, to_template
+from app.tools import directory as t_dir
+from app.tools.gazetteer import locate
+from app.tools.keyword_router import route
+
+ASSETS = pathlib.Path(__file__).resolve().parent.parent / "attached_assets"
+REQUESTS_JSON = ASSETS / "frontline_worker_requests_clean_220_1759022144720.json"
+NEAREST = {"health": t_dir.nearest_hospital, "crime": t_dir.nearest_police}
+
+def cases():
+    with open(REQUESTS_JSON, encoding="utf-8") as f:
+        requests = json.load(f)
+    for r in requests:
+        case_type = route(r["request_text"])["case_type"]
+        where = locate(r["citizen_profile"]["location"]) or {}
+        nearest = NEAREST.get(case_type)
+        yield {
+            K.CASE_ID: r["case_id"],
+            K.CASE_TYPE: case_type,
+            K.LITE: False,
+            K.TARGET: nearest(where.get("lat"), where.get("lon")) if nearest else None,
+            "user_message": r["request_text"],
+            "lang": "en",
+        }
+
+def replay(cache: ResponseCache, states):
+    start = time.perf_counter()
+    for state in states:
+        for agent in ("Specialist", "FollowUpAgent"):
+            key = cache_key(agent, state)
+            text = cache.get(key)
+            if text is None:
+                cache.put(key, to_template(f"Advice for {state[K.CASE_TYPE]}. Case ID: {state[K.CASE_ID]}", state))
+            else:
+                assert from_template(text, state).endswith(state[K.CASE_ID])
+    return (time.perf_counter() - start) * 1e6 / (2 * len(states))
+
+def main():
+    print("🚀 Response Cache Benchmark")
+    print("=" * 60)
+    states = list(cases())
+    print(f"{len(states)} cases, {len({s['user_message'] for s in states})} distinct messages")
+
+    cache = ResponseCache(maxsize=2048, ttl_s=3600)
+    us = replay(cache, states)
+    stats = cache.stats
+    print(f"\n🧠 Memory only")
+    print(f"   Hit rate:      {stats['hit_rate']:.1%} ({stats['hits']} of {stats['lookups']} generations saved)")
+    print(f"   Entries:       {stats['size']}")
+    print(f"   Lookup+store:  {us:.0f} us per reply")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "response_cache.db")
+        us = replay(ResponseCache(maxsize=2048, ttl_s=3600, db_path=path), states)
+        print(f"\n💾 Memory + SQLite")
+        print(f"   Lookup+store:  {us:.0f} us per reply")
+        # A restarted worker starts with an empty memory tier
+        restarted = ResponseCache(maxsize=2048, ttl_s=3600, db_path=path)
+        replay(restarted, states)
+        stats = restarted.stats
+        print(f"   After restart: {stats['hit_rate']:.1%} hit rate, {stats['sqlite_hits']} from SQLite")
+
+if __name__ == "__main__":
+    main()
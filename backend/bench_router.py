@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark case routing: compiled keyword pattern vs substring scans
+
+The legacy router tested each hard-coded English keyword with ``in``, so it
+paid for every keyword on every message, matched "pain" inside "painter" and
+could not read Urdu. The multilingual table is several times larger than the
+legacy lists, so it is also scanned keyword-by-keyword for a like-for-like
+comparison. Accuracy is measured on the labelled frontline requests plus a
+handful of Urdu / Roman-Urdu messages.
+"""
+
+import os
+import sys
+import json
+import csv
+import time
+import random
+import pathlib
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.tools.keyword_router import route, KEYWORDS_CSV
+
+ASSETS = pathlib.Path(__file__).resolve().parent.parent / "attached_assets"
+REQUESTS_JSON = ASSETS / "frontline_worker_requests_clean_220_1759022144720.json"
+# request_type in the labelled requests -> case type
+LABELS = {
+    "Crime Report": "crime", "Fraud Report": "crime", "Public Safety": "crime",
+    "Ambulance Request": "health", "Medical Triage": "health", "Public Health Service": "health",
+    "Fire Emergency": "disaster", "Flood Evacuation": "disaster", "Earthquake Response": "disaster",
+    "Urban Services": "unknown",
+}
+MULTILINGUAL = [
+    ("Mere walid ko seene mein dard hai, saans nahi aa rahi", "health"),
+    ("Bachay ko tez bukhar hai teen din se", "health"),
+    ("میرے والد کو سینے میں درد ہے", "health"),
+    ("Mera mobile chori ho gaya bazar mein", "crime"),
+    ("میرا بٹوہ چوری ہو گیا", "crime"),
+    ("Gaon mein selab aa gaya hai, pani ghar mein hai", "disaster"),
+    ("ہمارے علاقے میں سیلاب آ گیا ہے", "disaster"),
+    ("Zalzala aya hai, deewar gir gayi", "disaster"),
+    ("The painter needs a ladder for the wall", "unknown"),
+]
+ROUNDS = 200
+
+def legacy_route(text: str) -> str:
+    """The original _mock_route: substring tests against two English lists."""
+    msg = (text or "").lower()
+    if any(k in msg for k in ["robbery", "theft", "chori", "fir", "violence", "harassment", "snatched",
+                              "stolen", "wallet", "mobile"]):
+        return "crime"
+    if any(k in msg for k in ["fever", "bukhar", "chest pain", "blood", "vaccine", "medicine", "stroke",
+                              "pain", "sick", "hospital", "health", "emergency"]):
+        return "health"
+    return "unknown"
+
+def table_scan(keywords):
+    """Legacy-style routing over the full multilingual table: one ``in`` per keyword."""
+    def scan(text):
+        msg = (text or "").lower()
+        scores = {}
+        for keyword, case_type, weight in keywords:
+            if keyword in msg:
+                scores[case_type] = scores.get(case_type, 0.0) + weight
+        return max(scores, key=scores.get) if scores else "unknown"
+    return scan
+
+def samples():
+    with open(REQUESTS_JSON, encoding="utf-8") as f:
+        labelled = [(r["request_text"], LABELS[r["request_type"]]) for r in json.load(f)]
+    return labelled, MULTILINGUAL
+
+def accuracy(fn, data):
+    return sum(1 for text, label in data if fn(text) == label) / len(data)
+
+def timed(fn, texts):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for t in texts:
+            fn(t)
+    return (time.perf_counter() - start) * 1e6 / (ROUNDS * len(texts))
+
+def main():
+    print("🚀 Case Routing Benchmark")
+    print("=" * 60)
+    labelled, multilingual = samples()
+    texts = [t for t, _ in labelled + multilingual]
+    new_route = lambda t: route(t)["case_type"]
+
+    with open(KEYWORDS_CSV, newline="", encoding="utf-8") as f:
+        table = [(r["keyword"].lower(), r["case_type"], float(r["weight"])) for r in csv.DictReader(f)]
+    routers = (
+        ("🐢 Legacy substring scans (22 keywords)", legacy_route),
+        (f"🐢 Substring scans over the full table ({len(table)} keywords)", table_scan(table)),
+        ("⚡ Compiled keyword pattern", new_route),
+    )
+    for label, fn in routers:
+        print(f"\n{label}")
+        print(f"   Latency:           {timed(fn, texts):.1f} us/msg")
+        print(f"   Labelled requests: {accuracy(fn, labelled):.1%} of {len(labelled)}")
+        print(f"   Urdu/Roman Urdu:   {accuracy(fn, multilingual):.1%} of {len(multilingual)}")
+
+    print("\n📏 Message length (us/msg: full-table scans vs compiled pattern)")
+    rng = random.Random(5)
+    for words in (10, 40, 160):
+        long_texts = [" ".join(rng.choices(" ".join(texts).split(), k=words)) for _ in range(50)]
+        print(f"   {words:>4} words: {timed(routers[1][1], long_texts):7.1f} vs {timed(new_route, long_texts):7.1f}")
+
+    misses = [(t, l, new_route(t)) for t, l in labelled + multilingual if new_route(t) != l]
+    print(f"\n🔎 Compiled pattern misroutes: {len(misses)} (distinct messages below)")
+    for text, want, got in sorted(set(misses)):
+        print(f"   {want:>8} -> {got:<8} {text[:70]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Soak benchmark of the ADK session store
+
+Pushes the session traffic of BENCH_CASES cases (default one million) through
+the session service: each case creates its session, appends the events a
+routed, booked case produces (message, Orchestrator call, specialist result,
+booking, reply) and reads the final state, as process_case does. Resident
+memory is sampled as it goes, each store in a fresh process:
+
+- BoundedSessionService with the session deleted after each case (production)
+- BoundedSessionService with sessions never deleted (TTL/LRU eviction only)
+- the plain InMemorySessionService, for BENCH_BASELINE_CASES cases
+"""
+
+import os
+import sys
+import time
+import asyncio
+import subprocess
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from app import state_keys as K
+from app.session_store import BoundedSessionService
+
+CASES = int(os.getenv("BENCH_CASES", "1000000"))
+BASELINE_CASES = int(os.getenv("BENCH_BASELINE_CASES", "20000"))
+SAMPLES = 10
+HOSPITAL = {"name": "Civil Hospital Karachi", "address": "M.A. Jinnah Rd, Karachi", "phone": "+92-21-99215740",
+            "type": "Hospital", "lat": "24.8615", "lon": "67.0253", "district": "Karachi South"}
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def case_events(case_id: str, invocation_id: str):
+    """The non-partial events of one health case through the agent chain."""
+    def event(author, parts=None, delta=None):
+        return Event(invocation_id=invocation_id, author=author,
+                     content=types.Content(role="model" if author != "user" else "user", parts=parts) if parts else None,
+                     actions=EventActions(state_delta=delta or {}))
+    return [
+        event("user", [types.Part(text="Seene mein dard hai, saans lene mein mushkil")]),
+        event("Orchestrator", [types.Part(function_call=types.FunctionCall(
+            name="HealthAgent", args={"request": "chest pain and shortness of breath"}))]),
+        event("Orchestrator", [types.Part(function_response=types.FunctionResponse(
+            name="HealthAgent", response={"result": dict(HOSPITAL)}))]),
+        event("Orchestrator", [types.Part(text="health")], {K.CASE_TYPE: "health", K.URGENCY: "critical"}),
+        event("BookingStep", delta={K.BOOKING: {"confirmed": True, "facility": HOSPITAL["name"],
+                                                "slot": "2026-10-17T14:15:00", "case_id": case_id}}),
+        event("ReplyStep", delta={K.CONFIRMATION_TEXT: "🩺 Sit upright and stay calm.\n🏥 Civil Hospital Karachi"
+                                                       f"\n📋 Case ID: {case_id}"}),
+    ]
+
+async def soak(service, cases: int, delete: bool) -> list:
+    samples, start = [], time.perf_counter()
+    for i in range(cases):
+        case_id = f"FC-{i:08X}"
+        state = {K.CASE_ID: case_id, "user_message": "Seene mein dard hai", "location": {"lat": 24.86, "lon": 67.0},
+                 "lang": "ur", K.LITE: False, K.DEADLINE: time.time() + 20}
+        session = await service.create_session(app_name="soak", user_id="citizen", session_id=case_id, state=state)
+        for event in case_events(case_id, f"e-{case_id}"):
+            await service.append_event(session, event)
+        await service.get_session(app_name="soak", user_id="citizen", session_id=case_id,
+                                  config=GetSessionConfig(num_recent_events=0))
+        if delete:
+            await service.delete_session(app_name="soak", user_id="citizen", session_id=case_id)
+        if (i + 1) % (cases // SAMPLES) == 0:
+            samples.append((i + 1, rss_mb(), time.perf_counter() - start))
+    return samples
+
+def report(title: str, samples: list, start_mb: float):
+    print(f"\n{title}")
+    for n, mb, elapsed in samples:
+        print(f"   {n:>9,} cases   RSS {mb:7.1f} MB (+{mb - start_mb:6.1f})   {elapsed:6.0f} s")
+
+async def run(store: str):
+    start_mb = rss_mb()
+    if store == "deleted":
+        service = BoundedSessionService(max_sessions=10000, ttl_s=900, max_events=50)
+        report(f"🧹 Bounded, deleted after each case ({CASES:,} cases)",
+               await soak(service, CASES, delete=True), start_mb)
+        print(f"   {service.stats}")
+    elif store == "evicted":
+        service = BoundedSessionService(max_sessions=10000, ttl_s=900, max_events=50)
+        report(f"📦 Bounded, never deleted: LRU cap {service.max_sessions:,} ({CASES:,} cases)",
+               await soak(service, CASES, delete=False), start_mb)
+        print(f"   {service.stats}")
+    else:
+        samples = await soak(InMemorySessionService(), BASELINE_CASES, delete=False)
+        report(f"📈 InMemorySessionService ({BASELINE_CASES:,} cases)", samples, start_mb)
+        per_case_kb = (samples[-1][1] - start_mb) * 1024 / BASELINE_CASES
+        print(f"   ~{per_case_kb:.1f} KB per case: ~{per_case_kb * CASES / 1024 ** 2:.1f} GB after {CASES:,} cases")
+
+def main():
+    print("🚀 Session Store Soak Benchmark")
+    print("=" * 60)
+    print(f"{len(case_events('FC-0', 'e-0'))} events per case")
+    for store in ("deleted", "evicted", "in_memory"):
+        subprocess.run([sys.executable, __file__, store], check=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        asyncio.run(run(sys.argv[1]))
+    else:
+        main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark speculative specialist execution against the sequential agent chain
+
+Runs the distinct sample requests through the real ADK workflow with a scripted
+stand-in model (fixed latency per call, BENCH_MODEL_MS) so the measurement
+needs no credentials. The stand-in Orchestrator routes each message to its
+labelled case type; the keyword router's prediction decides what is started
+speculatively, so mispredictions cost what they would in production.
+
+Reports p50 latency per mode, how many speculations were committed and the
+latency saved vs work wasted (GET /admin/agents shows the same counters live).
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import pathlib
+import statistics
+from typing import AsyncGenerator
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from app import state_keys as K
+from app.agents import orchestrator as o
+from app.callbacks import speculation
+from app.callbacks.response_cache import CACHE
+from app.tools.keyword_router import route
+from app.tools.slots import INVENTORY
+
+ASSETS = pathlib.Path(__file__).resolve().parent.parent / "attached_assets"
+REQUESTS_JSON = ASSETS / "frontline_worker_requests_clean_220_1759022144720.json"
+MODEL_MS = float(os.getenv("BENCH_MODEL_MS", "200"))
+LABELS = {
+    "Crime Report": "crime", "Fraud Report": "crime", "Public Safety": "crime",
+    "Ambulance Request": "health", "Medical Triage": "health", "Public Health Service": "health",
+    "Fire Emergency": "disaster", "Flood Evacuation": "disaster", "Earthquake Response": "disaster",
+    "Urban Services": "unknown",
+}
+SPECIALISTS = {"health": ("HealthAgent", "nearest_hospital"), "crime": ("CrimeAgent", "nearest_police"),
+               "disaster": ("DisasterAgent", "nearest_shelter")}
+KARACHI = {"lat": 24.8607, "lon": 67.0011}
+
+class ScriptedModel(BaseLlm):
+    """Answers like the agents would, after MODEL_MS: the Orchestrator calls the
+    labelled specialist, a specialist calls its directory tool and then replies."""
+    model: str = "scripted"
+    routes: dict = {}
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(MODEL_MS / 1000)
+        instruction = str(llm_request.config.system_instruction or "")
+        after_tool = any(p.function_response for p in llm_request.contents[-1].parts or [])
+        if "main router" in instruction:
+            message = next(p.text for c in llm_request.contents for p in c.parts or [] if p.text)
+            specialist = SPECIALISTS.get(self.routes.get(message))
+            if after_tool or specialist is None:
+                part = types.Part(text="routed")
+            else:
+                part = types.Part(function_call=types.FunctionCall(name=specialist[0], args={"request": message}))
+        elif after_tool or "final response generator" in instruction:
+            part = types.Part(text="Keep calm; help is on the way.")
+        else:
+            tool = next(tool for agent, tool in SPECIALISTS.values() if agent in instruction or tool in instruction)
+            part = types.Part(function_call=types.FunctionCall(name=tool, args=dict(KARACHI)))
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+def labelled_messages():
+    with open(REQUESTS_JSON, encoding="utf-8") as f:
+        return sorted({(r["request_text"], LABELS[r["request_type"]]) for r in json.load(f)})
+
+async def run_case(runner, service, message, case_id, mode, spec_runners):
+    state = {K.CASE_ID: case_id, "user_message": message, "location": dict(KARACHI), "lang": "en", K.LITE: False}
+    start = time.perf_counter()
+    if mode != "off":
+        predicted = route(message)
+        speculation.start(case_id, predicted["case_type"], state, predicted["incident"],
+                          spec_runners.get(predicted["case_type"]) if mode == "llm" else None)
+    await service.create_session(app_name="spec_bench", user_id="bench", session_id=case_id, state=state)
+    content = types.Content(role="user", parts=[types.Part(text=message)])
+    async for _ in runner.run_async(user_id="bench", session_id=case_id, new_message=content):
+        pass
+    speculation.finish(case_id)
+    return (time.perf_counter() - start) * 1000
+
+async def main():
+    print("🚀 Speculative Specialist Benchmark")
+    print("=" * 60)
+    # Keep reservations out of the case database and every model call real
+    INVENTORY.persist = False
+    CACHE.maxsize = 0
+    data = labelled_messages()
+    model = ScriptedModel(routes=dict(data))
+    for agent in (o.orchestrator, o.health_agent, o.crime_agent, o.disaster_agent, o.lite_agent,
+                  o.followup_agent, o.reply_step.sub_agents[0], *o.SPECULATIVE_AGENTS.values()):
+        agent.model = model
+    service = InMemorySessionService()
+    runner = Runner(agent=o.root_agent, app_name="spec_bench", session_service=service)
+    spec_runners = {key: Runner(agent=agent, app_name="spec_bench", session_service=service)
+                    for key, agent in o.SPECULATIVE_AGENTS.items()}
+    correct = sum(1 for m, label in data if route(m)["case_type"] == label)
+    print(f"{len(data)} distinct messages, model latency {MODEL_MS:.0f} ms, "
+          f"keyword prediction right for {correct}")
+
+    baseline = None
+    for mode in ("off", "lookup", "llm"):
+        speculation.TIMINGS.reset()
+        latencies = [await run_case(runner, service, m, f"FC-{mode}-{i:03d}", mode, spec_runners)
+                     for i, (m, _) in enumerate(data)]
+        p50 = statistics.median(latencies)
+        baseline = baseline or p50
+        spec = speculation.TIMINGS.stats["speculation"]
+        print(f"\n{'⏳' if mode == 'off' else '🔮'} SPECULATIVE_MODE={mode}")
+        print(f"   Latency p50:   {p50:.0f} ms ({p50 / baseline:.0%} of sequential)")
+        if mode != "off":
+            print(f"   Committed:     {spec['committed']} of {spec['started']} "
+                  f"({spec['turns_replayed']} model turns replayed)")
+            print(f"   Saved/wasted:  {spec['saved_ms']:.0f} ms / {spec['wasted_ms']:.0f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark the tier-0 case classifier: skip rate vs accuracy per threshold
+
+10-fold cross-validation over app/data/labelled_cases.csv (the routing keywords
+are always in the training folds). For each confidence threshold it reports the
+share of held-out messages that would skip the Orchestrator and how many of
+those skips pick the right case type, plus training and prediction cost.
+"""
+
+import os
+import sys
+import csv
+import time
+import random
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.tools.case_classifier import HashedNgramClassifier, load_training_data, LABELLED_CSV
+
+FOLDS = 10
+THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9)
+
+def cross_validate(texts, labels, keyword_texts, keyword_labels):
+    order = list(range(len(texts)))
+    random.Random(0).shuffle(order)
+    held_out = []
+    for fold in range(FOLDS):
+        test = set(order[fold::FOLDS])
+        train = [i for i in order if i not in test]
+        model = HashedNgramClassifier().fit([texts[i] for i in train] + keyword_texts,
+                                            [labels[i] for i in train] + keyword_labels)
+        held_out += [(model.predict(texts[i]), labels[i]) for i in test]
+    return held_out
+
+def main():
+    print("🚀 Tier-0 Classifier Benchmark")
+    print("=" * 60)
+    all_texts, all_labels = load_training_data()
+    with open(LABELLED_CSV, newline="", encoding="utf-8") as f:
+        n = sum(1 for _ in csv.DictReader(f))
+    texts, labels = all_texts[:n], all_labels[:n]
+    keyword_texts, keyword_labels = all_texts[n:], all_labels[n:]
+    print(f"{n} labelled messages + {len(keyword_texts)} routing keywords")
+
+    start = time.perf_counter()
+    model = HashedNgramClassifier().fit(all_texts, all_labels)
+    print(f"\n⏱️ Training:   {(time.perf_counter() - start) * 1000:.0f} ms")
+    start = time.perf_counter()
+    for _ in range(20):
+        for t in texts:
+            model.predict(t)
+    print(f"⏱️ Prediction: {(time.perf_counter() - start) * 1e6 / (20 * n):.0f} us/msg")
+
+    held_out = cross_validate(texts, labels, keyword_texts, keyword_labels)
+    correct = sum(1 for (p, _), y in held_out if p == y)
+    print(f"\n🎯 {FOLDS}-fold accuracy (argmax): {correct / len(held_out):.1%}")
+    print("\n   threshold | skip rate | accuracy of skips")
+    for threshold in THRESHOLDS:
+        skipped = [(p, y) for (p, conf), y in held_out if conf >= threshold]
+        acc = sum(1 for p, y in skipped if p == y) / len(skipped) if skipped else 0.0
+        print(f"   {threshold:>9.2f} | {len(skipped) / len(held_out):>9.1%} | {acc:>6.1%} ({len(skipped)} msgs)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark of the API at 1, 2 and 4 uvicorn workers
+
+Starts ``uvicorn bench_workers:app --workers N`` for each worker count, with
+ADK sessions in a shared SQLite file (SESSION_DB) and the agent models
+replaced by the scripted stand-in of bench_speculation (BENCH_MODEL_MS per
+call), then posts BENCH_CASES cases from BENCH_CONCURRENCY clients. Reports
+cases/s and latency percentiles, and checks every case can be read back from
+whichever worker answers and that no session is left behind.
+
+Scaling is bounded by the vCPUs available: on a single core more workers only
+add context switches.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import socket
+import tempfile
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+CASES = int(os.getenv("BENCH_CASES", "200"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "16"))
+WORKERS = [int(n) for n in os.getenv("BENCH_WORKERS", "1,2,4").split(",")]
+PORT = int(os.getenv("BENCH_PORT", "8011"))
+KARACHI = {"lat": 24.8607, "lon": 67.0011}
+# Scripted models need no credentials, but the app only builds its runners with a project set
+os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "bench")
+os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+
+if __name__ != "__main__":
+    # Imported by uvicorn in each worker: the real app on scripted models
+    from app.main import app  # noqa: F401
+    from app.agents import orchestrator as o
+    from bench_speculation import ScriptedModel, labelled_messages
+
+    _model = ScriptedModel(routes=dict(labelled_messages()))
+    for _agent in (o.orchestrator, o.health_agent, o.crime_agent, o.disaster_agent, o.lite_agent,
+                   o.followup_agent, o.reply_step.sub_agents[0], *o.SPECULATIVE_AGENTS.values()):
+        _agent.model = _model
+
+def wait_ready(timeout_s: float = 120) -> bool:
+    import requests
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{PORT}/health", timeout=1).ok:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+def post_case(message: str):
+    import requests
+    start = time.perf_counter()
+    response = requests.post(f"http://127.0.0.1:{PORT}/cases", json={"message": message, **KARACHI}, timeout=120)
+    body = response.json()
+    return response.status_code, body.get("case_id"), body.get("degraded"), (time.perf_counter() - start) * 1000
+
+def run(workers: int, messages: list, tmp: str) -> dict:
+    import requests
+    session_db = os.path.join(tmp, f"sessions_{workers}.db")
+    env = dict(os.environ, LLM_PROVIDER="vertex", SESSION_DB=session_db,
+               SQLITE_DB_PATH=os.path.join(tmp, f"cases_{workers}.db"), CLUSTER_WINDOW_S="0",
+               RESPONSE_CACHE_SIZE="0", TIER0_CONFIDENCE="2", DIRECTORY_WATCH_INTERVAL_S="0")
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "bench_workers:app", "--port", str(PORT),
+                               "--workers", str(workers), "--log-level", "warning"],
+                              cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_ready():
+            raise RuntimeError(f"uvicorn with {workers} workers did not start")
+        # Warm every worker's imports and agents before timing
+        with ThreadPoolExecutor(CONCURRENCY) as pool:
+            list(pool.map(post_case, messages[:CONCURRENCY]))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(CONCURRENCY) as pool:
+            results = list(pool.map(post_case, (messages[i % len(messages)] for i in range(CASES))))
+        elapsed = time.perf_counter() - start
+        ids = [case_id for status, case_id, _, _ in results if status == 200]
+        readable = sum(requests.get(f"http://127.0.0.1:{PORT}/cases/{case_id}", timeout=10).ok for case_id in ids)
+        with sqlite3.connect(session_db) as conn:
+            left = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        latencies = sorted(ms for _, _, _, ms in results)
+        return {"ok": len(ids), "unique": len(set(ids)), "readable": readable, "sessions_left": left,
+                "degraded": sum(bool(degraded) for _, _, degraded, _ in results),
+                "rate": len(ids) / elapsed, "p50": statistics.median(latencies),
+                "p95": latencies[int(len(latencies) * 0.95)]}
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+def main():
+    from bench_speculation import MODEL_MS, labelled_messages
+    print("🚀 Multi-Worker Throughput Benchmark")
+    print("=" * 60)
+    with socket.socket() as s:
+        if s.connect_ex(("127.0.0.1", PORT)) == 0:
+            sys.exit(f"port {PORT} is in use (set BENCH_PORT)")
+    messages = [m for m, _ in labelled_messages()]
+    print(f"{CASES} cases from {CONCURRENCY} clients, model latency {MODEL_MS:.0f} ms, {os.cpu_count()} CPUs")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in WORKERS:
+            result = run(workers, messages, tmp)
+            baseline = baseline or result["rate"]
+            print(f"\n👷 {workers} worker{'s' if workers > 1 else ''}")
+            print(f"   Throughput:   {result['rate']:.1f} cases/s ({result['rate'] / baseline:.2f}x)")
+            print(f"   Latency:      p50 {result['p50']:.0f} ms, p95 {result['p95']:.0f} ms")
+            print(f"   Cases:        {result['ok']}/{CASES} ok, {result['unique']} unique ids, "
+                  f"{result['readable']} readable from any worker, {result['degraded']} degraded")
+            print(f"   Sessions:     {result['sessions_left']} left in the shared store")
+
+if __name__ == "__main__":
+    main()
@@ -59,6 +59,16 @@ async def test_mock_agent():
                 "bandwidth_kbps": 30
             }
         },
+        {
+            "name": "Disaster - Flood",
+            "state": {
+                K.CASE_ID: "FC-TEST005",
+                "user_message": "Flood water is entering our house, we need a shelter",
+                "location": {"lat": 24.86, "lon": 67.01},
+                "battery_pct": 50,
+                "bandwidth_kbps": 400
+            }
+        },
         {
             "name": "General Query",
             "state": {
@@ -86,7 +96,7 @@ async def test_mock_agent():
         
         target = result_state.get(K.TARGET)
         if target:
-            print(f"Target Facility: {target.get('name') or target.get('station_name')}")
+            print(f"Target Facility: {target.get('name') or target.get('station_name') or target.get('shelter_name')}")
             print(f"Address: {target.get('address')}")
         
         booking = result_state.get(K.BOOKING)
@@ -119,6 +129,145 @@ def test_directory_tools():
     print(f"Address: {police.get('address')}")
     print(f"Phone: {police.get('phone')}")
 
+    # Spatial index must agree with a plain linear haversine scan
+    print("\n🧭 Testing Spatial Index vs Linear Scan")
+    probes = [(24.815, 67.030), (31.510, 74.350), (33.71, 73.06), (30.2, 71.5), (40.7282, -73.9942)]
+    for lat, lon in probes:
+        linear = min(t_dir.HOSPITALS,
+                     key=lambda h: t_dir._haversine(lat, lon, float(h["lat"]), float(h["lon"])))
+        indexed = t_dir.nearest_hospital(lat, lon)
+        status = "✅" if indexed == linear else "❌"
+        print(f"{status} ({lat}, {lon}) -> {indexed.get('name')}")
+
+    # Service-area grid must give the same answers as the KD-tree
+    print("\n🗾 Testing Service-Area Grid")
+    from app.tools.service_grid import ServiceGrid
+    police = t_dir._DIRECTORIES["police"]
+    grid = ServiceGrid.build(police["rows"].lat, police["rows"].lon, 0.25)
+    grid_probes = probes + [(25.4, 68.36), (34.01, 71.58), (27.7, 68.85)]
+    mismatches = [(lat, lon) for lat, lon in grid_probes
+                  if grid.covers(lat, lon) and grid.nearest(lat, lon) != police["index"].nearest(lat, lon)]
+    status = "✅" if not mismatches else "❌"
+    print(f"{status} Grid matches KD-tree on {len(grid_probes)} probes ({grid.stats['cells']:,} cells)")
+
+    # Filtered k-nearest lookups
+    print("\n🚑 Testing Filtered Facility Search")
+    found = t_dir.find_facilities("hospital", 31.510, 74.350, k=2, er_only=True)
+    status = "✅" if found["results"] and all(r.get("type") == "ER" for r in found["results"]) else "❌"
+    print(f"{status} ER only near Lahore: {[r.get('name') for r in found['results']]}")
+    found = t_dir.find_facilities("police", k=3, district="Lahore")
+    status = "✅" if all(r.get("district") == "Lahore" for r in found["results"]) else "❌"
+    print(f"{status} Police in Lahore district: {found['count']} found")
+
+    # Capacity updates publish a new snapshot; old snapshots are left untouched
+    print("\n🛏️ Testing Live Capacity Updates")
+    before = t_dir._DIRECTORIES["hospital"]
+    name = before["rows"][0]["name"]
+    t_dir.apply_capacity_updates("hospital", [{"facility_id": name, "beds_available": 7}])
+    t_dir.apply_capacity_updates("hospital", [{"facility_id": name, "beds_available": -2, "mode": "add"}])
+    after = t_dir._DIRECTORIES["hospital"]
+    status = "✅" if after["rows"][0].get("beds_available") == "5" and not before["rows"].has_column("beds_available") else "❌"
+    print(f"{status} {name}: beds_available=5 published, previous snapshot unchanged")
+    status = "✅" if after["index"] is before["index"] else "❌"
+    print(f"{status} Spatial index shared between snapshots")
+    found = t_dir.find_facilities("hospital", 24.815, 67.030, k=1, min_beds=5)
+    status = "✅" if found["results"] and found["results"][0]["name"] == name else "❌"
+    print(f"{status} Capacity filter sees live value: {[r['name'] for r in found['results']]}")
+
+    # A bad update is rejected on its own; the rest of its batch is published
+    from pydantic import ValidationError
+    from app.schemas import CapacityUpdate
+    from app.tools.capacity_feed import CapacityFeed
+    try:
+        CapacityUpdate(facility_id=name, kind="hosptial", beds_available=3)
+        status = "❌"
+    except ValidationError:
+        status = "✅"
+    print(f"{status} Misspelt kind refused by the schema")
+    feed = CapacityFeed(flush_interval_s=0)
+    feed._pending = [{"facility_id": name, "beds_available": "lots"},
+                     {"facility_id": name, "ventilators_available": 4}]
+    flushed = feed.flush()
+    after = t_dir._DIRECTORIES["hospital"]
+    status = "✅" if (flushed["applied"] == 1 and [r["facility_id"] for r in flushed["rejected"]] == [name]
+                     and after["rows"][0].get("ventilators_available") == "4"
+                     and after["rows"][0].get("beds_available") == "5"
+                     and feed.stats["rejected"] == 1) else "❌"
+    print(f"{status} Bad update rejected, valid one published: {flushed}")
+
+    # Shelter lookups must skip Full and Closed camps
+    print("\n⛺ Testing Shelter Lookup")
+    from app.tools import shelters as t_shelters
+    shelter = t_shelters.nearest_shelter(24.86, 67.01, incident_type="Flood")
+    status = "✅" if shelter.get("camp_status") in t_shelters.AVAILABLE_STATUSES else "❌"
+    print(f"{status} Nearest flood shelter: {shelter.get('shelter_name')} ({shelter.get('camp_status')}, {shelter.get('distance_km')} km)")
+    open_rows = [r for r in t_shelters.SHELTERS if r["camp_status"] in t_shelters.AVAILABLE_STATUSES]
+    linear = min(open_rows, key=lambda r: t_dir._haversine(33.7, 73.0, float(r["shelter_lat"]), float(r["shelter_long"])))
+    found = t_shelters.nearest_shelter(33.7, 73.0)
+    status = "✅" if found.get("record_id") == linear["record_id"] else "❌"
+    print(f"{status} Matches linear scan over open camps: {found.get('shelter_name')}")
+
+    # Place names in the message stand in for missing coordinates
+    print("\n📍 Testing Gazetteer Location Inference")
+    from app.tools.gazetteer import locate
+    for message, expected in [("Seene mein dard hai, main Lahore mein hoon", "Lahore"),
+                              ("میں کراچی میں ہوں", "Karachi"),
+                              ("Flood in Township, Karachi", "Township"),
+                              ("The painter fell off a ladder", None)]:
+        place = locate(message)
+        status = "✅" if (place or {}).get("name") == expected else "❌"
+        print(f"{status} '{message}' -> {place and place['name']}")
+
+    # Every directory entry must resolve to the district it is listed under
+    print("\n🗺️ Testing District Resolver")
+    from app.tools.districts import resolve_district
+    wrong = [r["name"] for r in list(t_dir.HOSPITALS) + list(t_dir.POLICE)
+             if resolve_district(float(r["lat"]), float(r["lon"])) != r["district"]]
+    status = "✅" if not wrong else "❌"
+    print(f"{status} Facilities resolve to their listed district ({len(wrong)} mismatches)")
+    status = "✅" if resolve_district(40.7282, -73.9942) is None else "❌"
+    print(f"{status} Points outside the boundaries resolve to None")
+
+    # Snapshots must round-trip every row of the source CSV
+    print("\n📦 Testing Facility Store Snapshot")
+    import tempfile, pathlib
+    from app.tools.facility_store import FacilityStore
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = FacilityStore.from_csv(t_dir.DATA_DIR / "hospital.csv").save(pathlib.Path(tmp) / "hospital.fcs")
+        loaded = FacilityStore.load(snapshot)
+        status = "✅" if list(loaded) == list(FacilityStore.from_csv(t_dir.DATA_DIR / "hospital.csv")) else "❌"
+        print(f"{status} Snapshot rows match CSV: {len(loaded)} rows, {len(loaded.columns)} columns")
+        loaded.close()
+
+        # Freshness is decided from size and mtime; the CSV is hashed only when they differ
+        from app.tools import facility_store
+        csv_copy = pathlib.Path(tmp) / "hospital.csv"
+        csv_copy.write_bytes((t_dir.DATA_DIR / "hospital.csv").read_bytes())
+        FacilityStore.from_csv(csv_copy).save(facility_store.snapshot_path(csv_copy))
+        hashed, digest = [], facility_store._digest
+        facility_store._digest = lambda path: hashed.append(path) or digest(path)
+        try:
+            fresh = FacilityStore.open(csv_copy)
+            os.utime(csv_copy, ns=(0, 0))
+            touched = FacilityStore.open(csv_copy)
+            csv_copy.write_bytes(csv_copy.read_bytes() + b"\n")
+            edited = FacilityStore.open(csv_copy)
+        finally:
+            facility_store._digest = digest
+        ok = fresh._mmap is not None and touched._mmap is not None and edited._mmap is None and len(hashed) == 2
+        print(f"{'✅' if ok else '❌'} Snapshot kept without hashing, after a touch and dropped after an edit "
+              f"({len(hashed)} hashes)")
+        fresh.close()
+        touched.close()
+
+        # Only the facility CSVs are snapshotted and watched, not the routing data
+        from app import config
+        built = facility_store.build_snapshots(snapshot_dir=pathlib.Path(tmp))
+        watched = [name for name, _, _ in t_dir._data_fingerprint()]
+        ok = (sorted(p.name for p in built) == sorted(pathlib.Path(n).stem + ".fcs" for n in config.FACILITY_CSVS)
+              and sorted(watched) == sorted({config.HOSPITALS_CSV, config.POLICE_CSV}))
+        print(f"{'✅' if ok else '❌'} Snapshots built for {[p.name for p in built]}, watching {watched}")
+
 def test_booking_tools():
     """Test the booking tools directly."""
     print("\n📅 Testing Booking Tools")
@@ -143,6 +292,409 @@ def test_booking_tools():
     confirmation = t_booking.draft_confirmation("FC-TEST001", booking, False)
     print(f"Confirmation: {confirmation}")
 
+    # A facility never accepts more bookings than it has seats
+    from datetime import datetime, timedelta
+    from app.tools.slots import SlotInventory
+    inventory = SlotInventory(capacity=2, slot_minutes=30, horizon_hours=2, persist=False)
+    now = datetime.utcnow()
+    results = [inventory.reserve("test-clinic", now) for _ in range(10)]
+    booked = [r for r in results if r]
+    seats = {(r["slot_start"], r["seat"]) for r in booked}
+    status = "✅" if len(booked) == 8 and len(seats) == 8 else "❌"
+    print(f"{status} Slot inventory: {len(booked)}/10 booked for 8 seats, {len(seats)} distinct")
+    inventory.release("test-clinic", booked[0]["slot_start"], booked[0]["seat"])
+    again = inventory.reserve("test-clinic", now)
+    status = "✅" if again == booked[0] else "❌"
+    print(f"{status} Released seat is booked again: {again and again['slot_start'].strftime('%H:%M')}")
+
+    # A failed database write frees its seat instead of counting it as taken
+    import sqlite3
+
+    class LockedDatabase:
+        def get_slot_reservations(self, facility_id, since):
+            return []
+
+        def reserve_slot(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    inventory = SlotInventory(capacity=2, slot_minutes=30, horizon_hours=2, db=LockedDatabase())
+    try:
+        inventory.reserve("locked-clinic", now, case_id="FC-LOCKED")
+        raised = False
+    except sqlite3.OperationalError:
+        raised = True
+    status = "✅" if raised and inventory._calendars["locked-clinic"].bitmap == 0 else "❌"
+    print(f"{status} Failed write raises and leaves every seat free")
+
+    # Booking the same case twice returns its first seat
+    inventory = SlotInventory(capacity=2, slot_minutes=30, horizon_hours=2, persist=False)
+    first = inventory.reserve("test-clinic", now, case_id="FC-TWICE")
+    second = inventory.reserve("test-clinic", now, case_id="FC-TWICE")
+    other = inventory.reserve("test-clinic", now, case_id="FC-OTHER")
+    status = "✅" if first == second and other != first else "❌"
+    print(f"{status} Same case rebooked keeps seat {first['seat']} at {first['slot_start'].strftime('%H:%M')}")
+
+    # Two workers on one database: a seat the other took makes this one reload its calendar
+    import tempfile
+    from app.database.sqlite_db import SQLiteDatabase
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteDatabase(os.path.join(tmp, "slots.db"))
+        worker_a, worker_b = SlotInventory(db=db), SlotInventory(db=db)
+        worker_a.reserve("shared-clinic", now)
+        taken = sum(worker_b.reserve("shared-clinic", now) is not None for _ in range(40))
+        late = worker_a.reserve("shared-clinic", now)
+        seats = len(db.get_slot_reservations("shared-clinic", now - timedelta(hours=1)))
+    status = "✅" if taken == 40 and late is not None and seats == 42 else "❌"
+    print(f"{status} Worker A still books after worker B took {taken} seats ({seats} in the database)")
+
+def test_booking_step():
+    """Test the deterministic booking stage through an ADK runner."""
+    print("\n🧾 Testing Booking Step (no LLM)")
+    print("=" * 50)
+
+    from google.adk.agents import SequentialAgent
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+    from app.agents.booking_agent import booking_step
+
+    service = InMemorySessionService()
+    runner = Runner(agent=SequentialAgent(name="BookingTest", sub_agents=[booking_step.clone()]),
+                    app_name="booking_test", session_service=service)
+    target = {"name": "City General Hospital", "address": "123 Main St"}
+    for case_id, case_type, expect_booking in [("FC-STEP001", "health", True), ("FC-STEP002", "disaster", False)]:
+        service.create_session_sync(app_name="booking_test", user_id="test", session_id=case_id,
+                                    state={K.CASE_ID: case_id, K.CASE_TYPE: case_type, K.TARGET: target})
+        content = types.Content(role="user", parts=[types.Part(text="test")])
+        for _ in runner.run(user_id="test", session_id=case_id, new_message=content):
+            pass
+        session = service.get_session_sync(app_name="booking_test", user_id="test", session_id=case_id)
+        booking = session.state.get(K.BOOKING)
+        status = "✅" if bool(booking and booking.get("confirmed")) == expect_booking else "❌"
+        print(f"{status} {case_type}: booking {booking and booking.get('slot_human')}")
+
+def test_reply_renderer():
+    """Test the template renderer that stands in for the FollowUp agent."""
+    print("\n📝 Testing Reply Templates")
+    print("=" * 50)
+
+    from app.tools.renderer import render, LITE_MAX_CHARS
+    from app.agents.followup_agent import reply_step
+    from google.adk.agents import SequentialAgent
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    hospital = {"name": "Civil Hospital Karachi", "phone": "+92-21-99215740"}
+    booking = {"confirmed": True, "place": "Civil Hospital Karachi", "slot_human": "17 Oct, 03:30 AM"}
+    state = {K.CASE_ID: "FC-RENDER1", K.CASE_TYPE: "health", K.URGENCY: "critical",
+             K.TARGET: hospital, K.BOOKING: booking, "lang": "ur"}
+    text = render(state)
+    status = "✅" if text and "کیس آئی ڈی: FC-RENDER1" in text and "Civil Hospital Karachi" in text else "❌"
+    print(f"{status} Urdu reply: {text and text.splitlines()[0]}")
+
+    long_name = {"name": "Very Long Facility Name " * 20}
+    text = render({**state, K.TARGET: long_name, K.LITE: True, "lang": "en"})
+    status = "✅" if text and len(text) <= LITE_MAX_CHARS and text.endswith("Case ID: FC-RENDER1") else "❌"
+    print(f"{status} Lite reply: {len(text or '')} chars, case ID kept")
+
+    status = "✅" if render({K.CASE_ID: "FC-RENDER2", K.CASE_TYPE: "unknown"}) is None else "❌"
+    print(f"{status} Incomplete state falls back to the FollowUp agent")
+
+    # A complete state is rendered by ReplyStep without calling the model
+    service = InMemorySessionService()
+    runner = Runner(agent=SequentialAgent(name="ReplyTest", sub_agents=[reply_step.clone()]),
+                    app_name="reply_test", session_service=service)
+    service.create_session_sync(app_name="reply_test", user_id="test", session_id="FC-RENDER1", state=state)
+    content = types.Content(role="user", parts=[types.Part(text="test")])
+    for _ in runner.run(user_id="test", session_id="FC-RENDER1", new_message=content):
+        pass
+    session = service.get_session_sync(app_name="reply_test", user_id="test", session_id="FC-RENDER1")
+    status = "✅" if session.state.get(K.CONFIRMATION_TEXT) == render(state) else "❌"
+    print(f"{status} ReplyStep wrote the rendered confirmation")
+
+def test_response_cache():
+    """Test the generated-response cache: keys, per-case fields, LRU/TTL and the SQLite tier."""
+    print("\n🗃️ Testing Response Cache")
+    print("=" * 50)
+
+    import tempfile
+    from types import SimpleNamespace
+    from app.callbacks import response_cache as rc
+    from app.agents.followup_agent import followup_agent
+    from google.adk.agents import SequentialAgent
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.adk.models import LlmRequest, LlmResponse
+    from google.genai import types
+
+    status = "✅" if rc.fingerprint("Mujhe bukhar hai") == rc.fingerprint("bachay ko 2 din se BUKHAR hai!") else "❌"
+    print(f"{status} Near-identical fever messages share a fingerprint")
+    status = "✅" if rc.fingerprint("Mujhe bukhar hai") != rc.fingerprint("mera mobile cheen liya") else "❌"
+    print(f"{status} Different complaints do not")
+
+    rc.CACHE.clear()
+    rc.CACHE.reset_stats()
+    first = {K.CASE_ID: "FC-CACHE01", K.CASE_TYPE: "unknown", "user_message": "Mujhe bukhar hai", "lang": "en"}
+    ctx = SimpleNamespace(agent_name="FollowUpAgent", state=dict(first))
+    rc.before_model(ctx, LlmRequest())
+    reply = "Please visit a clinic.\n📋 Case ID: FC-CACHE01"
+    rc.after_model(ctx, LlmResponse(content=types.Content(role="model", parts=[types.Part(text=reply)])))
+
+    # A second, near-identical case is answered by the FollowUp agent without a model call
+    service = InMemorySessionService()
+    runner = Runner(agent=SequentialAgent(name="CacheTest", sub_agents=[followup_agent.clone()]),
+                    app_name="cache_test", session_service=service)
+    second = {**first, K.CASE_ID: "FC-CACHE02", "user_message": "bachay ko bukhar hai", K.LITE: False,
+              K.BOOKING: None, K.TARGET: None, K.CONFIRMATION_TEXT: None}
+    service.create_session_sync(app_name="cache_test", user_id="test", session_id="FC-CACHE02", state=second)
+    content = types.Content(role="user", parts=[types.Part(text=second["user_message"])])
+    for _ in runner.run(user_id="test", session_id="FC-CACHE02", new_message=content):
+        pass
+    session = service.get_session_sync(app_name="cache_test", user_id="test", session_id="FC-CACHE02")
+    text = session.state.get(K.CONFIRMATION_TEXT) or ""
+    status = "✅" if text.endswith("Case ID: FC-CACHE02") and "FC-CACHE01" not in text else "❌"
+    print(f"{status} Cached reply served with the new case ID: {text.splitlines()[-1] if text else None}")
+    print(f"   Stats: {rc.CACHE.stats['hits']} hit(s), {rc.CACHE.stats['misses']} miss(es)")
+
+    cache = rc.ResponseCache(maxsize=2, ttl_s=60)
+    for key in ("a", "b", "c"):
+        cache.put(key, key)
+    status = "✅" if cache.get("a") is None and cache.get("c") == "c" and cache.stats["evictions"] == 1 else "❌"
+    print(f"{status} LRU evicts the oldest entry")
+    cache = rc.ResponseCache(maxsize=2, ttl_s=0)
+    cache.put("a", "a")
+    status = "✅" if cache.get("a") is None and cache.stats["expired"] == 1 else "❌"
+    print(f"{status} Expired entries are dropped")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        rc.ResponseCache(db_path=path).put("k", "advice")
+        restarted = rc.ResponseCache(db_path=path)
+        status = "✅" if restarted.get("k") == "advice" and restarted.stats["sqlite_hits"] == 1 else "❌"
+        print(f"{status} SQLite tier survives a restart")
+
+def test_speculation():
+    """Test speculative specialist work: lookups and model turns committed or discarded."""
+    print("\n🔮 Testing Speculative Specialist Work")
+    print("=" * 50)
+
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from types import SimpleNamespace
+    from app.callbacks import speculation
+    from app.tools import directory as t_dir
+    from google.adk.models import LlmRequest, LlmResponse
+    from google.genai import types
+
+    karachi = {"lat": 24.8607, "lon": 67.0011}
+    speculation.TIMINGS.reset()
+
+    async def scenario():
+        # Routing agreed: the HealthAgent's nearest_hospital call gets the prefetched result
+        speculation.start("FC-SPEC1", "health", {"location": karachi})
+        ctx = SimpleNamespace(agent_name="HealthAgent", state={K.CASE_ID: "FC-SPEC1"})
+        hit = await speculation.before_tool(SimpleNamespace(name="nearest_hospital"), dict(karachi), ctx)
+        miss = await speculation.before_tool(SimpleNamespace(name="find_facilities"), dict(karachi), ctx)
+        committed = speculation.finish("FC-SPEC1", "health")
+
+        # Recorded speculative turns are replayed in order to the real specialist
+        spec = speculation.start("FC-SPEC2", "crime", {"location": karachi})
+        ctx = SimpleNamespace(agent_name="CrimeAgent", state={K.CASE_ID: "FC-SPEC2"})
+        speculation.record_model(ctx, LlmResponse(content=types.Content(role="model", parts=[types.Part(text="FIR")])))
+        replayed = await speculation.before_model(ctx, LlmRequest())
+        speculation.finish("FC-SPEC2", "crime")
+
+        # Routing went elsewhere: the prefetched police lookup is discarded
+        speculation.start("FC-SPEC3", "crime", {"location": karachi})
+        await asyncio.sleep(0.05)
+        discarded = speculation.finish("FC-SPEC3", "health")
+
+        # A speculative run that has not answered yet is waited for only until the deadline
+        spec = speculation.start("FC-SPEC4", "health", {"location": karachi})
+        spec.task = asyncio.ensure_future(asyncio.sleep(60))
+        ctx = SimpleNamespace(agent_name="HealthAgent", state={K.CASE_ID: "FC-SPEC4", K.DEADLINE: time.time() + 0.1})
+        start = time.perf_counter()
+        late = await speculation.before_model(ctx, LlmRequest())
+        waited_s = time.perf_counter() - start
+        speculation.finish("FC-SPEC4", "health")
+        return hit, miss, committed, replayed, discarded, late, waited_s
+
+    with ThreadPoolExecutor(1) as pool:
+        hit, miss, committed, replayed, discarded, late, waited_s = pool.submit(asyncio.run, scenario()).result()
+    ok = hit == t_dir.nearest_hospital(**karachi) and miss is None and committed["committed"]
+    print(f"{'✅' if ok else '❌'} Matching lookup committed: {hit.get('name')}, saved {committed['saved_ms']} ms")
+    ok = replayed is not None and replayed.content.parts[0].text == "FIR"
+    print(f"{'✅' if ok else '❌'} Speculative model turn replayed")
+    stats = speculation.TIMINGS.stats["speculation"]
+    ok = not discarded["committed"] and (stats["started"], stats["committed"], stats["discarded"]) == (4, 2, 2)
+    print(f"{'✅' if ok else '❌'} Mispredicted lookup discarded ({stats['wasted_ms']} ms wasted)")
+    ok = late is None and waited_s < 1
+    print(f"{'✅' if ok else '❌'} Replay wait stopped at the case deadline after {waited_s:.2f} s")
+
+    # Speculative specialists stop at the case deadline and go through the breaker
+    from app.agents.orchestrator import SPECULATIVE_AGENTS
+    from app.callbacks import circuit, deadline
+    clone = SPECULATIVE_AGENTS["health"]
+    ctx = SimpleNamespace(agent_name=clone.name, state={K.CASE_ID: "FC-SPEC5", K.DEADLINE: time.time() - 1})
+    try:
+        clone.before_model_callback[0](ctx, LlmRequest())
+        stopped = False
+    except deadline.DeadlineExceeded:
+        stopped = True
+    ok = (stopped and clone.before_model_callback[-1] is circuit.before_model
+          and clone.after_model_callback[0] is circuit.after_model
+          and clone.on_model_error_callback is circuit.on_model_error)
+    print(f"{'✅' if ok else '❌'} Speculative specialist checks the deadline and its circuit breaker")
+
+def test_agent_pipeline():
+    """Test the Orchestrator -> specialist -> booking -> reply chain on a stub model."""
+    print("\n🤖 Testing Agent Pipeline (stub model)")
+    print("=" * 50)
+
+    from concurrent.futures import ThreadPoolExecutor
+    from typing import AsyncGenerator
+    from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+    from app.agents import orchestrator as o
+    from app.tools.slots import INVENTORY
+
+    karachi = {"lat": 24.8607, "lon": 67.0011}
+    calls = []
+
+    class StubModel(BaseLlm):
+        """The Orchestrator calls HealthAgent (LiteAgent for "lite" messages), which
+        calls nearest_hospital, then each replies."""
+        model: str = "stub"
+
+        async def generate_content_async(self, llm_request: LlmRequest,
+                                         stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+            instruction = str(llm_request.config.system_instruction or "")
+            after_tool = any(p.function_response for p in llm_request.contents[-1].parts or [])
+            message = next(p.text for c in llm_request.contents for p in c.parts or [] if p.text)
+            agent = ("Orchestrator" if "main router" in instruction else
+                     "FollowUpAgent" if "final response generator" in instruction else
+                     "LiteAgent" if "low-bandwidth" in instruction else "HealthAgent")
+            calls.append(agent)
+            if agent == "LiteAgent":
+                part = types.Part(text="Health: chest pain? Sit upright.\nGo to the nearest ER. " * 6)
+            elif after_tool or agent == "FollowUpAgent":
+                part = types.Part(text="Sit upright and stay calm.")
+            elif agent == "Orchestrator":
+                specialist = "LiteAgent" if "lite" in message else "HealthAgent"
+                part = types.Part(function_call=types.FunctionCall(name=specialist, args={"request": message}))
+            else:
+                part = types.Part(function_call=types.FunctionCall(name="nearest_hospital", args=dict(karachi)))
+            yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+    agents = (o.orchestrator, o.health_agent, o.lite_agent, o.followup_agent, o.reply_step.sub_agents[0])
+    models = [agent.model for agent in agents]
+    persist, INVENTORY.persist = INVENTORY.persist, False
+    for agent in agents:
+        agent.model = StubModel()
+    service = InMemorySessionService()
+    runner = Runner(agent=o.root_agent, app_name="pipeline_test", session_service=service)
+
+    async def scenario(case_id: str, message: str, lite: bool):
+        await service.create_session(app_name="pipeline_test", user_id="test", session_id=case_id,
+                                     state={K.CASE_ID: case_id, K.LITE: lite, "location": karachi,
+                                            "user_message": message})
+        content = types.Content(role="user", parts=[types.Part(text=message)])
+        async for _ in runner.run_async(user_id="test", session_id=case_id, new_message=content):
+            pass
+        return (await service.get_session(app_name="pipeline_test", user_id="test", session_id=case_id)).state
+
+    try:
+        with ThreadPoolExecutor(1) as pool:
+            state = pool.submit(asyncio.run, scenario("FC-PIPE001", "severe chest pain", False)).result()
+            full_calls, calls[:] = list(calls), []
+            lite = pool.submit(asyncio.run, scenario("FC-PIPE002", "severe chest pain (lite)", True)).result()
+    finally:
+        INVENTORY.persist = persist
+        for agent, model in zip(agents, models):
+            agent.model = model
+    target = state.get(K.TARGET) or {}
+    ok = target.get("name") and state.get(K.CASE_TYPE) == "health"
+    print(f"{'✅' if ok else '❌'} Specialist's lookup saved as target: {target.get('name')}")
+    booking = state.get(K.BOOKING) or {}
+    print(f"{'✅' if booking.get('confirmed') else '❌'} BookingStep booked {booking.get('slot_human')}")
+    ok = state.get(K.URGENCY) == "critical" and "FC-PIPE001" in (state.get(K.CONFIRMATION_TEXT) or "")
+    ok = ok and "FollowUpAgent" not in full_calls
+    print(f"{'✅' if ok else '❌'} Reply rendered for a {state.get(K.URGENCY)} case, "
+          f"{full_calls.count('FollowUpAgent')} FollowUp model calls")
+    text = lite.get(K.CONFIRMATION_TEXT) or ""
+    ok = "\n" not in text and len(text) <= 260 and text.endswith("FC-PIPE002") and "FollowUpAgent" not in calls
+    print(f"{'✅' if ok else '❌'} Lite reply kept to one line of {len(text)} chars, "
+          f"{calls.count('FollowUpAgent')} FollowUp model calls")
+    ok = lite.get(K.CASE_TYPE) == "health" and lite.get(K.URGENCY) == "critical"
+    print(f"{'✅' if ok else '❌'} Lite case recorded as {lite.get(K.CASE_TYPE)}, {lite.get(K.URGENCY)}")
+
+def test_case_stream():
+    """Test POST /cases/stream: progress events first, the record last."""
+    print("\n📡 Testing Case Stream (SSE)")
+    print("=" * 50)
+
+    import json
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.tools.slots import INVENTORY
+
+    persist, INVENTORY.persist = INVENTORY.persist, False
+    events = []
+    with TestClient(app) as client:
+        with client.stream("POST", "/cases/stream", json={"message": "Seene mein dard hai", "lat": 24.8607,
+                                                          "lon": 67.0011}) as response:
+            for line in response.iter_lines():
+                if line.startswith("event: "):
+                    events.append([line[7:], None])
+                elif line.startswith("data: "):
+                    events[-1][1] = json.loads(line[6:])
+    INVENTORY.persist = persist
+    names = [name for name, _ in events]
+    print(f"   Events: {', '.join(names)}")
+    ok = names[0] == "accepted" and names[-1] == "record" and "routing" in names and "facility" in names
+    print(f"{'✅' if ok else '❌'} Accepted first, routing and facility before the record")
+    ok = events[-1][1]["case_id"] == events[0][1]["case_id"] and events[-1][1]["record"]["case_type"] == "health"
+    print(f"{'✅' if ok else '❌'} Record for {events[0][1]['case_id']}: {events[-1][1]['record']['case_type']}")
+
+    # An unexpected failure ends the stream with an error event
+    from app import main
+
+    async def failing(req, emit=None):
+        raise RuntimeError("database unreachable")
+
+    process_case, main.process_case = main.process_case, failing
+    try:
+        with TestClient(app) as client:
+            response = client.post("/cases/stream", json={"message": "Seene mein dard hai"})
+    finally:
+        main.process_case = process_case
+    ok = response.status_code == 200 and response.text.startswith("event: error\n") and "unreachable" in response.text
+    print(f"{'✅' if ok else '❌'} Unexpected failure streamed as an error event")
+
+def test_single_call_pipeline():
+    """Test the Python side of single-call mode with fixed model decisions."""
+    print("\n⚡ Testing Single-Call Pipeline (tools + reply)")
+    print("=" * 50)
+
+    from app.agents.single_call import TriageDecision, apply_decision
+
+    karachi = {"lat": 24.8607, "lon": 67.0011}
+    health = apply_decision({K.CASE_ID: "FC-SINGLE01", "location": karachi, K.LITE: False},
+                            TriageDecision(case_type="health", urgency="critical", advice="Sit upright and stay calm.",
+                                           er_only=True, min_beds=1))
+    ok = health[K.TARGET] and health[K.BOOKING].get("confirmed") and "FC-SINGLE01" in health[K.CONFIRMATION_TEXT]
+    print(f"{'✅' if ok else '❌'} Health: {health[K.TARGET] and health[K.TARGET].get('name')}, booked")
+
+    flood = apply_decision({K.CASE_ID: "FC-SINGLE02", "location": karachi, K.LITE: True},
+                           TriageDecision(case_type="disaster", urgency="high", advice="Move to higher ground. " * 30,
+                                          incident_type="Flood"))
+    text = flood[K.CONFIRMATION_TEXT]
+    ok = len(text) <= 260 and text.endswith("ID: FC-SINGLE02") and K.BOOKING not in flood
+    print(f"{'✅' if ok else '❌'} Lite disaster reply: {len(text)} chars, no booking for a shelter")
+
 def test_database_operations():
     """Test database operations."""
     print("\n💾 Testing Database Operations")
@@ -159,7 +711,8 @@ def test_database_operations():
         "booking": {"confirmed": True, "place": "Test Hospital"},
         "confirmation": "Test confirmation",
         "user_message": "Test health emergency",
-        "location": {"lat": 24.815, "lon": 67.030}
+        "location": {"lat": 24.815, "lon": 67.030},
+        "district": "Karachi South"
     }
     
     # Save case
@@ -188,6 +741,8 @@ def test_database_operations():
     # Test top districts
     districts = top_districts_since(hours=24)
     print(f"✅ Top districts: {len(districts.get('top', []))} districts")
+    status = "✅" if "Karachi South" in dict(districts.get("top", [])) else "❌"
+    print(f"{status} Case district counted: {districts.get('top', [])}")
     print(f"   Lite mode %: {districts.get('lite_pct', 0)}%")
 
 def test_degraded_detection():
@@ -210,6 +765,354 @@ def test_degraded_detection():
         status = "✅" if result == scenario["expected"] else "❌"
         print(f"{status} Battery: {scenario['battery_pct']}%, Bandwidth: {scenario['kbps']}kbps -> Lite: {result}")
 
+def test_case_routing():
+    """Test the multilingual keyword router."""
+    print("\n🧭 Testing Case Routing")
+    print("=" * 50)
+
+    from app.tools.keyword_router import route
+
+    test_messages = [
+        ("Chest pain since morning, need a doctor", "health", None),
+        ("Mera mobile chori ho gaya", "crime", None),
+        ("میرا بٹوہ چوری ہو گیا", "crime", None),
+        ("ہمارے علاقے میں سیلاب آ گیا ہے", "disaster", "Flood"),
+        ("Fire in the market, shops burning", "disaster", "Fire"),
+        ("The painter needs a ladder", "unknown", None),
+    ]
+
+    for message, expected, incident in test_messages:
+        result = route(message)
+        status = "✅" if (result["case_type"], result["incident"]) == (expected, incident) else "❌"
+        print(f"{status} '{message}' -> {result['case_type']} ({result['incident']}, score {result['score']})")
+
+    # Tier-0 classifier: confident on messages like its training data
+    from app.tools.case_classifier import get_classifier, Tier0Stats
+    classifier = get_classifier()
+    for message, expected in [("Flood water entering house, need evacuation", "disaster"),
+                              ("Mera mobile chori ho gaya bazar mein", "crime"),
+                              ("Bachay ko tez bukhar hai", "health")]:
+        case_type, confidence = classifier.predict(message)
+        status = "✅" if case_type == expected else "❌"
+        print(f"{status} Tier-0 '{message}' -> {case_type} ({confidence:.2f})")
+
+    stats = Tier0Stats()
+    stats.record("health", confident=True, skipped=True)
+    stats.record("crime", confident=True, skipped=False, llm_case_type="crime")
+    stats.record("health", confident=False, skipped=False, llm_case_type="disaster")
+    snapshot = stats.stats
+    ok = (snapshot["skip_rate"], snapshot["audited_accuracy"], snapshot["agreement"]) == (round(1 / 3, 4), 1.0, 0.5)
+    print(f"{'✅' if ok else '❌'} Tier-0 metrics: skip rate {snapshot['skip_rate']}, "
+          f"audited accuracy {snapshot['audited_accuracy']}, agreement {snapshot['agreement']}")
+
+def test_case_clusters():
+    """Test near-duplicate clustering: who joins a cluster and what members reuse."""
+    print("\n🧩 Testing Near-Duplicate Clusters")
+    print("=" * 50)
+
+    from app.tools.case_clusters import ClusterIndex
+
+    index = ClusterIndex(window_s=600, cell_deg=0.05, threshold=0.5)
+    sukkur = {"lat": 27.7052, "lon": 68.8574}
+    leader, is_leader = index.attach("FC-CL1", "Flood water entering our homes in Sukkur, need rescue boats", sukkur, now=0)
+    member, joined = index.attach("FC-CL2", "flood water entering homes in sukkur need rescue boat!!",
+                                  {"lat": 27.71, "lon": 68.86}, now=60)
+    print(f"{'✅' if is_leader and not joined and member is leader else '❌'} Near-duplicate nearby joins {leader.cluster_id}")
+
+    other, _ = index.attach("FC-CL3", "My mobile was snatched near the market", sukkur, now=60)
+    far, _ = index.attach("FC-CL4", "Flood water entering our homes, need rescue boats", {"lat": 24.86, "lon": 67.0}, now=60)
+    late, _ = index.attach("FC-CL5", "Flood water entering our homes in Sukkur, need rescue boats", sukkur, now=900)
+    ok = leader not in (other, far, late)
+    print(f"{'✅' if ok else '❌'} Different message, another city and a later window start new clusters")
+
+    index.complete(leader, {K.CASE_ID: "FC-CL1", K.CASE_TYPE: "disaster", K.URGENCY: "high", K.INCIDENT: "Flood",
+                            K.TARGET: {"name": "Govt Boys School Camp"}},
+                   "🚨 Move to higher ground.\n📋 Case ID: FC-CL1")
+    state = index.reuse(leader.result, {K.CASE_ID: "FC-CL2"})
+    ok = (state[K.CASE_TYPE], state[K.INCIDENT]) == ("disaster", "Flood") and state[K.CONFIRMATION_TEXT].endswith("FC-CL2")
+    print(f"{'✅' if ok else '❌'} Member reuses routing and reply with its own case ID")
+    print(f"   Stats: {index.stats['attached']} attached of {index.stats['cases']} cases, "
+          f"{index.stats['live_clusters']} live clusters")
+
+def test_case_deadline():
+    """Test the per-case deadline: which agent a miss is blamed on and the degraded completion."""
+    print("\n⏰ Testing Case Deadline")
+    print("=" * 50)
+
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from types import SimpleNamespace
+    from app.callbacks import deadline
+    from app.callbacks.speculation import TIMINGS
+
+    deadline.STATS.reset()
+    TIMINGS.reset()
+    for _ in range(deadline.MIN_RUNS):
+        TIMINGS.record("FollowUpAgent", 5000)
+
+    # The FollowUpAgent usually takes 5 s; with 2 s left it is not started
+    state = {K.CASE_ID: "FC-DL1", K.DEADLINE: time.time() + 2}
+    try:
+        deadline.before_agent(SimpleNamespace(agent_name="FollowUpAgent", state=state))
+        predicted = None
+    except deadline.DeadlineExceeded as e:
+        predicted = deadline.missed("FC-DL1", e.agent, e.predicted)
+    print(f"{'✅' if predicted == 'FollowUpAgent' else '❌'} Agent that would overrun the budget is skipped")
+
+    # The deadline passes inside the HealthAgent (called by the Orchestrator)
+    state = {K.CASE_ID: "FC-DL2", K.DEADLINE: time.time() + 0.05}
+    for agent in ("Orchestrator", "HealthAgent"):
+        deadline.before_agent(SimpleNamespace(agent_name=agent, state=state))
+    time.sleep(0.06)
+    deadline.after_agent(SimpleNamespace(agent_name="HealthAgent", state=state))
+    blamed = deadline.missed("FC-DL2")
+    print(f"{'✅' if blamed == 'HealthAgent' else '❌'} Timeout blamed on the innermost running agent: {blamed}")
+
+    stats = deadline.STATS.stats
+    ok = stats["agents"]["HealthAgent"]["miss_rate"] == 1.0 and stats["agents"]["Orchestrator"]["misses"] == 0
+    rates = ", ".join(f"{agent} {s['miss_rate']}" for agent, s in stats["agents"].items())
+    print(f"{'✅' if ok else '❌'} Miss rates: {rates}")
+
+    # mock_run finishes from the agents' state: the crime routing and police station are kept
+    police = {"name": "Clifton Police Station", "lat": 24.81, "lon": 67.03}
+    partial = {K.CASE_ID: "FC-DL3", "user_message": "I have a fever", K.CASE_TYPE: "crime", K.TARGET: police,
+               "location": {"lat": 24.86, "lon": 67.0}}
+    with ThreadPoolExecutor(1) as pool:
+        st = pool.submit(asyncio.run, mock_run(partial)).result()
+    ok = st[K.CASE_TYPE] == "crime" and st[K.TARGET] == police and st[K.CONFIRMATION_TEXT]
+    print(f"{'✅' if ok else '❌'} Degraded completion keeps {st[K.CASE_TYPE]} routing to {st[K.TARGET]['name']}")
+
+def test_circuit_breaker():
+    """Test the per-agent circuit breaker: opening on failures, probing and closing."""
+    print("\n🔌 Testing Circuit Breaker")
+    print("=" * 50)
+
+    import time
+    from app.callbacks.circuit import CircuitBoard
+
+    board = CircuitBoard(window=10, min_calls=4, error_rate=0.5, slow_ms=1000, open_s=0.05)
+    breaker = board.breaker("Orchestrator")
+    for ok, ms in ((True, 200), (False, 50), (True, 3000), (False, 50)):
+        breaker.record(ok, ms)
+    ok = breaker.state == "open" and board.blocked(["Orchestrator", "HealthAgent"]) == ["Orchestrator"]
+    print(f"{'✅' if ok else '❌'} Errors and slow calls open it: {breaker.stats['failure_rate']} failure rate")
+    ok = not breaker.allow()
+    print(f"{'✅' if ok else '❌'} Calls refused while open ({breaker.stats['rejected']} rejected)")
+
+    time.sleep(0.06)
+    probe, second = breaker.allow(), breaker.allow()
+    breaker.record(False, 50)
+    print(f"{'✅' if probe and not second and breaker.state == 'open' else '❌'} One probe when half-open; failure reopens")
+
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record(True, 100)
+    moves = [f"{t['from']}->{t['to']}" for t in board.stats["transitions"]]
+    print(f"{'✅' if breaker.state == 'closed' else '❌'} Successful probe closes it: {', '.join(moves)}")
+
+def test_session_store():
+    """Test the bounded ADK session store: LRU cap, TTL, event compaction and deletion."""
+    print("\n🗂️ Testing Bounded Session Store")
+    print("=" * 50)
+
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from google.adk.events import Event, EventActions
+    from google.adk.sessions.base_session_service import GetSessionConfig
+    from app.session_store import BoundedSessionService
+
+    async def scenario():
+        service = BoundedSessionService(max_sessions=2, ttl_s=0.2, max_events=3)
+        for case_id in ("FC-S1", "FC-S2", "FC-S3"):
+            await service.create_session(app_name="t", user_id="citizen", session_id=case_id, state={K.CASE_ID: case_id})
+        evicted = await service.get_session(app_name="t", user_id="citizen", session_id="FC-S1")
+
+        session = await service.get_session(app_name="t", user_id="citizen", session_id="FC-S2")
+        for i in range(5):
+            await service.append_event(session, Event(author="Orchestrator", invocation_id="e-1",
+                                                      actions=EventActions(state_delta={K.URGENCY: f"step {i}"})))
+        stored = await service.get_session(app_name="t", user_id="citizen", session_id="FC-S2")
+        state_only = await service.get_session(app_name="t", user_id="citizen", session_id="FC-S2",
+                                               config=GetSessionConfig(num_recent_events=0))
+        await service.delete_session(app_name="t", user_id="citizen", session_id="FC-S2")
+
+        await asyncio.sleep(0.25)
+        expired = await service.get_session(app_name="t", user_id="citizen", session_id="FC-S3")
+        return evicted, stored, state_only, expired, service.stats
+
+    with ThreadPoolExecutor(1) as pool:
+        evicted, stored, state_only, expired, stats = pool.submit(asyncio.run, scenario()).result()
+    print(f"{'✅' if evicted is None and stats['evicted'] == 1 else '❌'} Least recently used session evicted past the cap")
+    ok = len(stored.events) == 3 and stored.state[K.URGENCY] == "step 4"
+    print(f"{'✅' if ok else '❌'} History compacted to the last 3 events, state kept ({stats['events_dropped']} dropped)")
+    ok = state_only.events == [] and state_only.state[K.CASE_ID] == "FC-S2"
+    print(f"{'✅' if ok else '❌'} State-only read returns no events")
+    ok = expired is None and (stats["deleted"], stats["expired"], stats["sessions"]) == (1, 1, 0)
+    print(f"{'✅' if ok else '❌'} Deleted and expired sessions are gone: {stats['sessions']} left")
+
+def test_shared_session_store():
+    """Test the SQLite session store as two workers sharing one file."""
+    print("\n🗄️ Testing Shared Session Store")
+    print("=" * 50)
+
+    import sqlite3
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from google.adk.events import Event, EventActions
+    from app.session_store import SqliteSessionStore
+
+    async def scenario(db_path):
+        worker_a = SqliteSessionStore(db_path, ttl_s=0.2, purge_interval_s=0)
+        worker_b = SqliteSessionStore(db_path, ttl_s=0.2, purge_interval_s=0)
+        session = await worker_a.create_session(app_name="t", user_id="citizen", session_id="FC-W1",
+                                                state={K.CASE_ID: "FC-W1"})
+        await worker_a.append_event(session, Event(author="Orchestrator", invocation_id="e-1",
+                                                   actions=EventActions(state_delta={K.CASE_TYPE: "health"})))
+        seen = await worker_b.get_session(app_name="t", user_id="citizen", session_id="FC-W1")
+        await worker_b.delete_session(app_name="t", user_id="citizen", session_id="FC-W1")
+        gone = await worker_a.get_session(app_name="t", user_id="citizen", session_id="FC-W1")
+
+        await worker_a.create_session(app_name="t", user_id="citizen", session_id="FC-W2")
+        await asyncio.sleep(0.25)
+        await worker_b.create_session(app_name="t", user_id="citizen", session_id="FC-W3")
+        expired = await worker_a.get_session(app_name="t", user_id="citizen", session_id="FC-W2")
+        return seen, gone, expired, worker_b.stats
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sessions.db")
+        with ThreadPoolExecutor(1) as pool:
+            seen, gone, expired, stats = pool.submit(asyncio.run, scenario(db_path)).result()
+        with sqlite3.connect(db_path) as conn:
+            journal = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    print(f"{'✅' if journal == 'wal' else '❌'} Session database in {journal} mode")
+    ok = seen is not None and seen.state.get(K.CASE_TYPE) == "health" and len(seen.events) == 1
+    print(f"{'✅' if ok else '❌'} Session written by one worker read by another")
+    print(f"{'✅' if gone is None else '❌'} Session deleted by one worker gone for the other")
+    ok = expired is None and stats["expired"] == 1 and stats["sessions"] == 1
+    print(f"{'✅' if ok else '❌'} Idle session purged after its TTL: {stats['sessions']} left")
+
+def test_async_persistence():
+    """Test that awaited saves and SMS leave the event loop free."""
+    print("\n⏱️ Testing Non-Blocking Persistence")
+    print("=" * 50)
+
+    import time
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from app.database.async_db import ThreadPoolDatabase
+    from app.database.sqlite_db import SQLiteDatabase
+    from app.tools.notify import send_sms_async
+
+    class SlowDatabase(SQLiteDatabase):
+        def save_case(self, case_id, record):
+            time.sleep(0.03)  # a slow disk or Firestore round trip
+            return super().save_case(case_id, record)
+
+    async def worst_lag(save):
+        lags, done = [], asyncio.Event()
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - start - 0.005)
+
+        monitor = asyncio.create_task(probe())
+        await asyncio.sleep(0.01)
+        results = await asyncio.gather(*(save(f"FC-L{i}") for i in range(8)))
+        done.set()
+        await monitor
+        return max(lags) * 1000, all(results)
+
+    async def scenario(db_path):
+        db = SlowDatabase(db_path)
+        pool = ThreadPoolDatabase(db, max_workers=4)
+
+        async def blocking_save(case_id):
+            return db.save_case(case_id, {"case_id": case_id, "confirmation": "ok"})
+
+        async def awaited_save(case_id):
+            return await pool.save_case(case_id, {"case_id": case_id, "confirmation": "ok"})
+
+        blocking = await worst_lag(blocking_save)
+        awaited = await worst_lag(awaited_save)
+        case = await pool.get_case("FC-L3")
+        sms = await send_sms_async("+920000000000", "Case ID: FC-L3")
+        return blocking, awaited, case, sms
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with ThreadPoolExecutor(1) as pool:
+            (blocking_ms, _), (awaited_ms, saved), case, sms = pool.submit(
+                asyncio.run, scenario(os.path.join(tmp, "cases.db"))).result()
+    ok = saved and case is not None and case["case_id"] == "FC-L3" and sms["ok"]
+    print(f"{'✅' if ok else '❌'} Awaited saves stored and read back, SMS sent")
+    ok = blocking_ms >= 200 and awaited_ms < blocking_ms / 4
+    print(f"{'✅' if ok else '❌'} Event-loop lag during 8 slow saves: "
+          f"{blocking_ms:.0f} ms blocking, {awaited_ms:.0f} ms on the thread pool")
+
+def test_outbox():
+    """Test the outbox: read-your-writes, retries with backoff and dead messages."""
+    print("\n📮 Testing Outbox")
+    print("=" * 50)
+
+    import time
+    import tempfile
+    from app.tools.outbox import Outbox, CASE, SMS
+
+    saved, attempts = {}, {"case": 0}
+
+    def flaky_save(payload):
+        attempts["case"] += 1
+        if attempts["case"] <= 2:
+            raise ConnectionError("database unavailable")
+        saved[payload["case_id"]] = payload["record"]
+
+    def refused_sms(payload):
+        raise RuntimeError("SMS provider refused the message")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = Outbox(os.path.join(tmp, "outbox.db"), workers=2, max_attempts=3, backoff_s=0.01,
+                        handlers={CASE: flaky_save, SMS: refused_sms})
+        created_at = datetime(2026, 10, 17, 9, 30)
+        start = time.perf_counter()
+        outbox.enqueue("FC-O1", {"case_id": "FC-O1", "created_at": created_at, "target": {"name": "CHK"}},
+                       {"to": "+920000000000", "text": "Case ID: FC-O1"})
+        enqueue_ms = (time.perf_counter() - start) * 1000
+        queued = outbox.pending_case("FC-O1")
+        deadline_at = time.monotonic() + 10
+        while outbox.stats["depth"] and time.monotonic() < deadline_at:
+            time.sleep(0.02)
+        stats = outbox.stats
+
+    ok = queued is not None and queued["created_at"] == created_at
+    print(f"{'✅' if ok else '❌'} Queued record readable before delivery ({enqueue_ms:.1f} ms to enqueue)")
+    ok = saved.get("FC-O1", {}).get("target") == {"name": "CHK"} and attempts["case"] == 3
+    print(f"{'✅' if ok else '❌'} Record delivered on attempt {attempts['case']} after failures")
+    ok = (stats["depth"], stats["dead"], stats["delivered"]) == (0, 1, 1) and stats["retried"] == 4
+    print(f"{'✅' if ok else '❌'} Refused SMS kept as dead after 3 attempts: {stats['dead']} dead, "
+          f"{stats['retried']} retries")
+
+    # An unexpected error in a worker is recorded and the worker carries on
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = Outbox(os.path.join(tmp, "outbox.db"), workers=1,
+                        handlers={CASE: lambda payload: saved.update({payload["case_id"]: payload["record"]})})
+        claim, failures = outbox._claim, []
+
+        def failing_claim():
+            if not failures:
+                failures.append(1)
+                raise ValueError("unexpected outbox row")
+            return claim()
+
+        outbox._claim = failing_claim
+        outbox.enqueue("FC-O2", {"case_id": "FC-O2"})
+        deadline_at = time.monotonic() + 10
+        while outbox.stats["depth"] and time.monotonic() < deadline_at:
+            time.sleep(0.02)
+        stats = outbox.stats
+    ok = "FC-O2" in saved and stats["last_error"] == "unexpected outbox row" and stats["depth"] == 0
+    print(f"{'✅' if ok else '❌'} Worker survived an unexpected error: {stats['last_error']}")
+
 async def main():
     """Run all local tests."""
     print("🚀 Frontline Citizen Service Assistant - Local Tests")
@@ -220,8 +1123,23 @@ async def main():
     # Test individual components
     test_database_operations()
     test_degraded_detection()
+    test_case_routing()
     test_directory_tools()
     test_booking_tools()
+    test_booking_step()
+    test_reply_renderer()
+    test_response_cache()
+    test_case_clusters()
+    test_speculation()
+    test_agent_pipeline()
+    test_case_stream()
+    test_case_deadline()
+    test_circuit_breaker()
+    test_session_store()
+    test_shared_session_store()
+    test_async_persistence()
+    test_outbox()
+    test_single_call_pipeline()
     
     # Test full mock agent flow
     await test_mock_agent()